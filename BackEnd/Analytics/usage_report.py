@@ -1,22 +1,155 @@
-import pandas as pd
+import argparse
+import json
 import os
+import sys
+from collections import Counter
+
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from nlp import log_store
 
 LOG_FILE = os.path.join(os.path.dirname(__file__), "../logs/chatbot_logs.csv")
 
-def generate_report():
-    df = pd.read_csv(LOG_FILE, header=None,
-                     names=["timestamp", "user_id", "query", "response", "intent"])
+SUMMARY_FILE = "_summary.json"
+# "low_confidence" and "uncertain" are online_learning.REVIEW_INTENTS
+UNANSWERED_INTENTS = ["unknown", "low_confidence", "uncertain"]
+SAMPLE_SIZE = 5
+
+# ------------------------------------------------------
+# Per-partition aggregates
+# ------------------------------------------------------
+# Each day partition keeps a _summary.json with the counts of every part file
+# already folded in. A report only reads the parts added since the last run,
+# and only the user_id / intent columns (plus `query` for unanswered rows).
+
+def _empty_summary():
+    return {"parts": [], "rows": 0, "intents": {}, "users": {}, "unanswered": [],
+            "unanswered_intents": UNANSWERED_INTENTS}
+
+
+def _value_counts(column):
+    return {
+        item["values"]: item["counts"]
+        for item in pc.value_counts(column).to_pylist()
+        if item["values"] is not None
+    }
+
+
+def summarize_partition(partition_dir):
+    """
+    Bring a partition's summary up to date and return it.
+    """
+    path = os.path.join(partition_dir, SUMMARY_FILE)
+    summary = _empty_summary()
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+        # Sampled with a different intent list: fold every part in again
+        if summary.get("unanswered_intents") != UNANSWERED_INTENTS:
+            summary = _empty_summary()
+
+    new_parts = [p for p in log_store.list_parts(partition_dir) if p not in set(summary["parts"])]
+    if not new_parts:
+        return summary
+
+    intents = Counter(summary["intents"])
+    users = Counter(summary["users"])
+    for part in new_parts:
+        part_path = os.path.join(partition_dir, part)
+        table = pq.read_table(part_path, columns=["user_id", "intent"])
+        summary["rows"] += table.num_rows
+        intents.update(_value_counts(table["intent"]))
+        users.update(_value_counts(table["user_id"]))
+
+        if len(summary["unanswered"]) < SAMPLE_SIZE:
+            unanswered = pq.read_table(
+                part_path, columns=["query"], filters=[("intent", "in", UNANSWERED_INTENTS)]
+            )
+            needed = SAMPLE_SIZE - len(summary["unanswered"])
+            summary["unanswered"].extend(unanswered["query"].to_pylist()[:needed])
+
+    summary["parts"].extend(new_parts)
+    summary["intents"] = dict(intents)
+    summary["users"] = dict(users)
+
+    # Write-then-rename so a concurrent report never reads half a summary
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f)
+    os.replace(tmp_path, path)
+    return summary
+
+
+def generate_report(since=None, until=None):
+    total = 0
+    intents = Counter()
+    users = Counter()
+    unanswered = []
+    for _, partition_dir in log_store.list_partitions(since=since, until=until):
+        summary = summarize_partition(partition_dir)
+        total += summary["rows"]
+        intents.update(summary["intents"])
+        users.update(summary["users"])
+        unanswered.extend(summary["unanswered"])
 
     print("===== Chatbot Usage Report =====")
-    print(f"Total Conversations: {len(df)}")
+    if since or until:
+        print(f"Period: {since or 'start'} → {until or 'today'}")
+    print(f"Total Conversations: {total}")
     print("\nTop 5 Intents:")
-    print(df["intent"].value_counts().head(5))
+    for intent, count in intents.most_common(5):
+        print(f"{intent:<20} {count}")
 
     print("\nMost Active Users:")
-    print(df["user_id"].value_counts().head(3))
+    for user_id, count in users.most_common(3):
+        print(f"{user_id:<20} {count}")
 
     print("\nUnanswered or Generic Queries:")
-    print(df[df["intent"] == "unknown"]["query"].head(5))
-    
+    for query in unanswered[:SAMPLE_SIZE]:
+        print(f"- {query}")
+
+
+# ------------------------------------------------------
+# One-off migration of the old CSV log into the store
+# ------------------------------------------------------
+def import_legacy_log(path=LOG_FILE):
+    import pandas as pd
+
+    with open(path, "rb") as f:
+        is_xlsx = f.read(2) == b"PK"
+    names = ["timestamp", "user_id", "query", "response", "intent"]
+    if is_xlsx:
+        df = pd.read_excel(path, header=None, names=names)
+    else:
+        df = pd.read_csv(path, header=None, names=names)
+
+    if df.empty or "timestamp" not in df.columns:
+        print(f"ℹ️ {path} has no rows to import.")
+        return
+
+    df = df.dropna(subset=["timestamp"])
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    records = [
+        [row.timestamp.to_pydatetime(), str(row.user_id), str(row.query), str(row.response), str(row.intent)]
+        for row in df.itertuples(index=False)
+    ]
+
+    sink = log_store.PartitionedParquetSink()
+    sink.write_batch(records)
+    sink.close()
+    print(f"✔ Imported {len(records)} rows from {path} into {log_store.STORE_DIR}")
+
+
 if __name__ == "__main__":
-    generate_report()
+    parser = argparse.ArgumentParser(description="Chatbot usage report")
+    parser.add_argument("--since", help="first day to include (YYYY-MM-DD)")
+    parser.add_argument("--until", help="last day to include (YYYY-MM-DD)")
+    parser.add_argument("--import-legacy", action="store_true",
+                        help="import logs/chatbot_logs.csv into the partitioned store first")
+    args = parser.parse_args()
+
+    if args.import_legacy:
+        import_legacy_log()
+    generate_report(args.since, args.until)
@@ -1,17 +1,81 @@
 # backend/app.py
-from fastapi import FastAPI, Request
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from nlp.response_manager import generate_response
-from fastapi.responses import JSONResponse
+from nlp.response_manager import (
+    generate_responses, classify_messages, finalize_responses, preview_reply, response_cache,
+    session_context, ERROR_REPLY,
+)
+from nlp.error_handler import log_error
+from nlp.model_registry import load_models, load_timings, start_watcher, generation as model_generation
+from nlp.releases import current_release
+from nlp.worker_pool import PipelinePool, PoolSaturatedError
+from nlp.batcher import MicroBatcher
+from nlp.log_writer import close_all as close_log_writers
+from nlp import metrics
+from fastapi.responses import JSONResponse, PlainTextResponse
 from json import JSONDecodeError
 
-app = FastAPI(title="E-Com Support Chatbot API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load every model artifact once per worker; fail fast if one is missing
+    load_models()
+    for name, seconds in load_timings().items():
+        print(f"✅ Loaded '{name}' model in {seconds * 1000:.1f} ms")
+    # Swap in newly published model releases in the background
+    start_watcher()
+
+    # Run the synchronous NLP pipeline on a bounded worker pool
+    pool.start()
+    yield
+    pool.shutdown()
+    # Flush buffered interaction/error logs before the worker exits
+    close_log_writers()
+
+
+pool = PipelinePool()
+# Concurrent /chat messages share one vectorize + predict call
+batcher = MicroBatcher(pool, generate_responses)
+# /ws/chat classifies first (batched the same way), then finalizes
+classify_batcher = MicroBatcher(pool, classify_messages)
+
+app = FastAPI(title="E-Com Support Chatbot API", lifespan=lifespan)
+
+# Queue / cache gauges, read from the objects' own counters at scrape time
+metrics.register_callback("chatbot_pool_in_flight", "Pipeline calls running or queued",
+                          lambda: pool.stats()["in_flight"])
+metrics.register_callback("chatbot_pool_queue_depth", "Pipeline calls waiting for a worker",
+                          lambda: pool.stats()["queue_depth"])
+metrics.register_callback("chatbot_pool_rejected_total", "Pipeline calls rejected with 503",
+                          lambda: pool.stats()["rejected"], kind="counter")
+metrics.register_callback("chatbot_batcher_pending", "Messages waiting to be batched",
+                          lambda: batcher.stats()["pending"])
+metrics.register_callback("chatbot_cache_entries", "Response cache entries (API process)",
+                          lambda: response_cache.stats()["size"])
+metrics.register_callback("chatbot_ws_connections", "Open /ws/chat connections",
+                          lambda: len(ws_connections))
+WS_MESSAGES = metrics.counter("chatbot_ws_messages_total", "/ws/chat messages by outcome", ["result"])
 
 class ChatRequest(BaseModel):
     user_id: str
     message: str
 
+# /chat/batch requests are split into chunks of this size across the pool
+BATCH_CHUNK_SIZE = int(os.environ.get("CHATBOT_BATCH_CHUNK_SIZE", "256"))
+# Larger /chat/batch requests are rejected with 413
+BATCH_MAX_MESSAGES = int(os.environ.get("CHATBOT_BATCH_MAX_MESSAGES", "4096"))
+# /ws/chat: messages a connection may have waiting, and idle seconds before it is closed
+WS_QUEUE_SIZE = int(os.environ.get("CHATBOT_WS_QUEUE_SIZE", "8"))
+WS_IDLE_TIMEOUT = float(os.environ.get("CHATBOT_WS_IDLE_SECONDS", "300"))
+
+BUSY_REPLY = "⚠️ I'm handling a lot of chats right now. Please try again in a moment."
+ws_connections = set()
+
 
 # Enable CORS for your frontend later
 app.add_middleware(
@@ -25,6 +89,23 @@ app.add_middleware(
 def health_check():
     return {"status": "Chatbot backend is running 🚀"}
 
+@app.get("/stats")
+def stats():
+    """
+    Worker pool load (queue depth, rejections, wait times), batching,
+    response cache hit rate and the model release being served.
+    """
+    models = {"release": (current_release() or {}).get("release"), "generation": model_generation()}
+    return {"pool": pool.stats(), "batcher": batcher.stats(), "cache": response_cache.stats(), "models": models}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """
+    Prometheus scrape endpoint: per-stage latency histograms, replies per
+    intent, cache/pool/batcher gauges and model load timings.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # @app.post("/chat")
 # async def chat_endpoint(request: Request):
 #     data = await request.json()
@@ -44,11 +125,20 @@ async def chat_endpoint(request: ChatRequest):
         user_id = request.user_id
         message = request.message
 
-        # Generate chatbot response (from NLP module)
-        response = generate_response(user_id, message)
+        # Generate chatbot response (from NLP module) off the event loop
+        response = await batcher.submit((user_id, message))
 
         return {"response": response}
 
+    except PoolSaturatedError:
+        # Shed load fast instead of queueing without bound
+        return JSONResponse(
+            content={
+                "response": BUSY_REPLY,
+                "error": "Server busy",
+            },
+            status_code=503
+        )
     except JSONDecodeError:
         return JSONResponse(
             content={"error": "Invalid or empty JSON body"},
@@ -59,6 +149,151 @@ async def chat_endpoint(request: ChatRequest):
             content={"error": f"Server error: {str(e)}"},
             status_code=500
         )
+# Bulk endpoint for offline jobs (order notifications, email triage)
+@app.post("/chat/batch")
+async def chat_batch_endpoint(requests: List[ChatRequest]):
+    """
+    Process many user messages in one call; responses are returned in order.
+    All chunks are admitted to the pool together or the batch gets a 503,
+    so a rejected batch never leaves part of its messages running.
+    """
+    if len(requests) > BATCH_MAX_MESSAGES:
+        return JSONResponse(
+            content={"error": f"Batch too large: at most {BATCH_MAX_MESSAGES} messages"},
+            status_code=413
+        )
+
+    items = [(request.user_id, request.message) for request in requests]
+    chunks = [items[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(items), BATCH_CHUNK_SIZE)]
+
+    try:
+        results = await pool.run_all(generate_responses, [(chunk,) for chunk in chunks])
+    except PoolSaturatedError:
+        return JSONResponse(
+            content={"error": "Server busy, retry the batch later"},
+            status_code=503
+        )
+    except Exception as e:
+        return JSONResponse(
+            content={"error": f"Server error: {str(e)}"},
+            status_code=500
+        )
+
+    return {"responses": [response for chunk in results for response in chunk]}
+
+# Streaming chat: one connection per browser session carries every message
+@app.websocket("/ws/chat")
+async def chat_socket(websocket: WebSocket, user_id: str = "anonymous"):
+    """
+    Client sends {"message": "...", "id": <optional>}. For each message the
+    server sends, in order:
+      {"type": "ack", "id"}                          message accepted
+      {"type": "status", "id", "response", "intent"} generic reply while personalising
+      {"type": "reply", "id", "response", "intent"}  final reply
+    or {"type": "error", "id", "error", "response"}. Messages of one
+    connection are answered in order; at most CHATBOT_WS_QUEUE_SIZE may wait
+    (the rest are rejected with "busy"), and the connection is closed after
+    CHATBOT_WS_IDLE_SECONDS without a message.
+    """
+    await websocket.accept()
+    ws_connections.add(websocket)
+    queue = asyncio.Queue(maxsize=WS_QUEUE_SIZE)
+    send_lock = asyncio.Lock()
+
+    async def send(event):
+        async with send_lock:
+            await websocket.send_json(event)
+
+    async def answer_messages():
+        try:
+            while True:
+                message_id, text = await queue.get()
+                try:
+                    await _answer_socket_message(send, user_id, message_id, text)
+                except WebSocketDisconnect:
+                    raise
+                except Exception as e:
+                    # One failed message must not stop the ones queued behind it
+                    log_error(e)
+                    WS_MESSAGES.labels("error").inc()
+                    await send({"type": "error", "id": message_id, "error": "Server error",
+                                "response": ERROR_REPLY})
+        except (WebSocketDisconnect, RuntimeError):
+            pass    # client went away mid-reply (RuntimeError: send after close)
+
+    # Context lives with the pipeline (sqlite or a worker's memory): read it there
+    try:
+        context = await pool.run(session_context, user_id)
+    except PoolSaturatedError:
+        context = None
+    await send({"type": "session", "user_id": user_id, "context": context})
+    worker = asyncio.create_task(answer_messages())
+    try:
+        while True:
+            try:
+                data = await asyncio.wait_for(websocket.receive_json(), WS_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                await websocket.close(code=1000, reason="idle timeout")
+                break
+            except (JSONDecodeError, KeyError):
+                # receive_json raises KeyError on a binary frame
+                await send({"type": "error", "id": None, "error": "Invalid JSON message"})
+                continue
+
+            message_id = data.get("id") if isinstance(data, dict) else None
+            text = data.get("message") if isinstance(data, dict) else None
+            if not isinstance(text, str) or not text.strip():
+                await send({"type": "error", "id": message_id, "error": "Missing 'message'"})
+                continue
+
+            try:
+                queue.put_nowait((message_id, text))
+            except asyncio.QueueFull:
+                # Backpressure: this client already has enough waiting
+                WS_MESSAGES.labels("rejected").inc()
+                await send({"type": "error", "id": message_id, "error": "Too many pending messages",
+                            "response": BUSY_REPLY})
+                continue
+            await send({"type": "ack", "id": message_id})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        worker.cancel()
+        ws_connections.discard(websocket)
+
+
+async def _answer_socket_message(send, user_id, message_id, text):
+    item = (user_id, text)
+    try:
+        analysis = await classify_batcher.submit(item)
+    except PoolSaturatedError:
+        WS_MESSAGES.labels("busy").inc()
+        await send({"type": "error", "id": message_id, "error": "Server busy", "response": BUSY_REPLY})
+        return
+
+    # FAQ / small talk / low confidence: the reply is already known
+    preview, intent, final = preview_reply(analysis)
+    await send({"type": "reply" if final else "status", "id": message_id,
+                "response": preview, "intent": intent})
+    if final:
+        WS_MESSAGES.labels("answered").inc()
+    if analysis is None:
+        return
+
+    # Context, personalisation and logging
+    try:
+        reply = (await pool.run(finalize_responses, [item], [analysis]))[0]
+    except PoolSaturatedError:
+        # A final reply was already sent: only the log entry is lost
+        if not final:
+            WS_MESSAGES.labels("busy").inc()
+            await send({"type": "error", "id": message_id, "error": "Server busy", "response": BUSY_REPLY})
+        return
+    if not final:
+        await send({"type": "reply", "id": message_id, "response": reply, "intent": intent})
+        WS_MESSAGES.labels("answered").inc()
+
+
 @app.get("/")
 def root():
     return {"message": "Chatbot backend is running! Visit /docs for API testing."}
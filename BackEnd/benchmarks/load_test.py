@@ -0,0 +1,458 @@
+# backend/benchmarks/load_test.py
+"""
+End-to-end load test for the FastAPI app.
+
+Starts the app (in this process, or as a local uvicorn with N workers),
+replays a message stream against /chat at a Poisson arrival rate across
+many user_ids, and reports throughput, latency percentiles, error rate and
+server RSS over time. Ramp through several rates to find the saturation
+point:
+
+    cd backend
+    python -m benchmarks.load_test --rate 50 --duration 30
+    python -m benchmarks.load_test --server uvicorn --workers 4 --ramp 50,100,200,400 --duration 20
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --rate 100     # already running
+    python -m benchmarks.load_test --source log --since 2026-10-01            # replay recorded traffic
+    python -m benchmarks.load_test --source file --path messages.jsonl
+
+Messages come from data/intents.csv (synthetic), the Parquet interaction
+log, or a CSV/JSONL file with `message` (or `query`) and optional `user_id`.
+Servers started here log to a temp dir (CHATBOT_LOG_DIR) unless
+--keep-logs is given.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+INTENTS_PATH = os.path.join(BACKEND_DIR, "data/intents.csv")
+RSS_INTERVAL = 1.0
+STARTUP_TIMEOUT = 120
+
+
+# ===============================
+# 📥 Message streams
+# ===============================
+def synthetic_messages(users, seed=42):
+    """
+    Endless stream of (user_id, message) from intents.csv over `users` ids.
+    """
+    with open(INTENTS_PATH, "r", encoding="utf-8") as f:
+        texts = [row["query"] for row in csv.DictReader(f) if row.get("query")]
+    rng = random.Random(seed)
+    while True:
+        yield f"load-user-{rng.randrange(users)}", rng.choice(texts)
+
+
+def recorded_messages(rows, users, seed=42):
+    """
+    Cycles through recorded rows. Rows without a user_id get a synthetic one.
+    """
+    rng = random.Random(seed)
+    while True:
+        for user_id, message in rows:
+            yield user_id or f"load-user-{rng.randrange(users)}", message
+
+
+def read_log_rows(since=None, until=None):
+    from nlp import log_store
+
+    table = log_store.read_table(columns=["timestamp", "user_id", "query"], since=since, until=until)
+    table = table.sort_by("timestamp")
+    return [
+        (user_id, query)
+        for user_id, query in zip(table["user_id"].to_pylist(), table["query"].to_pylist())
+        if query
+    ]
+
+
+def read_file_rows(path):
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        for record in records:
+            message = record.get("message") or record.get("query")
+            if message:
+                rows.append((record.get("user_id"), message))
+    return rows
+
+
+# ===============================
+# 🖥️ Server under test
+# ===============================
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class InProcessServer:
+    """
+    uvicorn in a background thread of this process (RSS includes the load
+    generator itself).
+    """
+
+    def __init__(self, port):
+        import uvicorn
+
+        from app import app
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, name="uvicorn", daemon=True)
+        self.url = f"http://127.0.0.1:{port}"
+
+    def start(self):
+        self.thread.start()
+
+    def pids(self):
+        return [os.getpid()]
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+
+class UvicornProcess:
+    """
+    `uvicorn app:app --workers N` as a child process.
+    """
+
+    def __init__(self, port, workers, env):
+        self.command = [
+            sys.executable, "-m", "uvicorn", "app:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ]
+        self.env = env
+        self.process = None
+        self.url = f"http://127.0.0.1:{port}"
+
+    def start(self):
+        self.process = subprocess.Popen(self.command, cwd=BACKEND_DIR, env=self.env)
+
+    def pids(self):
+        # The supervisor plus every worker process under it
+        return [self.process.pid] + _descendants(self.process.pid)
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class ExternalServer:
+    def __init__(self, url, pids=()):
+        self.url = url.rstrip("/")
+        self._pids = list(pids)
+
+    def start(self):
+        pass
+
+    def pids(self):
+        return self._pids
+
+    def stop(self):
+        pass
+
+
+def _descendants(pid):
+    try:
+        import psutil
+        return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+    except ImportError:
+        pass
+    except Exception:
+        return []
+
+    # /proc fallback: walk the parent links
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat", "r") as f:
+                    parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    found, frontier = [], [pid]
+    while frontier:
+        current = frontier.pop()
+        children = [child for child, parent in parents.items() if parent == current]
+        found.extend(children)
+        frontier.extend(children)
+    return found
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / 2 ** 20
+    except Exception:
+        return None
+
+
+async def wait_until_ready(client, url, timeout=STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(f"{url}/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready within {timeout}s")
+
+
+# ===============================
+# 🚦 Load generation
+# ===============================
+async def _sample_rss(server, started, samples, stop):
+    while not stop.is_set():
+        pids = server.pids()
+        sample = {"t": round(time.monotonic() - started, 2)}
+        for pid in pids:
+            rss = rss_mb(pid)
+            if rss is not None:
+                sample[str(pid)] = round(rss, 1)
+        samples.append(sample)
+        try:
+            await asyncio.wait_for(stop.wait(), RSS_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_step(client, url, messages, rate, duration, concurrency, seed=0):
+    """
+    Open-loop Poisson arrivals at `rate` req/s for `duration` seconds, with
+    at most `concurrency` requests in flight (arrivals beyond that wait, and
+    count as client-side queueing in the latency). rate <= 0 means closed
+    loop: `concurrency` users sending back to back.
+    """
+    rng = random.Random(seed)
+    latencies, statuses = [], {}
+    limiter = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    async def send(user_id, message, scheduled_at):
+        async with limiter:
+            try:
+                response = await client.post(f"{url}/chat", json={"user_id": user_id, "message": message})
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 200:
+            latencies.append(time.perf_counter() - scheduled_at)
+
+    started = time.perf_counter()
+    deadline = started + duration
+
+    if rate > 0:
+        next_at = started
+        while True:
+            next_at += rng.expovariate(rate)
+            if next_at >= deadline:
+                break
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            user_id, message = next(messages)
+            task = asyncio.ensure_future(send(user_id, message, next_at))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*list(tasks))
+    else:
+        async def closed_loop_user():
+            while time.perf_counter() < deadline:
+                user_id, message = next(messages)
+                await send(user_id, message, time.perf_counter())
+        await asyncio.gather(*[closed_loop_user() for _ in range(concurrency)])
+
+    elapsed = time.perf_counter() - started
+    return summarize(rate, elapsed, latencies, statuses)
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def summarize(rate, elapsed, latencies, statuses):
+    latencies = sorted(latencies)
+    total = sum(statuses.values())
+    ok = statuses.get(200, 0)
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "target_rate": rate,
+        "requests": total,
+        "ok": ok,
+        "busy_503": statuses.get(503, 0),
+        "error_rate": round((total - ok) / total, 4) if total else 0.0,
+        "throughput": round(ok / elapsed, 1),
+        "p50_ms": ms(_percentile(latencies, 50)),
+        "p95_ms": ms(_percentile(latencies, 95)),
+        "p99_ms": ms(_percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+        "statuses": {str(k): v for k, v in statuses.items()},
+    }
+
+
+async def run_load_test(server, messages, rates, duration, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+        await wait_until_ready(client, server.url)
+
+        started = time.monotonic()
+        rss_samples, stop = [], asyncio.Event()
+        sampler = asyncio.ensure_future(_sample_rss(server, started, rss_samples, stop))
+
+        steps = []
+        print_step_header()
+        for i, rate in enumerate(rates):
+            step = await run_step(client, server.url, messages, rate, duration, concurrency, seed=i)
+            step["rss_mb"] = _latest_rss(rss_samples)
+            steps.append(step)
+            print_step(step)
+
+        stop.set()
+        await sampler
+    return steps, rss_samples
+
+
+def _latest_rss(samples):
+    if not samples:
+        return {}
+    return {pid: value for pid, value in samples[-1].items() if pid != "t"}
+
+
+# ===============================
+# 📊 Reporting
+# ===============================
+def print_step_header():
+    print(f"{'rate/s':>8}{'sent':>8}{'ok/s':>9}{'503':>7}{'err %':>8}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'RSS MB':>10}")
+
+
+def print_step(step):
+    def fmt(value):
+        return f"{value:.1f}" if value is not None else "-"
+
+    rate = step["target_rate"] if step["target_rate"] > 0 else "closed"
+    rss = sum(step["rss_mb"].values()) if step["rss_mb"] else None
+    print(f"{rate:>8}{step['requests']:>8}{step['throughput']:>9.1f}{step['busy_503']:>7}"
+          f"{step['error_rate'] * 100:>8.2f}{fmt(step['p50_ms']):>9}{fmt(step['p95_ms']):>9}"
+          f"{fmt(step['p99_ms']):>9}{fmt(step['max_ms']):>9}{fmt(rss):>10}")
+
+
+def print_rss(samples):
+    if len(samples) < 2:
+        return
+    first, last = samples[0], samples[-1]
+    print(f"\n🧠 RSS over {last['t']:.0f}s (MB, per process):")
+    for pid in [key for key in last if key != "t"]:
+        start = first.get(pid)
+        peak = max(sample.get(pid, 0) for sample in samples)
+        growth = f"{last[pid] - start:+.1f}" if start is not None else "n/a"
+        print(f"  pid {pid:<8} start {start if start is not None else '-':>8}  "
+              f"end {last[pid]:>8.1f}  peak {peak:>8.1f}  growth {growth}")
+
+
+def saturation_point(steps, max_error_rate=0.01):
+    """
+    Highest target rate served with < max_error_rate errors and throughput
+    within 10% of the target.
+    """
+    best = None
+    for step in steps:
+        if step["target_rate"] > 0 and step["error_rate"] < max_error_rate \
+                and step["throughput"] >= 0.9 * step["target_rate"]:
+            best = step["target_rate"]
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the chatbot API")
+    parser.add_argument("--server", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--url", help="test an already running server instead")
+    parser.add_argument("--pids", type=int, nargs="*", default=(), help="server pids to sample RSS for (--url)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--rate", type=float, default=50.0, help="requests/s (0 = closed loop)")
+    parser.add_argument("--ramp", help="comma-separated rates to run one after another")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per rate step")
+    parser.add_argument("--concurrency", type=int, default=256, help="max requests in flight")
+    parser.add_argument("--users", type=int, default=10000, help="distinct user_ids")
+    parser.add_argument("--source", choices=["synthetic", "log", "file"], default="synthetic")
+    parser.add_argument("--path", help="CSV/JSONL for --source file")
+    parser.add_argument("--since", help="first day for --source log (YYYY-MM-DD)")
+    parser.add_argument("--until", help="last day for --source log (YYYY-MM-DD)")
+    parser.add_argument("--keep-logs", action="store_true", help="let the server write to the real logs/")
+    parser.add_argument("--json", help="write steps and RSS samples to this file")
+    args = parser.parse_args()
+
+    if args.source == "log":
+        messages = recorded_messages(read_log_rows(args.since, args.until), args.users)
+    elif args.source == "file":
+        messages = recorded_messages(read_file_rows(args.path), args.users)
+    else:
+        messages = synthetic_messages(args.users)
+
+    log_dir = None
+    if not args.url and not args.keep_logs:
+        log_dir = tempfile.mkdtemp(prefix="chatbot-load-logs-")
+        os.environ["CHATBOT_LOG_DIR"] = log_dir     # before the app is imported / spawned
+
+    if args.url:
+        server = ExternalServer(args.url, args.pids)
+    elif args.server == "uvicorn":
+        server = UvicornProcess(_free_port(), args.workers, dict(os.environ))
+    else:
+        server = InProcessServer(_free_port())
+
+    rates = [float(r) for r in args.ramp.split(",")] if args.ramp else [args.rate]
+    server.start()
+    try:
+        steps, rss_samples = asyncio.run(
+            run_load_test(server, messages, rates, args.duration, args.concurrency)
+        )
+    finally:
+        server.stop()
+
+    print_rss(rss_samples)
+    saturation = saturation_point(steps)
+    if len(steps) > 1:
+        print(f"\n🚦 Highest rate sustained (<1% errors, ≥90% of target): {saturation or 'none'}")
+    if log_dir:
+        print(f"📝 Server logs written to {log_dir}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"steps": steps, "rss": rss_samples, "saturation_rate": saturation}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
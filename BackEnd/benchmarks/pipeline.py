@@ -0,0 +1,343 @@
+# backend/benchmarks/pipeline.py
+"""
+Micro-benchmarks for every NLP pipeline stage.
+
+Inputs are the real queries from data/intents.csv and
+data/customer_queries.csv (shuffled, fixed seed), spread over the known
+user profiles plus synthetic user ids. Each stage is timed per call
+(single message) and per batch, reporting p50/p95/p99, throughput, and
+allocations (tracemalloc, in a separate pass so tracing doesn't skew the
+timings).
+
+    cd backend
+    python -m benchmarks.pipeline --output bench.json
+    python -m benchmarks.pipeline --output bench.json --compare baseline.json
+    python -m benchmarks.pipeline --quick --stages predict_intent generate_response
+
+--compare exits with status 1 when a p50/p95 got slower (or throughput
+dropped) by more than --tolerance, so it can gate a deploy.
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from nlp import logger, log_store                               # noqa: E402
+from nlp.log_writer import BufferedLogWriter, RotatingFileSink  # noqa: E402
+from nlp.model_registry import load_models                      # noqa: E402
+from nlp.preprocess import clean_text                           # noqa: E402
+from nlp.knowledge_base import query_knowledge_base, query_knowledge_base_batch  # noqa: E402
+from nlp.intent_model import predict_intent, predict_intent_batch                # noqa: E402
+from nlp.entity_model import extract_entities, extract_entities_batch           # noqa: E402
+from nlp.personalization import personalize_response, load_user_profiles        # noqa: E402
+from nlp import response_manager                                                # noqa: E402
+
+DATA_FILES = [
+    os.path.join(BACKEND_DIR, "data/intents.csv"),
+    os.path.join(BACKEND_DIR, "data/customer_queries.csv"),
+]
+SYNTHETIC_USERS = 1000
+PERCENTILES = (50, 95, 99)
+COMPARED_STATS = ("p50_us", "p95_us")
+
+
+# ===============================
+# 📥 Inputs
+# ===============================
+def load_inputs(seed=42):
+    """
+    [(user_id, text)] built from the query columns of the data files.
+    """
+    texts = []
+    for path in DATA_FILES:
+        with open(path, "r", encoding="utf-8") as f:
+            texts.extend(row["query"] for row in csv.DictReader(f) if row.get("query"))
+
+    users = list(load_user_profiles()) + [f"user{i}" for i in range(SYNTHETIC_USERS)]
+    rng = random.Random(seed)
+    rng.shuffle(texts)
+    return [(rng.choice(users), text) for text in texts]
+
+
+def _redirect_logs(directory):
+    """
+    Points the interaction logger at `directory` (benchmarks must not write
+    into the real log). Returns the original writer.
+    """
+    if log_store.available():
+        sink = log_store.PartitionedParquetSink(root=directory)
+    else:
+        sink = RotatingFileSink(os.path.join(directory, "chatbot_logs.csv"), logger._format_rows)
+    original, logger._writer = logger._writer, BufferedLogWriter(sink)
+    return original
+
+
+# ===============================
+# 🧪 Stages
+# ===============================
+# name -> (single(user_id, text), batch(items)); items are [(user_id, text)]
+def _generate_uncached(user_id, text):
+    response_manager.response_cache.clear()
+    return response_manager.generate_response(user_id, text)
+
+
+def _generate_uncached_batch(items):
+    response_manager.response_cache.clear()
+    return response_manager.generate_responses(items)
+
+
+STAGES = {
+    "clean_text": (
+        lambda user_id, text: clean_text(text),
+        lambda items: [clean_text(text) for _, text in items],
+    ),
+    "query_knowledge_base": (
+        lambda user_id, text: query_knowledge_base(text),
+        lambda items: query_knowledge_base_batch([text for _, text in items]),
+    ),
+    "predict_intent": (
+        lambda user_id, text: predict_intent(text),
+        lambda items: predict_intent_batch([text for _, text in items]),
+    ),
+    "extract_entities": (
+        lambda user_id, text: extract_entities(text),
+        lambda items: extract_entities_batch([text for _, text in items]),
+    ),
+    "personalize_response": (
+        lambda user_id, text: personalize_response(user_id, "track_order", "Let me check your order status."),
+        lambda items: [
+            personalize_response(user_id, "track_order", "Let me check your order status.")
+            for user_id, _ in items
+        ],
+    ),
+    "log_interaction": (
+        lambda user_id, text: logger.log_interaction(user_id, text, "ok", "track_order"),
+        lambda items: logger.log_interactions([(user_id, text, "ok", "track_order") for user_id, text in items]),
+    ),
+    # Cache primed with every input first: the repeated-question path
+    "generate_response": (
+        response_manager.generate_response,
+        response_manager.generate_responses,
+    ),
+    # Every call goes through all model stages
+    "generate_response_uncached": (_generate_uncached, _generate_uncached_batch),
+}
+
+
+# ===============================
+# ⏱️ Measurement
+# ===============================
+def _percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _calls(inputs, batch_size, count):
+    """
+    `count` call arguments, cycling through the inputs.
+    """
+    calls = []
+    position = 0
+    for _ in range(count):
+        if batch_size:
+            items = [inputs[(position + i) % len(inputs)] for i in range(batch_size)]
+            calls.append((items,))
+            position += batch_size
+        else:
+            calls.append(inputs[position % len(inputs)])
+            position += 1
+    return calls
+
+
+def measure(func, inputs, iterations, batch_size=0, warmup=50, alloc_calls=200):
+    """
+    Times `iterations` calls of func. Latencies are per call (per batch
+    when batch_size is set); throughput is messages per second.
+    """
+    for args in _calls(inputs, batch_size, warmup):
+        func(*args)
+
+    calls = _calls(inputs, batch_size, iterations)
+    durations = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()    # keep collector pauses out of individual samples
+    try:
+        started = time.perf_counter()
+        for args in calls:
+            t0 = time.perf_counter_ns()
+            func(*args)
+            durations.append(time.perf_counter_ns() - t0)
+        elapsed = time.perf_counter() - started
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # Allocation pass (tracemalloc slows everything down, so it runs apart)
+    alloc = _calls(inputs, batch_size, alloc_calls)
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for args in alloc:
+        func(*args)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations.sort()
+    messages = iterations * (batch_size or 1)
+    result = {
+        "calls": iterations,
+        "batch_size": batch_size or 1,
+        "mean_us": sum(durations) / len(durations) / 1000,
+        "throughput_per_s": messages / elapsed,
+        "alloc_peak_kb": (peak - before) / 1024,
+        "alloc_retained_bytes_per_call": (after - before) / alloc_calls,
+    }
+    for p in PERCENTILES:
+        result[f"p{p}_us"] = _percentile(durations, p) / 1000
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True,
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmarks(stages=None, iterations=2000, batch_size=32, batch_iterations=100):
+    inputs = load_inputs()
+    load_models()
+
+    with tempfile.TemporaryDirectory(prefix="chatbot-bench-") as log_dir:
+        original_writer = _redirect_logs(log_dir)
+        try:
+            results = _run_stages(stages, inputs, iterations, batch_size, batch_iterations)
+        finally:
+            # Flush into the temp dir before it is removed
+            logger._writer.close()
+            logger._writer = original_writer
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "inputs": len(inputs),
+            "iterations": iterations,
+            "batch_size": batch_size,
+        },
+        "results": results,
+    }
+
+
+def _run_stages(stages, inputs, iterations, batch_size, batch_iterations):
+    results = {}
+    for name in stages or STAGES:
+        single, batch = STAGES[name]
+        uncached = name.endswith("_uncached")
+        if name == "generate_response":
+            response_manager.generate_responses(inputs)
+
+        results[f"{name}/single"] = measure(single, inputs, iterations // 10 if uncached else iterations)
+        print_result(f"{name}/single", results[f"{name}/single"])
+        if batch_size > 1:
+            key = f"{name}/batch{batch_size}"
+            results[key] = measure(batch, inputs, batch_iterations, batch_size, warmup=5, alloc_calls=20)
+            print_result(key, results[key])
+    return results
+
+
+# ===============================
+# 📊 Reporting
+# ===============================
+_printed_header = False
+
+
+def print_result(name, r):
+    global _printed_header
+    if not _printed_header:
+        print(f"{'benchmark':<40}{'p50 µs':>10}{'p95 µs':>10}{'p99 µs':>10}{'msgs/s':>12}"
+              f"{'peak KB':>10}{'B/call':>10}")
+        _printed_header = True
+    print(f"{name:<40}{r['p50_us']:>10.1f}{r['p95_us']:>10.1f}{r['p99_us']:>10.1f}"
+          f"{r['throughput_per_s']:>12.0f}{r['alloc_peak_kb']:>10.1f}"
+          f"{r['alloc_retained_bytes_per_call']:>10.0f}")
+
+
+def compare(current, baseline, tolerance=0.10):
+    """
+    Prints the change against a baseline run and returns the regressions.
+    """
+    regressions = []
+    print(f"\n===== Compared with baseline {baseline['meta'].get('commit')} "
+          f"({baseline['meta'].get('created_at')}), tolerance {tolerance:.0%} =====")
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"  {name:<40} (new)")
+            continue
+
+        changes = []
+        for stat in COMPARED_STATS:
+            change = now[stat] / before[stat] - 1 if before[stat] else 0.0
+            changes.append(f"{stat} {change:+.1%}")
+            if change > tolerance:
+                regressions.append((name, stat, before[stat], now[stat]))
+        change = now["throughput_per_s"] / before["throughput_per_s"] - 1
+        changes.append(f"throughput {change:+.1%}")
+        if change < -tolerance:
+            regressions.append((name, "throughput_per_s", before["throughput_per_s"], now["throughput_per_s"]))
+        print(f"  {name:<40} " + ", ".join(changes))
+
+    if regressions:
+        print("\n❌ Regressions:")
+        for name, stat, before, now in regressions:
+            print(f"  {name} {stat}: {before:.1f} → {now:.1f}")
+    else:
+        print("\n✅ No regressions")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the NLP pipeline stages")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="stages to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=2000, help="single-message calls per stage")
+    parser.add_argument("--batch-size", type=int, default=32, help="0/1 to skip batched runs")
+    parser.add_argument("--batch-iterations", type=int, default=100)
+    parser.add_argument("--quick", action="store_true", help="10x fewer iterations")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.iterations //= 10
+        args.batch_iterations = max(10, args.batch_iterations // 10)
+
+    report = run_benchmarks(args.stages, args.iterations, args.batch_size, args.batch_iterations)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
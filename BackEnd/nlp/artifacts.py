@@ -0,0 +1,253 @@
+# backend/nlp/artifacts.py
+"""
+On-disk format for the numeric parts of model artifacts, shared between
+worker processes.
+
+An artifact is a directory with manifest.json and one .npy file per array.
+np.save pads the .npy header so the data starts on a 64-byte boundary, and
+load_arrays opens every file with mmap_mode="r". The pages live in the OS
+page cache, so all workers on a host map one copy instead of each holding
+its own unpickled arrays.
+
+    cd backend
+    python -m nlp.artifacts                 # memory report for this process
+    python -m nlp.artifacts --workers 4     # ... in 4 separate worker processes
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(__file__)
+MODELS_DIR = os.path.abspath(os.path.join(BASE_DIR, "../models"))
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+# CHATBOT_MMAP_ARTIFACTS=0 reads the arrays into private memory instead
+USE_MMAP = os.environ.get("CHATBOT_MMAP_ARTIFACTS", "1") != "0"
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def manifest_path(directory):
+    return os.path.join(directory, MANIFEST)
+
+
+# ===============================
+# 💾 Save / load
+# ===============================
+def save_arrays(directory, arrays, meta=None):
+    """
+    Writes `arrays` ({name: ndarray}, no object dtypes) and `meta` (JSON)
+    as an artifact directory. The directory is built next to the target and
+    renamed into place, so readers see the old or the new artifact, never a
+    mix (a reader that looks in between the two renames finds nothing and
+    retries on its next check).
+    """
+    tmp_dir = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    entries = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise TypeError(f"Array '{name}' has dtype object and cannot be memory-mapped")
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array, allow_pickle=False)
+        entries[name] = {"file": f"{name}.npy", "dtype": array.dtype.str, "shape": list(array.shape)}
+
+    with open(manifest_path(tmp_dir), "w", encoding="utf-8") as f:
+        json.dump({"format_version": FORMAT_VERSION, "arrays": entries, "meta": meta or {}}, f, indent=2)
+    _swap_in(tmp_dir, directory)
+
+
+def _swap_in(tmp_dir, directory):
+    old_dir = None
+    if os.path.exists(directory):
+        # Mapped files of the old artifact stay valid until workers drop them
+        old_dir = f"{directory}.old-{os.getpid()}"
+        os.rename(directory, old_dir)
+    os.rename(tmp_dir, directory)
+    if old_dir:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def load_arrays(directory, mmap=USE_MMAP):
+    """
+    ({name: read-only array}, meta) from an artifact directory.
+    """
+    path = manifest_path(directory)
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{directory} has an unsupported artifact format")
+
+    arrays = {}
+    for name, entry in manifest["arrays"].items():
+        array = np.load(os.path.join(directory, entry["file"]), mmap_mode="r" if mmap else None,
+                        allow_pickle=False)
+        if array.dtype.str != entry["dtype"] or list(array.shape) != entry["shape"]:
+            raise ValueError(f"{directory}/{entry['file']} does not match the manifest")
+        # Plain ndarray view (np.memmap slicing is slower); the mapping stays open
+        arrays[name] = array.view(np.ndarray)
+    return arrays, manifest["meta"]
+
+
+def artifact_bytes(directory):
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for name in os.listdir(directory)
+    )
+
+
+class StringTable:
+    """
+    Read-only list of strings stored as one UTF-8 buffer plus offsets, so
+    text (FAQ questions, answers) can be memory-mapped like other arrays.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @staticmethod
+    def pack(strings):
+        """
+        (blob, offsets) arrays for `strings`.
+        """
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def tolist(self):
+        return list(self)
+
+
+# ===============================
+# 📊 Memory report
+# ===============================
+def memory_usage(pid="self", prefix=MODELS_DIR):
+    """
+    kB of resident memory for a process from /proc/<pid>/smaps: totals, and
+    the mappings of files under `prefix` (the model artifacts). Shared_* is
+    memory also mapped by another process; Private_* is this process's own.
+    Returns None where /proc is not available.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps", "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    totals = dict.fromkeys(SMAPS_FIELDS, 0)
+    artifacts = dict.fromkeys(SMAPS_FIELDS, 0)
+    in_artifact = False
+    for line in lines:
+        field, _, rest = line.partition(":")
+        if field in totals:
+            kb = int(rest.split()[0])
+            totals[field] += kb
+            if in_artifact:
+                artifacts[field] += kb
+        elif "-" in field and " " in line:
+            # Mapping header: "start-end perms offset dev inode [path]"
+            parts = line.split(None, 5)
+            in_artifact = len(parts) == 6 and parts[5].strip().startswith(prefix)
+
+    def summary(values):
+        return {
+            "rss_kb": values["Rss"],
+            "pss_kb": values["Pss"],
+            "shared_kb": values["Shared_Clean"] + values["Shared_Dirty"],
+            "private_kb": values["Private_Clean"] + values["Private_Dirty"],
+        }
+
+    return {"total": summary(totals), "artifacts": summary(artifacts)}
+
+
+def _load_and_warm():
+    # Importing the pipeline registers every model loader
+    from nlp.model_registry import load_models, load_timings
+    from nlp.response_manager import generate_responses
+
+    load_models()
+    generate_responses([("guest", "where is my order"), ("guest", "how do refunds work")])
+    return load_timings()
+
+
+def _report_worker(ready, release):
+    # Load and warm every model, then wait so all workers are measured together
+    _load_and_warm()
+    ready.put(os.getpid())
+    release.wait()  # set by the parent after it has read every worker's smaps
+
+
+def print_report(rows):
+    print(f"{'process':<12}{'RSS MB':>10}{'PSS MB':>10}{'shared MB':>12}{'private MB':>12}"
+          f"{'models shared MB':>18}{'models private MB':>19}")
+    for label, usage in rows:
+        total, mapped = usage["total"], usage["artifacts"]
+        print(f"{label:<12}{total['rss_kb'] / 1024:>10.1f}{total['pss_kb'] / 1024:>10.1f}"
+              f"{total['shared_kb'] / 1024:>12.1f}{total['private_kb'] / 1024:>12.1f}"
+              f"{mapped['shared_kb'] / 1024:>18.1f}{mapped['private_kb'] / 1024:>19.1f}")
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    import queue as queue_module
+
+    sys.path.insert(0, os.path.join(BASE_DIR, ".."))
+
+    parser = argparse.ArgumentParser(description="Shared vs private memory of loaded models")
+    parser.add_argument("--workers", type=int, default=0, help="start this many loader processes")
+    args = parser.parse_args()
+
+    if memory_usage() is None:
+        sys.exit("⚠️ /proc/<pid>/smaps is not available on this platform")
+
+    if not args.workers:
+        for name, seconds in _load_and_warm().items():
+            print(f"✅ Loaded '{name}' in {seconds * 1000:.1f} ms")
+        print_report([("this", memory_usage())])
+        sys.exit(0)
+
+    # spawn, so no worker inherits pages from a parent that loaded the models
+    context = multiprocessing.get_context("spawn")
+    ready, release = context.Queue(), context.Event()
+    workers = [context.Process(target=_report_worker, args=(ready, release)) for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+
+    pids = []
+    while len(pids) < len(workers):
+        try:
+            pids.append(ready.get(timeout=1))
+        except queue_module.Empty:
+            failed = [worker for worker in workers if not worker.is_alive()]
+            if failed:
+                for other in workers:
+                    other.terminate()
+                sys.exit(f"❌ Worker exited with code {failed[0].exitcode} before loading the models")
+
+    rows = [(f"worker {i + 1}", memory_usage(pid)) for i, pid in enumerate(sorted(pids))]
+    release.set()
+    for worker in workers:
+        worker.join()
+
+    print_report(rows)
+    print(f"\nmmap artifacts: {'on' if USE_MMAP else 'off (CHATBOT_MMAP_ARTIFACTS=0)'}. "
+          f"PSS splits shared pages evenly between the processes mapping them.")
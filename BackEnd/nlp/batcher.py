@@ -0,0 +1,93 @@
+# backend/nlp/batcher.py
+import asyncio
+import os
+
+# ------------------------------------------------------
+# Configuration (environment overrides)
+# ------------------------------------------------------
+DEFAULT_MAX_BATCH_SIZE = int(os.environ.get("CHATBOT_BATCH_SIZE", "32"))
+DEFAULT_MAX_WAIT_MS = float(os.environ.get("CHATBOT_BATCH_WAIT_MS", "5"))
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into one call of `process_batch`.
+
+    Items submitted within `max_wait_ms` of the first pending item (or until
+    `max_batch_size` items are pending) are sent to the worker pool together;
+    each caller gets back the result at its own position. A batch size of 1
+    disables batching and submits every item on its own.
+    """
+
+    def __init__(self, pool, process_batch,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.pool = pool
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+
+        self._pending = []      # [(item, future)]
+        self._timer = None
+        self._tasks = set()     # keeps in-flight batch tasks referenced
+
+        self._batches = 0
+        self._items = 0
+
+    async def submit(self, item):
+        """
+        Queue one item and wait for its result.
+        """
+        if self.max_batch_size == 1:
+            self._batches += 1
+            self._items += 1
+            return (await self.pool.run(self.process_batch, [item]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        self._batches += 1
+        self._items += len(batch)
+        try:
+            results = await self.pool.run(self.process_batch, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # The caller may have gone away (client disconnect)
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "pending": len(self._pending),
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+        }
@@ -0,0 +1,343 @@
+# backend/nlp/bulk_score.py
+"""
+Offline bulk classification of a query file.
+
+Streams a CSV or JSONL file of queries in chunks through a process pool
+(each worker loads the FAQ index, intent engine, gazetteer and entity model
+once) and writes one result per input row, in input order, as CSV or JSONL:
+FAQ answer, intent with confidence, and entities. At most --max-in-flight
+chunks are queued or running at any time, so memory stays flat however
+large the input is; results are flushed chunk by chunk.
+
+    cd backend
+    python -m nlp.bulk_score tickets.csv scored.jsonl
+    python -m nlp.bulk_score tickets.jsonl scored.csv --workers 8 --chunk-size 2000
+    python -m nlp.bulk_score tickets.csv scored.jsonl --resume      # continue an interrupted run
+
+Input rows need a `query` (or `message` / `text`, or --text-column)
+field; `id` (or --id-column) is copied to the output, else the row number is.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(__file__)
+
+TEXT_COLUMNS = ("query", "message", "text")
+OUTPUT_COLUMNS = ["id", "query", "faq_answer", "intent", "confidence", "entities"]
+CHUNK_SIZE = 1000
+CONFIDENCE_THRESHOLD = 0.55     # predict_intent's default; below it the intent is "uncertain"
+PROGRESS_SECONDS = 10.0
+MODELS = ["faq", "intent", "gazetteer", "entity"]
+
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+
+# ===============================
+# 🧮 Scoring (runs in the workers)
+# ===============================
+def _init_worker():
+    # Importing the stage modules registers their loaders
+    import nlp.entity_model, nlp.intent_model, nlp.knowledge_base     # noqa: F401
+    from nlp.model_registry import load_models
+
+    load_models(MODELS)
+
+
+def score_chunk(texts, with_entities=True, threshold=CONFIDENCE_THRESHOLD):
+    """
+    (faq_answer, intent, confidence, entities) for each text: one FAQ batch
+    lookup, one intent predict_proba and one entity batch for the chunk.
+    Repeated texts (common in ticket exports) are scored once.
+    """
+    unique = list(dict.fromkeys(texts))
+    if len(unique) < len(texts):
+        scored = dict(zip(unique, score_chunk(unique, with_entities, threshold)))
+        return [scored[text] for text in texts]
+
+    from nlp.entity_model import extract_entities_batch
+    from nlp.knowledge_base import query_knowledge_base_batch
+    from nlp.model_registry import get_model
+
+    faq_answers = query_knowledge_base_batch(texts)
+
+    model = get_model("intent")
+    probs = model.predict_proba(texts)
+    best = probs.argmax(axis=1)
+    confidence = probs[np.arange(len(texts)), best]
+    classes = [str(c) for c in model.classes_]
+
+    entities = extract_entities_batch(texts) if with_entities else [None] * len(texts)
+    return [
+        (faq_answers[i], classes[best[i]] if confidence[i] >= threshold else "uncertain",
+         round(float(confidence[i]), 4), entities[i])
+        for i in range(len(texts))
+    ]
+
+
+def _score_chunk_safe(texts, with_entities, threshold):
+    """
+    (results, failed rows, first error) for a chunk. One bad row must not
+    lose the whole chunk: on failure the chunk is retried row by row and
+    rows that still fail get the intent "error".
+    """
+    try:
+        return score_chunk(texts, with_entities, threshold), 0, None
+    except Exception:
+        results = []
+        failed = 0
+        first_error = None
+        for text in texts:
+            try:
+                results.extend(score_chunk([text], with_entities, threshold))
+            except Exception as e:
+                failed += 1
+                first_error = first_error or f"{type(e).__name__}: {e}"
+                results.append((None, "error", 0.0, None))
+        return results, failed, first_error
+
+
+# ===============================
+# 📥 Input / 📤 output
+# ===============================
+def read_rows(f, path, text_column=None, id_column="id"):
+    """
+    Streams (row_id, text) from an open CSV / JSONL file.
+    """
+    records = (json.loads(line) for line in f if line.strip()) if path.endswith(".jsonl") else csv.DictReader(f)
+    for number, record in enumerate(records, 1):
+        if text_column:
+            text = record.get(text_column)
+        else:
+            text = next((record[c] for c in TEXT_COLUMNS if record.get(c) is not None), None)
+        row_id = record.get(id_column)
+        yield (number if row_id in (None, "") else row_id), "" if text is None else str(text)
+
+
+def _chunks(rows, size, skip=0):
+    chunk = []
+    for i, row in enumerate(rows):
+        if i < skip:
+            continue
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ResultWriter:
+    """
+    Appends scored rows to a CSV or JSONL file (chosen by extension).
+    """
+
+    def __init__(self, path, append=False):
+        self.jsonl = path.endswith(".jsonl")
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self.f = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        if not self.jsonl:
+            self.writer = csv.writer(self.f)
+            if not exists:
+                self.writer.writerow(OUTPUT_COLUMNS)
+
+    def write(self, rows, results):
+        for (row_id, text), (faq_answer, intent, confidence, entities) in zip(rows, results):
+            if self.jsonl:
+                self.f.write(json.dumps({
+                    "id": row_id, "query": text, "faq_answer": faq_answer,
+                    "intent": intent, "confidence": confidence, "entities": entities,
+                }, ensure_ascii=False) + "\n")
+            else:
+                self.writer.writerow([row_id, text, faq_answer or "", intent, confidence,
+                                      "" if entities is None else json.dumps(entities, ensure_ascii=False)])
+        # One flush per chunk: the file only ever ends on a whole chunk
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+def count_written(path):
+    """
+    Rows already in an output file (for --resume). A file cut off mid-row
+    is truncated back to the end of its last complete row.
+    """
+    if not os.path.exists(path):
+        return 0
+    if path.endswith(".jsonl"):
+        with open(path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+            return data.count(b"\n", 0, end)
+
+    # CSV records may span lines (quoted newlines): let csv.reader find the
+    # record boundaries while counting the bytes of the lines it consumed
+    with open(path, "rb+") as f:
+        consumed = 0
+        last_line = b""
+
+        def lines():
+            nonlocal consumed, last_line
+            for line in f:
+                consumed += len(line)
+                last_line = line
+                yield line.decode("utf-8", errors="replace")     # only a cut-off last line can fail
+
+        records = 0
+        end = 0
+        try:
+            for _ in csv.reader(lines(), strict=True):
+                if not last_line.endswith(b"\n"):
+                    break       # the writer ends every record with \r\n
+                records += 1
+                end = consumed
+        except csv.Error:
+            pass                # cut off inside a quoted field
+        if end < os.path.getsize(path):
+            f.truncate(end)
+    return max(0, records - 1)
+
+
+# ===============================
+# 🚚 Bulk run
+# ===============================
+def _format_seconds(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def bulk_score(source, out, workers=None, chunk_size=CHUNK_SIZE, max_in_flight=None,
+               with_entities=True, threshold=CONFIDENCE_THRESHOLD, text_column=None, id_column="id",
+               resume=False, progress_seconds=PROGRESS_SECONDS):
+    """
+    Scores every row of `source` into `out` and returns a summary dict.
+    workers=0 scores in this process (no pool).
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    max_in_flight = max_in_flight or 2 * max(1, workers)
+    skip = count_written(out) if resume else 0
+    if skip:
+        print(f"↩️ Resuming after {skip:,} rows already in {out}")
+
+    total_bytes = os.path.getsize(source)
+    intents = Counter()
+    faq_hits = 0
+    failed = 0
+    first_error = None
+    done = 0
+    position = 0
+    started = last_report = time.perf_counter()
+
+    def report(final=False):
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed else 0.0
+        line = f"{'✅' if final else '⏳'} {done:,} rows | {rate:,.0f} rows/s | {_format_seconds(elapsed)} elapsed"
+        if failed:
+            line += f" | {failed:,} failed"
+        if not final and total_bytes:
+            fraction = min(1.0, position / total_bytes)
+            line += f" | {fraction:.1%}"
+            if fraction > 0:
+                line += f" | ETA {_format_seconds(elapsed / fraction * (1 - fraction))}"
+        print(line, flush=True)
+
+    def collect(rows, scored, read_to):
+        # read_to: input bytes read when the chunk was submitted (approximate: read-ahead)
+        nonlocal done, faq_hits, failed, first_error, last_report, position
+        results, chunk_failed, chunk_error = scored
+        writer.write(rows, results)
+        failed += chunk_failed
+        first_error = first_error or chunk_error
+        position = read_to
+        intents.update(result[1] for result in results)
+        faq_hits += sum(result[0] is not None for result in results)
+        done += len(rows)
+        if time.perf_counter() - last_report >= progress_seconds:
+            last_report = time.perf_counter()
+            report()
+
+    pool = None
+    if workers > 0:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    else:
+        _init_worker()
+
+    writer = ResultWriter(out, append=resume)
+    try:
+        with open(source, "r", encoding="utf-8", newline="") as f:
+            chunks = _chunks(read_rows(f, source, text_column, id_column), chunk_size, skip)
+            if pool is None:
+                for rows in chunks:
+                    scored = _score_chunk_safe([text for _, text in rows], with_entities, threshold)
+                    collect(rows, scored, f.buffer.tell())
+            else:
+                # Bounded window of chunks; results are written in submission order
+                in_flight = deque()
+                for rows in chunks:
+                    in_flight.append((rows, f.buffer.tell(), pool.submit(
+                        _score_chunk_safe, [text for _, text in rows], with_entities, threshold,
+                    )))
+                    if len(in_flight) >= max_in_flight:
+                        rows, read_to, future = in_flight.popleft()
+                        collect(rows, future.result(), read_to)
+                while in_flight:
+                    rows, read_to, future = in_flight.popleft()
+                    collect(rows, future.result(), read_to)
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    report(final=True)
+    seconds = time.perf_counter() - started
+    return {
+        "rows": done,
+        "skipped": skip,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(done / seconds, 1) if seconds else 0.0,
+        "faq_answers": faq_hits,
+        "failed": failed,
+        "first_error": first_error,
+        "intents": dict(intents.most_common()),
+    }
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.join(BASE_DIR, ".."))
+
+    parser = argparse.ArgumentParser(description="Score a CSV / JSONL file of queries")
+    parser.add_argument("source")
+    parser.add_argument("out", help="output file (.jsonl or .csv)")
+    parser.add_argument("--workers", type=int, help="scoring processes (default: CPU count, 0 = this process)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--max-in-flight", type=int, help="chunks queued or running at once (default: 2 × workers)")
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument("--no-entities", action="store_true", help="skip entity extraction")
+    parser.add_argument("--text-column")
+    parser.add_argument("--id-column", default="id")
+    parser.add_argument("--resume", action="store_true", help="skip rows already in the output file and append")
+    parser.add_argument("--progress-seconds", type=float, default=PROGRESS_SECONDS)
+    args = parser.parse_args()
+
+    summary = bulk_score(
+        args.source, args.out, args.workers, args.chunk_size, args.max_in_flight,
+        not args.no_entities, args.threshold, args.text_column, args.id_column,
+        args.resume, args.progress_seconds,
+    )
+    print(f"📊 {summary['rows']:,} rows in {summary['seconds']:.1f}s "
+          f"({summary['rows_per_second']:,.0f} rows/s), {summary['faq_answers']:,} FAQ answers")
+    if summary["failed"]:
+        print(f"⚠️ {summary['failed']:,} rows could not be scored (intent \"error\"), "
+              f"first error: {summary['first_error']}")
+    for intent, count in list(summary["intents"].items())[:15]:
+        print(f"   {intent:<24}{count:>12,}")
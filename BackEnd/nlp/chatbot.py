@@ -1,37 +1,28 @@
-import pickle
-import random
-import json
-from preprocess import clean_text
+# backend/nlp/chatbot.py
+"""
+Console chat against the serving pipeline: same models (via the model
+registry) and same replies as POST /chat.
 
-# load model
-with open("BackEnd/models/intent_model.pkl", "rb") as f:
-    vectorizer, model = pickle.load(f)
+    cd backend
+    python -m nlp.chatbot
+"""
+from nlp.model_registry import load_models
+from nlp.response_manager import generate_response
 
-# load intents
-with open("BackEnd/data/intents.json", "r") as f:
-    intents = json.load(f)["intents"]
+USER_ID = "console_user"
 
-def predict_intent(text):
-    cleaned = clean_text(text)
-    X = vectorizer.transform([cleaned])
-    tag = model.predict(X)[0]
-    return tag
-
-def get_response(tag):
-    for intent in intents:
-        if intent["tag"] == tag:
-            return random.choice(intent["responses"])
-    return "Sorry, I didn't understand that."
 
 def chat():
+    load_models()
     print("🤖 Chatbot is ready! Type 'quit' to exit.")
     while True:
-        msg = input("You: ")
+        try:
+            msg = input("You: ")
+        except (EOFError, KeyboardInterrupt):
+            break
         if msg.lower() == "quit":
             break
-        tag = predict_intent(msg)
-        response = get_response(tag)
-        print("Bot:", response)
+        print("Bot:", generate_response(USER_ID, msg))
 
 if __name__ == "__main__":
     chat()
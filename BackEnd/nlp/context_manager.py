@@ -1,5 +1,175 @@
 # backend/nlp/context_manager.py
-import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# ------------------------------------------------------
+# Configuration (environment overrides)
+# ------------------------------------------------------
+CONTEXT_BACKEND = os.environ.get("CHATBOT_CONTEXT_BACKEND", "memory")   # "memory" | "sqlite"
+CONTEXT_DB = os.environ.get(
+    "CHATBOT_CONTEXT_DB", os.path.join(os.path.dirname(__file__), "../data/sessions.db")
+)
+MAX_SESSIONS = int(os.environ.get("CHATBOT_CONTEXT_MAX_SESSIONS", "100000"))
+SESSION_TTL = float(os.environ.get("CHATBOT_CONTEXT_TTL", "1800"))      # idle seconds
+
+
+class _Session:
+    __slots__ = ("intent", "entities", "updated_at")
+
+    def __init__(self, intent, entities, updated_at):
+        self.intent = intent
+        self.entities = entities
+        self.updated_at = updated_at    # time.time()
+
+    def as_dict(self):
+        return {"intent": self.intent, "entities": list(self.entities), "updated_at": self.updated_at}
+
+
+def _compact_entities(entities):
+    return tuple(tuple(entity) for entity in entities or ())
+
+
+# ------------------------------------------------------
+# Backends
+# ------------------------------------------------------
+class MemoryContextStore:
+    """
+    Per-process store: at most `max_sessions` sessions, oldest update evicted
+    first, and sessions idle for longer than `ttl` seconds expire.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()  # user_id -> _Session, oldest update first
+        self._lock = threading.Lock()
+
+    def set(self, user_id, intent, entities):
+        now = time.time()
+        with self._lock:
+            self._sessions[user_id] = _Session(intent, _compact_entities(entities), now)
+            self._sessions.move_to_end(user_id)
+            self._expire(now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def get(self, user_id):
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None:
+                return None
+            if time.time() - session.updated_at > self.ttl:
+                del self._sessions[user_id]
+                return None
+            return session.as_dict()
+
+    def delete(self, user_id):
+        with self._lock:
+            self._sessions.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _expire(self, now):
+        # Sessions are ordered by last update, so expired ones sit at the front
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.updated_at <= self.ttl:
+                break
+            self._sessions.popitem(last=False)
+
+
+class SQLiteContextStore:
+    """
+    Store shared by every worker process on the host, using a SQLite file
+    in WAL mode. Expired and over-limit sessions are purged every
+    `purge_every` writes.
+    """
+
+    def __init__(self, path=CONTEXT_DB, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL, purge_every=1000):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " user_id TEXT PRIMARY KEY,"
+                " intent TEXT,"
+                " entities TEXT,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions(updated_at)")
+
+    def _connection(self):
+        # One connection per thread and per process (connections don't survive fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def set(self, user_id, intent, entities):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (user_id, intent, entities, updated_at) VALUES (?, ?, ?, ?)",
+                (user_id, intent, json.dumps(_compact_entities(entities)), time.time()),
+            )
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            self.purge()
+
+    def get(self, user_id):
+        row = self._connection().execute(
+            "SELECT intent, entities, updated_at FROM sessions WHERE user_id = ? AND updated_at >= ?",
+            (user_id, time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        entities = _compact_entities(json.loads(row[1]))
+        return _Session(row[0], entities, row[2]).as_dict()
+
+    def delete(self, user_id):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions")
+
+    def purge(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl,))
+            conn.execute(
+                "DELETE FROM sessions WHERE user_id IN ("
+                " SELECT user_id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,),
+            )
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def _default_store():
+    if CONTEXT_BACKEND == "sqlite":
+        return SQLiteContextStore()
+    return MemoryContextStore()
+
 
 class ContextManager:
     """
@@ -7,9 +177,8 @@ class ContextManager:
     Stores the last detected intent and entities for each user_id.
     """
 
-    def __init__(self):
-        # Structure: {user_id: {"intent": str, "entities": list, "updated_at": datetime}}
-        self.session_data = {}
+    def __init__(self, store=None):
+        self.store = store if store is not None else _default_store()
 
     def update_context(self, user_id, intent, entities):
         """
@@ -18,30 +187,23 @@ class ContextManager:
         if not user_id:
             return  # safety: ignore missing IDs
 
-        self.session_data[user_id] = {
-            "intent": intent,
-            "entities": entities,
-            "updated_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        print(f"[CTX] Updated for {user_id} → intent={intent}, entities={entities}")
+        self.store.set(user_id, intent, entities)
 
     def get_context(self, user_id):
         """
         Retrieve saved context for a given user.
-        Returns None if no prior data exists.
+        Returns None if no prior data exists (or it expired).
         """
-        return self.session_data.get(user_id)
+        return self.store.get(user_id)
 
     def clear_context(self, user_id=None):
         """
         Clear context for a single user or all users.
         """
         if user_id:
-            self.session_data.pop(user_id, None)
-            print(f"[CTX] Cleared context for {user_id}")
+            self.store.delete(user_id)
         else:
-            self.session_data.clear()
-            print("[CTX] Cleared all user contexts")
+            self.store.clear()
 if __name__ == "__main__":
     ctx = ContextManager()
     ctx.update_context("user123", "track_order", [("order #12345", "ORDER_ID")])
@@ -1,16 +1,29 @@
 # backend/nlp/entity_model.py
 import os
 import pickle
-import spacy
-import re
-from spacy.training import Example
+import sys
+from nlp.gazetteer import match_entities
+from nlp.model_registry import register_loader, get_model
+from nlp.releases import artifact_path, new_release
 
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "../models/entity_model.pkl")
+BASE_DIR = os.path.dirname(__file__)
+# Native spaCy directory (config + binary weights), not a pickle
+MODEL_DIR = os.path.join(BASE_DIR, "../models/entity_model")
+META_PATH = os.path.join(MODEL_DIR, "meta.json")
+LEGACY_MODEL_PATH = os.path.join(BASE_DIR, "../models/entity_model.pkl")
+
+# Bump when the saved pipeline changes in a way old loaders can't handle
+ARTIFACT_VERSION = 1
+REQUIRED_COMPONENTS = ["ner"]
+WARMUP_TEXT = "Where is my order #12345 for shoes?"
 
 def train_entity_model():
     """
     Trains a very simple custom NER model to detect PRODUCT and ORDER_ID entities.
     """
+    import spacy
+    from spacy.training import Example
+
     nlp = spacy.blank("en")
     ner = nlp.add_pipe("ner")
     ner.add_label("PRODUCT")
@@ -31,49 +44,104 @@ def train_entity_model():
             nlp.update([example], sgd=optimizer, losses=losses)
         print(f"Epoch {epoch+1} Losses: {losses}")
 
-    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-    with open(MODEL_PATH, "wb") as f:
-        pickle.dump(nlp, f)
+    save_entity_model(nlp)
+    print("✅ Entity model saved")
+    return nlp
 
-    print(f"✅ Entity model saved at {MODEL_PATH}")
+
+def save_entity_model(nlp, note="train_entity_model"):
+    """
+    Writes the pipeline in spaCy's native format, stamped with
+    ARTIFACT_VERSION, and publishes it as a new release.
+    """
+    nlp.meta["name"] = "chatbot_ner"
+    nlp.meta["artifact_version"] = ARTIFACT_VERSION
+
+    with new_release(note) as release:
+        nlp.to_disk(release.path(MODEL_DIR))
+
+
+def convert_legacy_model():
+    """
+    One-off migration of the old pickled pipeline to the native format.
+    """
+    with open(LEGACY_MODEL_PATH, "rb") as f:
+        nlp = pickle.load(f)
+    save_entity_model(nlp, note=f"converted {os.path.basename(LEGACY_MODEL_PATH)}")
+    print(f"✅ Converted {LEGACY_MODEL_PATH}")
 
 
 # ------------------------
-# Entity extraction function
+# Serving loader
 # ------------------------
-_nlp_model = None  # cached model
+def load_entity_model():
+    """
+    Loads the native NER artifact with only the components extraction needs,
+    and warms it up so the first request doesn't pay for lazy initialisation.
+    Returns None when no model has been trained (gazetteer-only mode).
+    """
+    model_dir = artifact_path(MODEL_DIR)
+    meta_path = os.path.join(model_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        print("⚠️ Entity model not found. Using gazetteer only.")
+        return None
 
+    # spaCy is only imported when there is a model to load
+    import spacy
+
+    meta = spacy.util.load_meta(meta_path)
+    if meta.get("artifact_version") != ARTIFACT_VERSION:
+        raise FileNotFoundError(
+            f"{model_dir} has artifact version {meta.get('artifact_version')}, "
+            f"expected {ARTIFACT_VERSION} (retrain with `python -m nlp.entity_model`)"
+        )
+
+    exclude = [name for name in meta.get("pipeline", []) if name not in REQUIRED_COMPONENTS]
+    nlp = spacy.load(model_dir, exclude=exclude)
+    nlp(WARMUP_TEXT)
+    return nlp
+
+
+register_loader("entity", load_entity_model, paths=(META_PATH,))
+
+
+# ------------------------
+# Entity extraction function
+# ------------------------
 def extract_entities(text):
     """
-    Extracts PRODUCT and ORDER_ID entities from text using trained model.
-    Falls back to regex extraction if model not found.
+    Extracts PRODUCT and ORDER_ID entities from text.
+    Uses the compiled gazetteer first and only runs the spaCy model when the
+    gazetteer finds nothing.
     """
-    global _nlp_model
+    return extract_entities_batch([text])[0]
 
-    if _nlp_model is None:
-        if os.path.exists(MODEL_PATH):
-            with open(MODEL_PATH, "rb") as f:
-                _nlp_model = pickle.load(f)
-        else:
-            print("⚠️ Entity model not found. Using regex fallback.")
-            _nlp_model = None
 
-    entities = []
-    if _nlp_model:
-        doc = _nlp_model(text)
-        entities = [(ent.text, ent.label_) for ent in doc.ents]
+def extract_entities_batch(texts):
+    """
+    Same as extract_entities for many texts; the messages the gazetteer
+    could not tag go through spaCy together via nlp.pipe.
+    """
+    if not texts:
+        return []
+
+    results = [match_entities(text) for text in texts]
+    misses = [i for i, entities in enumerate(results) if not entities]
+    if not misses:
+        return results
 
-    # Fallback regex extraction (in case model fails)
-    if not entities:
-        order_match = re.search(r"#\d{4,6}", text)
-        if order_match:
-            entities.append((order_match.group(), "ORDER_ID"))
-        if any(word in text.lower() for word in ["shoes", "jacket", "item", "product"]):
-            entities.append(("product", "PRODUCT"))
+    model = get_model("entity")
+    if model:
+        docs = model.pipe([texts[i] for i in misses])
+        for i, doc in zip(misses, docs):
+            results[i] = [(ent.text, ent.label_) for ent in doc.ents]
 
-    return entities
+    return results
 
 
 if __name__ == "__main__":
-    train_entity_model()
+    if "--convert" in sys.argv:
+        convert_legacy_model()
+    else:
+        train_entity_model()
     print(extract_entities("Track my order #12345 for shoes."))
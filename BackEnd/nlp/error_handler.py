@@ -1,13 +1,20 @@
 import os
 import traceback
 from datetime import datetime
+from nlp import metrics
+from nlp.log_writer import BufferedLogWriter, RotatingFileSink
 
 # Ensure the logs directory exists
-LOG_DIR = os.path.join(os.path.dirname(__file__), "../logs")
+LOG_DIR = os.environ.get("CHATBOT_LOG_DIR", os.path.join(os.path.dirname(__file__), "../logs"))
 os.makedirs(LOG_DIR, exist_ok=True)
 
 ERROR_LOG_PATH = os.path.join(LOG_DIR, "error_logs.txt")
 
+# Entries are appended by a background thread, in batches
+_writer = BufferedLogWriter(RotatingFileSink(ERROR_LOG_PATH, "".join))
+
+ERRORS = metrics.counter("chatbot_errors_total", "Errors logged by log_error, by exception type", ["type"])
+
 def log_error(error: Exception, context: str = ""):
     """
     Logs exceptions with timestamp and optional context info.
@@ -24,8 +31,8 @@ def log_error(error: Exception, context: str = ""):
         f"{'-'*80}\n"
     )
 
-    with open(ERROR_LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(log_entry)
+    _writer.write(log_entry)
+    ERRORS.labels(error_type).inc()
 
     print(f"⚠️ Logged {error_type} in {ERROR_LOG_PATH}")
 
@@ -0,0 +1,553 @@
+# backend/nlp/faq_retrieval.py
+"""
+BM25 retrieval over FAQ questions with an inverted index.
+
+Postings are stored term-major (indptr / doc ids / term counts, like a CSC
+matrix), so a query only touches the postings of its own terms; top-k is
+an argpartition over those candidates, not a scan of the catalog.
+Paraphrased questions that share an answer form one answer group, and a
+query returns each answer at most once (scored by its best question).
+
+add() / remove() change the index in place: new questions go to a small
+in-memory delta, removed ones are masked out, and compact() (run by
+save()) folds both back into the arrays. The saved index is a
+memory-mapped artifact directory (nlp/artifacts.py) shared by all workers.
+
+    cd backend
+    python -m nlp.faq_retrieval "how long does a refund take?"
+    python -m nlp.faq_retrieval --add "Do you ship abroad?" "Yes, to 40 countries."
+    python -m nlp.faq_retrieval --remove "Do you ship abroad?"
+    python -m nlp.faq_retrieval --calibrate        # compare with the old cosine lookup
+"""
+import argparse
+import csv
+import math
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+from nlp.artifacts import StringTable, load_arrays, manifest_path, save_arrays
+from nlp.releases import artifact_path, new_release
+
+BASE_DIR = os.path.dirname(__file__)
+FAQ_PATH = os.path.join(BASE_DIR, "../data/faqs.csv")
+INDEX_PATH = os.path.join(BASE_DIR, "../models/faq_index")
+INDEX_MANIFEST = manifest_path(INDEX_PATH)
+FORMAT_VERSION = 2
+
+K1 = 1.2
+B = 0.75
+# Minimum normalised score (share of the query's idf mass matched, see search);
+# the highest value that still answers every query the old cosine > 0.3 lookup
+# answered on data/intents.csv + customer_queries.csv (see --calibrate)
+MIN_SCORE = 0.35
+
+# Same tokens as the TfidfVectorizer(stop_words="english") it replaces
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+# sklearn's ENGLISH_STOP_WORDS, copied so serving never imports sklearn
+# (tests/test_faq_retrieval.py checks the two still match)
+ENGLISH_STOP_WORDS = frozenset([
+    "a", "about", "above", "across", "after", "afterwards", "again", "against", "all",
+    "almost", "alone", "along", "already", "also", "although", "always", "am", "among",
+    "amongst", "amoungst", "amount", "an", "and", "another", "any", "anyhow", "anyone",
+    "anything", "anyway", "anywhere", "are", "around", "as", "at", "back", "be",
+    "became", "because", "become", "becomes", "becoming", "been", "before",
+    "beforehand", "behind", "being", "below", "beside", "besides", "between", "beyond",
+    "bill", "both", "bottom", "but", "by", "call", "can", "cannot", "cant", "co", "con",
+    "could", "couldnt", "cry", "de", "describe", "detail", "do", "done", "down", "due",
+    "during", "each", "eg", "eight", "either", "eleven", "else", "elsewhere", "empty",
+    "enough", "etc", "even", "ever", "every", "everyone", "everything", "everywhere",
+    "except", "few", "fifteen", "fifty", "fill", "find", "fire", "first", "five", "for",
+    "former", "formerly", "forty", "found", "four", "from", "front", "full", "further",
+    "get", "give", "go", "had", "has", "hasnt", "have", "he", "hence", "her", "here",
+    "hereafter", "hereby", "herein", "hereupon", "hers", "herself", "him", "himself",
+    "his", "how", "however", "hundred", "i", "ie", "if", "in", "inc", "indeed",
+    "interest", "into", "is", "it", "its", "itself", "keep", "last", "latter",
+    "latterly", "least", "less", "ltd", "made", "many", "may", "me", "meanwhile",
+    "might", "mill", "mine", "more", "moreover", "most", "mostly", "move", "much",
+    "must", "my", "myself", "name", "namely", "neither", "never", "nevertheless",
+    "next", "nine", "no", "nobody", "none", "noone", "nor", "not", "nothing", "now",
+    "nowhere", "of", "off", "often", "on", "once", "one", "only", "onto", "or", "other",
+    "others", "otherwise", "our", "ours", "ourselves", "out", "over", "own", "part",
+    "per", "perhaps", "please", "put", "rather", "re", "same", "see", "seem", "seemed",
+    "seeming", "seems", "serious", "several", "she", "should", "show", "side", "since",
+    "sincere", "six", "sixty", "so", "some", "somehow", "someone", "something",
+    "sometime", "sometimes", "somewhere", "still", "such", "system", "take", "ten",
+    "than", "that", "the", "their", "them", "themselves", "then", "thence", "there",
+    "thereafter", "thereby", "therefore", "therein", "thereupon", "these", "they",
+    "thick", "thin", "third", "this", "those", "though", "three", "through",
+    "throughout", "thru", "thus", "to", "together", "too", "top", "toward", "towards",
+    "twelve", "twenty", "two", "un", "under", "until", "up", "upon", "us", "very",
+    "via", "was", "we", "well", "were", "what", "whatever", "when", "whence",
+    "whenever", "where", "whereafter", "whereas", "whereby", "wherein", "whereupon",
+    "wherever", "whether", "which", "while", "whither", "who", "whoever", "whole",
+    "whom", "whose", "why", "will", "with", "within", "without", "would", "yet", "you",
+    "your", "yours", "yourself", "yourselves"
+])
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in ENGLISH_STOP_WORDS]
+
+
+class FAQRetriever:
+    """
+    Inverted index over FAQ questions with BM25 scoring.
+    `terms` (the base segment's vocabulary) must be sorted: term ids are
+    positions found with np.searchsorted, so a loaded index needs no
+    per-process term dict.
+    """
+
+    def __init__(self, terms, indptr, doc_ids, tfs, doc_len, doc_group, questions, answers, alive=None):
+        self.terms = np.asarray(terms, dtype=str) if isinstance(terms, list) else terms
+        self.n_base_terms = len(self.terms)
+        self.extra_terms = {}                           # term -> id, for terms added since compact()
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        self.tfs = np.asarray(tfs, dtype=np.float32)
+        self.doc_len = np.asarray(doc_len, dtype=np.float32)
+        self.doc_group = np.asarray(doc_group, dtype=np.int32)
+        self.questions = questions                      # list or StringTable
+        self.answers = answers                          # one per answer group
+        self.alive = np.ones(len(self.questions), dtype=bool) if alive is None else np.asarray(alive, bool)
+        self._doc_of = None                             # question -> live doc id, built on first update
+        self._group_of = None                           # answer -> group id
+        self.n_base_docs = len(self.doc_len)
+        self._doc_term_ptr = self._doc_term_ids = None  # base doc -> its term ids (postings transposed)
+
+        # Document frequency per term (live docs only) and the delta segment
+        self.df = np.diff(self.indptr).astype(np.int64)
+        self.df -= self._dead_postings()
+        self.delta = {}                                 # term id -> ([doc ids], [tfs])
+        self.doc_terms = {}                             # delta doc -> term counts (for remove)
+        self._refresh_stats()
+
+    # ------------------------------------------------------
+    # Building
+    # ------------------------------------------------------
+    @classmethod
+    def build(cls, pairs):
+        """
+        Index (question, answer) pairs (a repeated question keeps its last answer).
+        """
+        faqs = dict(pairs)
+        postings = {}                       # term -> ([docs], [tfs])
+        group_of, answers, doc_group, doc_len = {}, [], [], []
+
+        for doc, (question, answer) in enumerate(faqs.items()):
+            counts = Counter(tokenize(question))
+            for term, tf in counts.items():
+                docs, tfs = postings.setdefault(term, ([], []))
+                docs.append(doc)
+                tfs.append(tf)
+            if answer not in group_of:
+                group_of[answer] = len(answers)
+                answers.append(answer)
+            doc_group.append(group_of[answer])
+            doc_len.append(sum(counts.values()))
+
+        terms = sorted(postings)
+        indptr = np.cumsum([0] + [len(postings[term][0]) for term in terms])
+        doc_ids = [doc for term in terms for doc in postings[term][0]]
+        tfs = [tf for term in terms for tf in postings[term][1]]
+        return cls(terms, indptr, doc_ids, tfs, doc_len, doc_group, list(faqs), answers)
+
+    @classmethod
+    def from_csv(cls, path=FAQ_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.build((row["question"], row["answer"]) for row in csv.DictReader(f))
+
+    def _dead_postings(self):
+        if self.alive.all():
+            return 0
+        dead = [self._base_terms_of(doc) for doc in np.flatnonzero(~self.alive)]
+        return np.bincount(np.concatenate(dead), minlength=len(self.indptr) - 1)
+
+    def _base_terms_of(self, doc):
+        """
+        Term ids of a base-segment doc, without scanning every posting.
+        """
+        if self._doc_term_ptr is None:
+            # One pass over the postings, then each lookup is a slice
+            term_of_posting = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+            order = np.argsort(self.doc_ids, kind="stable")
+            self._doc_term_ids = term_of_posting[order]
+            self._doc_term_ptr = np.searchsorted(self.doc_ids[order], np.arange(self.n_base_docs + 1))
+        return self._doc_term_ids[self._doc_term_ptr[doc]:self._doc_term_ptr[doc + 1]]
+
+    def _refresh_stats(self):
+        live = int(self.alive.sum())
+        self.n_docs = live
+        self.avg_len = float(self.doc_len[self.alive].mean()) if live else 1.0
+        # BM25 length normalisation per doc, K1 * (1 - B + B * len / avg)
+        self.doc_norm = K1 * (1 - B + B * self.doc_len / max(self.avg_len, 1e-9))
+
+    def _term_id(self, term):
+        t = self.extra_terms.get(term)
+        if t is None and self.n_base_terms:
+            i = int(np.searchsorted(self.terms, term))
+            if i < self.n_base_terms and self.terms[i] == term:
+                t = i
+        return t
+
+    # ------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------
+    def _make_mutable(self):
+        # A loaded index keeps its text memory-mapped until the first update
+        if not isinstance(self.questions, list):
+            self.questions = self.questions.tolist()
+            self.answers = self.answers.tolist()
+        if self._doc_of is None:
+            self._group_of = {answer: i for i, answer in enumerate(self.answers)}
+            self._doc_of = {
+                question: doc for doc, question in enumerate(self.questions) if self.alive[doc]
+            }
+        if not self.alive.flags.writeable:
+            self.alive = self.alive.copy()
+
+    def add(self, question, answer):
+        """
+        Adds one question (replacing an existing identical question).
+        """
+        self._make_mutable()
+        if question in self._doc_of:
+            self.remove(question)
+
+        counts = Counter(tokenize(question))
+        doc = len(self.questions)
+        group = self._group_of.get(answer)
+        if group is None:
+            group = self._group_of[answer] = len(self.answers)
+            self.answers.append(answer)
+
+        for term, tf in counts.items():
+            t = self._term_id(term)
+            if t is None:
+                t = self.extra_terms[term] = self.n_base_terms + len(self.extra_terms)
+                self.df = np.append(self.df, 0)
+            docs, tfs = self.delta.setdefault(t, ([], []))
+            docs.append(doc)
+            tfs.append(tf)
+            self.df[t] += 1
+
+        self.questions.append(question)
+        self._doc_of[question] = doc
+        self.doc_terms[doc] = counts
+        self.doc_len = np.append(self.doc_len, np.float32(sum(counts.values())))
+        self.doc_group = np.append(self.doc_group, np.int32(group))
+        self.alive = np.append(self.alive, True)
+        self._refresh_stats()
+        return doc
+
+    def remove(self, question):
+        """
+        Removes a question; returns False if it is not indexed.
+        """
+        self._make_mutable()
+        doc = self._doc_of.pop(question, None)
+        if doc is None:
+            return False
+        self.alive[doc] = False
+
+        counts = self.doc_terms.pop(doc, None)
+        if counts is None:
+            terms = self._base_terms_of(doc)
+        else:
+            terms = [self._term_id(term) for term in counts]
+        for t in terms:
+            self.df[t] -= 1
+        self._refresh_stats()
+        return True
+
+    def compact(self):
+        """
+        Folds the delta into the postings arrays and drops removed questions
+        (doc ids are renumbered; answer groups with no questions left go).
+        """
+        live = np.flatnonzero(self.alive)
+        new_id = np.full(len(self.questions), -1, dtype=np.int64)
+        new_id[live] = np.arange(len(live))
+
+        groups = sorted(set(self.doc_group[live].tolist()))
+        new_group = {old: new for new, old in enumerate(groups)}
+
+        all_terms = [(str(term), t) for t, term in enumerate(self.terms)]
+        all_terms += list(self.extra_terms.items())
+        terms, indptr, doc_ids, tfs = [], [0], [], []
+        for term, t in sorted(all_terms):
+            docs, counts = [], []
+            if t < self.n_base_terms:
+                start, end = self.indptr[t], self.indptr[t + 1]
+                docs, counts = self.doc_ids[start:end].tolist(), self.tfs[start:end].tolist()
+            extra_docs, extra_counts = self.delta.get(t, ([], []))
+            kept = [
+                (new_id[d], c) for d, c in zip(docs + extra_docs, counts + extra_counts) if new_id[d] >= 0
+            ]
+            if not kept:
+                continue
+            terms.append(term)
+            doc_ids.extend(d for d, _ in kept)
+            tfs.extend(c for _, c in kept)
+            indptr.append(len(doc_ids))
+
+        self.__init__(
+            terms, indptr, doc_ids, tfs,
+            self.doc_len[live],
+            [new_group[g] for g in self.doc_group[live].tolist()],
+            [self.questions[d] for d in live],
+            [self.answers[g] for g in groups],
+        )
+
+    # ------------------------------------------------------
+    # Search
+    # ------------------------------------------------------
+    def _postings(self, t):
+        docs = tfs = None
+        if t < self.n_base_terms:
+            start, end = self.indptr[t], self.indptr[t + 1]
+            docs, tfs = self.doc_ids[start:end], self.tfs[start:end]
+        extra = self.delta.get(t)
+        if extra:
+            extra_docs = np.asarray(extra[0], dtype=np.int32)
+            extra_tfs = np.asarray(extra[1], dtype=np.float32)
+            if docs is None:
+                return extra_docs, extra_tfs
+            return np.concatenate([docs, extra_docs]), np.concatenate([tfs, extra_tfs])
+        return docs, tfs
+
+    def _score(self, queries):
+        """
+        BM25 for a batch of queries in one pass: every (query, live doc)
+        pair that shares a term, as parallel (query index, doc, normalised
+        score) arrays sorted by query then doc. Postings are fetched once
+        per distinct term, however many queries use it.
+        """
+        rows, term_ids, weights = [], [], []
+        norms = np.zeros(len(queries))
+        idfs = {}
+        for i, query in enumerate(queries):
+            for term, qtf in Counter(tokenize(query)).items():
+                t = self._term_id(term)
+                if t is None or self.df[t] <= 0:
+                    continue
+                idf = idfs.get(t)
+                if idf is None:
+                    df = self.df[t]
+                    idf = idfs[t] = math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+                norms[i] += qtf * idf
+                rows.append(i)
+                term_ids.append(t)
+                weights.append(qtf * idf)
+        empty = np.zeros(0, dtype=np.int64)
+        if not rows:
+            return empty, empty, np.zeros(0)
+
+        # One postings list per distinct term, expanded to every (query, term)
+        unique_terms, which = np.unique(term_ids, return_inverse=True)
+        postings = [self._postings(t) for t in unique_terms]
+        lengths = np.array([len(docs) for docs, _ in postings])
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        all_docs = np.concatenate([docs for docs, _ in postings])
+        all_tfs = np.concatenate([tfs for _, tfs in postings])
+
+        counts = lengths[which]
+        starts = np.repeat(offsets[which] - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+        gather = starts + np.arange(counts.sum())
+        docs, tfs = all_docs[gather], all_tfs[gather]
+        query_of = np.repeat(np.asarray(rows, dtype=np.int64), counts)
+        scores = np.repeat(weights, counts) * tfs * (K1 + 1) / (tfs + self.doc_norm[docs])
+
+        keep = self.alive[docs]
+        docs, scores, query_of = docs[keep], scores[keep], query_of[keep]
+        if not len(docs):
+            return empty, empty, np.zeros(0)
+
+        # Sum per (query, doc) over the candidates only
+        stride = len(self.alive)
+        keys, position = np.unique(query_of * stride + docs, return_inverse=True)
+        query_of, docs = keys // stride, keys % stride
+        return query_of, docs, np.bincount(position, weights=scores) / norms[query_of]
+
+    def search(self, query, k=5, min_score=0.0):
+        """
+        Up to k answer groups for `query`, best first, as dicts with the
+        answer, the best-matching question and a normalised score. The score
+        divides BM25 by the sum of the query terms' idf (what a doc of
+        average length containing each term once would score), so it is
+        comparable across queries: ~1.0 means every query term matched.
+        """
+        _, candidates, totals = self._score([query])
+        if not len(candidates):
+            return []
+
+        # Best question per answer group
+        order = np.argsort(-totals, kind="stable")
+        groups, first = np.unique(self.doc_group[candidates[order]], return_index=True)
+        best_docs = candidates[order[first]]
+        best_scores = totals[order[first]]
+
+        passing = best_scores >= min_score
+        best_docs, best_scores, groups = best_docs[passing], best_scores[passing], groups[passing]
+        if len(best_scores) > k:
+            top = np.argpartition(-best_scores, k - 1)[:k]
+            best_docs, best_scores, groups = best_docs[top], best_scores[top], groups[top]
+        ranked = np.argsort(-best_scores, kind="stable")
+
+        return [
+            {
+                "answer": self.answers[groups[i]],
+                "question": self.questions[best_docs[i]],
+                "score": float(best_scores[i]),
+            }
+            for i in ranked
+        ]
+
+    def query(self, query, threshold=MIN_SCORE):
+        """
+        Best answer above `threshold`, or None.
+        """
+        return self.query_batch([query], threshold)[0]
+
+    def query_batch(self, queries, threshold=MIN_SCORE):
+        """
+        query() for each of `queries`, scored together in one BM25 pass.
+        Ties go to the lowest doc id, as in search().
+        """
+        answers = [None] * len(queries)
+        query_of, docs, totals = self._score(queries)
+        if not len(docs):
+            return answers
+
+        # Best doc per query: sort by query, then score (lexsort is stable,
+        # so equal scores keep doc order)
+        order = np.lexsort((-totals, query_of))
+        best_queries, first = np.unique(query_of[order], return_index=True)
+        best = order[first]
+        for i, doc, score in zip(best_queries, docs[best], totals[best]):
+            if score >= threshold:
+                answers[i] = self.answers[self.doc_group[doc]]
+        return answers
+
+    # ------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------
+    def save(self, path=INDEX_PATH):
+        """
+        Compacts and writes the index as a memory-mapped artifact directory
+        (see nlp/artifacts.py), swapped in so a running server's model
+        watcher never reads a partial index.
+        """
+        self.compact()
+        questions_blob, questions_offsets = StringTable.pack(self.questions)
+        answers_blob, answers_offsets = StringTable.pack(self.answers)
+        save_arrays(path, {
+            "terms": self.terms,
+            "indptr": self.indptr,
+            "doc_ids": self.doc_ids,
+            "tfs": self.tfs,
+            "doc_len": self.doc_len,
+            "doc_group": self.doc_group,
+            "questions_blob": questions_blob,
+            "questions_offsets": questions_offsets,
+            "answers_blob": answers_blob,
+            "answers_offsets": answers_offsets,
+        }, {"format_version": FORMAT_VERSION, "k1": K1, "b": B})
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        arrays, meta = load_arrays(path)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"{path} has an unsupported format (rebuild it)")
+        return cls(
+            arrays["terms"], arrays["indptr"], arrays["doc_ids"], arrays["tfs"],
+            arrays["doc_len"], arrays["doc_group"],
+            StringTable(arrays["questions_blob"], arrays["questions_offsets"]),
+            StringTable(arrays["answers_blob"], arrays["answers_offsets"]),
+        )
+
+    def stats(self):
+        return {
+            "questions": self.n_docs,
+            "answers": len(set(self.doc_group[self.alive].tolist())),
+            "terms": int((self.df > 0).sum()),
+            "postings": int(len(self.doc_ids)),
+            "delta_postings": sum(len(docs) for docs, _ in self.delta.values()),
+        }
+
+
+# ------------------------------------------------------
+# Threshold calibration against the old cosine lookup
+# ------------------------------------------------------
+def _cosine_baseline(pairs, queries, threshold=0.3):
+    """
+    Answers from the previous knowledge base: TF-IDF cosine, best question
+    only, accepted above 0.3.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(stop_words="english")
+    vectors = vectorizer.fit_transform([question for question, _ in pairs])
+    sim = (vectorizer.transform(queries) @ vectors.T).toarray()
+    best = sim.argmax(axis=1)
+    return [pairs[idx][1] if sim[row, idx] > threshold else None for row, idx in enumerate(best)]
+
+
+def calibrate(queries, thresholds=(0.3, 0.35, 0.4, 0.45, 0.5, 0.55, 0.6, 0.7)):
+    """
+    Agreement with the old lookup for each threshold on `queries`.
+    """
+    with open(FAQ_PATH, "r", encoding="utf-8") as f:
+        pairs = [(row["question"], row["answer"]) for row in csv.DictReader(f)]
+    index = FAQRetriever.build(pairs)
+    baseline = _cosine_baseline(pairs, queries)
+    hits = [index.search(query, k=1) for query in queries]
+
+    print(f"{len(queries)} queries, old lookup answered {sum(a is not None for a in baseline)}")
+    print(f"{'threshold':>10}{'agree':>8}{'answered':>10}{'only new':>10}{'only old':>10}{'differ':>8}")
+    for threshold in thresholds:
+        new = [h[0]["answer"] if h and h[0]["score"] >= threshold else None for h in hits]
+        only_new = sum(a is not None and b is None for a, b in zip(new, baseline))
+        only_old = sum(a is None and b is not None for a, b in zip(new, baseline))
+        differ = sum(a is not None and b is not None and a != b for a, b in zip(new, baseline))
+        agree = sum(a == b for a, b in zip(new, baseline)) / len(queries)
+        answered = sum(a is not None for a in new)
+        print(f"{threshold:>10.2f}{agree:>8.1%}{answered:>10}{only_new:>10}{only_old:>10}{differ:>8}")
+
+
+def _load_queries():
+    queries = []
+    for name in ("intents.csv", "customer_queries.csv"):
+        with open(os.path.join(BASE_DIR, "../data", name), "r", encoding="utf-8") as f:
+            queries.extend(row["query"] for row in csv.DictReader(f) if row.get("query"))
+    return queries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FAQ retrieval index")
+    parser.add_argument("query", nargs="?")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--add", nargs=2, metavar=("QUESTION", "ANSWER"))
+    parser.add_argument("--remove", metavar="QUESTION")
+    parser.add_argument("--calibrate", action="store_true")
+    args = parser.parse_args()
+
+    if args.calibrate:
+        calibrate(_load_queries())
+    elif args.add or args.remove:
+        index_path = artifact_path(INDEX_PATH)
+        index = FAQRetriever.load(index_path) if os.path.exists(index_path) else FAQRetriever.from_csv()
+        if args.add:
+            index.add(*args.add)
+        elif not index.remove(args.remove):
+            print(f"⚠️ Question not found: {args.remove}")
+        with new_release(f"FAQ {'add' if args.add else 'remove'}: {(args.add or [args.remove])[0]}") as release:
+            index.save(release.path(INDEX_PATH))
+        print(f"✅ Index saved: {index.stats()}")
+    else:
+        index_path = artifact_path(INDEX_PATH)
+        index = FAQRetriever.load(index_path) if os.path.exists(index_path) else FAQRetriever.from_csv()
+        for hit in index.search(args.query or "How do I cancel my purchase?", k=args.k):
+            print(f"{hit['score']:.3f}  {hit['question']}  →  {hit['answer']}")
@@ -0,0 +1,125 @@
+# backend/nlp/gazetteer.py
+import csv
+import os
+import re
+
+from nlp.model_registry import register_loader, get_model
+
+# ------------------------------------------------------
+# Setup
+# ------------------------------------------------------
+BASE_DIR = os.path.dirname(__file__)
+ENTITIES_PATH = os.path.join(BASE_DIR, "../data/entities.csv")
+CATALOG_PATH = os.path.join(BASE_DIR, "../data/product_catalog.csv")
+
+# Labels taken from entities.csv (others such as SIZE "M" are too ambiguous
+# for plain dictionary matching)
+GAZETTEER_LABELS = {"PRODUCT", "ORDER_ID"}
+
+_TOKEN = re.compile(r"#?\w[\w\-]*")
+_ORDER_ID_SHAPE = re.compile(r"#\d{4,8}|ORD\d{3,}", re.IGNORECASE)
+_ORDER_NUMBER = re.compile(r"\d{4,}(?:-\d+)?")
+_ORDER_WORDS = {"order", "number", "no"}
+_END = "\0"   # trie key marking the end of a phrase
+
+
+class Gazetteer:
+    """
+    Token trie over the product / order-ID vocabulary.
+    extract() tokenises the text once and, at each token, follows the trie
+    to the longest matching phrase, so cost is linear in the message length
+    no matter how large the catalog is.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self.size = 0
+
+    def add(self, phrase, label):
+        tokens = [t.lower() for t in _TOKEN.findall(phrase)]
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if _END not in node:
+            self.size += 1
+        node[_END] = label
+
+    def add_product(self, name):
+        self.add(name, "PRODUCT")
+        # "shoe" / "shoes", "watch" / "watches"
+        if not name.endswith("s"):
+            self.add(name + ("es" if name.endswith(("ch", "sh", "x")) else "s"), "PRODUCT")
+
+    def extract(self, text):
+        """
+        Returns [(matched span, label)] in order of appearance.
+        """
+        tokens = [(m.group().lower(), m.start(), m.end()) for m in _TOKEN.finditer(text)]
+        entities = []
+        i = 0
+        while i < len(tokens):
+            token, start, _ = tokens[i]
+
+            # Longest dictionary phrase starting at this token
+            node, match = self._root, None
+            j = i
+            while j < len(tokens) and tokens[j][0] in node:
+                node = node[tokens[j][0]]
+                j += 1
+                if _END in node:
+                    match = (j, node[_END])
+            if match:
+                end_index, label = match
+                entities.append((text[start:tokens[end_index - 1][2]], label))
+                i = end_index
+                continue
+
+            # Order-ID shapes: "#12345", "ORD12345", or a number after "order"
+            if _ORDER_ID_SHAPE.fullmatch(token) or (
+                i > 0 and tokens[i - 1][0] in _ORDER_WORDS and _ORDER_NUMBER.fullmatch(token)
+            ):
+                entities.append((text[start:tokens[i][2]], "ORDER_ID"))
+            i += 1
+
+        return entities
+
+
+def build_gazetteer(entities_path=ENTITIES_PATH, catalog_path=CATALOG_PATH):
+    """
+    Compiles data/entities.csv and the product catalog into a Gazetteer.
+    """
+    gazetteer = Gazetteer()
+
+    if os.path.exists(entities_path):
+        with open(entities_path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f, delimiter="\t"):
+                label = (row.get("label") or "").strip()
+                entity = (row.get("entity") or "").strip()
+                if label not in GAZETTEER_LABELS or not entity:
+                    continue
+                if label == "PRODUCT":
+                    gazetteer.add_product(entity.lower())
+                else:
+                    gazetteer.add(entity, label)
+
+    if os.path.exists(catalog_path):
+        with open(catalog_path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                name = (row.get("product") or "").strip().lower()
+                if name:
+                    gazetteer.add_product(name)
+
+    return gazetteer
+
+
+register_loader("gazetteer", build_gazetteer, paths=(ENTITIES_PATH, CATALOG_PATH))
+
+
+def match_entities(text):
+    return get_model("gazetteer").extract(text)
+
+
+if __name__ == "__main__":
+    print(match_entities("Track my order #12345 for running shoes and a leather wallet"))
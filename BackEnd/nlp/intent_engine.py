@@ -0,0 +1,325 @@
+# backend/nlp/intent_engine.py
+"""
+Compact NumPy inference engine for the intent classifier.
+
+export_intent_engine() turns the trained TfidfVectorizer(char_wb) +
+LogisticRegression pair into plain arrays (sorted n-grams and their
+columns, idf vector, idf-weighted coefficient matrix, intercepts), saved as
+a memory-mapped artifact directory (see nlp/artifacts.py) so every worker
+on a host shares one copy. IntentEngine scores messages from those arrays
+in one pass (featurise → sparse dot → the same softmax or one-vs-rest
+normalisation as the model's predict_proba) without importing
+sklearn.
+
+Models trained with the hashed featurizer (HashingVectorizer +
+TfidfTransformer) export no n-gram map at all: columns are recomputed with
+the same MurmurHash3 sklearn uses, so the artifact size depends only on
+n_features.
+
+    cd backend
+    python -m nlp.intent_engine          # re-export from the pickles as a new release + parity check
+"""
+import functools
+import json
+import math
+import os
+import re
+import sys
+
+import numpy as np
+
+from nlp.artifacts import save_arrays, load_arrays, manifest_path
+
+BASE_DIR = os.path.dirname(__file__)
+ENGINE_PATH = os.path.join(BASE_DIR, "../models/intent_engine")
+ENGINE_MANIFEST = manifest_path(ENGINE_PATH)
+
+FORMAT_VERSION = 3
+# n-gram → column memo (hashing is pure Python; a vocabulary lookup is a
+# binary search in the shared n-gram array)
+HASH_CACHE_SIZE = int(os.environ.get("CHATBOT_HASH_CACHE_SIZE", "65536"))
+_WHITE_SPACES = re.compile(r"\s\s+")
+
+
+# ===============================
+# #️⃣ Feature hashing
+# ===============================
+def murmurhash3_32(data, seed=0):
+    """
+    Signed 32-bit MurmurHash3 (x86) of `data` bytes, identical to
+    sklearn.utils.murmurhash3_32(data, seed).
+    """
+    c1, c2 = 0xCC9E2D51, 0x1B873593
+    length = len(data)
+    h = seed & 0xFFFFFFFF
+    rounded = length & ~3
+
+    for i in range(0, rounded, 4):
+        k = int.from_bytes(data[i:i + 4], "little")
+        k = (k * c1) & 0xFFFFFFFF
+        k = ((k << 15) | (k >> 17)) & 0xFFFFFFFF
+        k = (k * c2) & 0xFFFFFFFF
+        h ^= k
+        h = ((h << 13) | (h >> 19)) & 0xFFFFFFFF
+        h = (h * 5 + 0xE6546B64) & 0xFFFFFFFF
+
+    if length & 3:
+        k = int.from_bytes(data[rounded:], "little")
+        k = (k * c1) & 0xFFFFFFFF
+        k = ((k << 15) | (k >> 17)) & 0xFFFFFFFF
+        k = (k * c2) & 0xFFFFFFFF
+        h ^= k
+
+    h ^= length
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+    h ^= h >> 16
+    return h - 0x100000000 if h & 0x80000000 else h
+
+
+def hashed_column(ngram, n_features):
+    # Same mapping as HashingVectorizer(alternate_sign=False)
+    return abs(murmurhash3_32(ngram.encode("utf-8"))) % n_features
+
+
+# ===============================
+# 📦 Export (training side)
+# ===============================
+def export_intent_engine(model, vectorizer, path=ENGINE_PATH):
+    """
+    Writes the arrays IntentEngine needs to the artifact directory `path`.
+    Supports a char_wb TfidfVectorizer or a Pipeline of char_wb
+    HashingVectorizer ("hash") + TfidfTransformer ("tfidf"), both with l2
+    norm.
+    """
+    steps = getattr(vectorizer, "named_steps", None)
+    if steps:
+        analyzer, tfidf = steps["hash"], steps["tfidf"]
+        if analyzer.alternate_sign or analyzer.norm is not None:
+            raise ValueError("Hashed featurizer must use alternate_sign=False and norm=None")
+        featurizer, n_features = "hashed", analyzer.n_features
+        arrays = {}
+    else:
+        analyzer = tfidf = vectorizer
+        featurizer, n_features = "vocab", len(vectorizer.vocabulary_)
+        # Sorted for np.searchsorted lookups (no per-process dict)
+        ngrams = np.array(list(vectorizer.vocabulary_))
+        order = np.argsort(ngrams)
+        columns = np.fromiter(vectorizer.vocabulary_.values(), dtype=np.int32, count=len(ngrams))
+        arrays = {"ngrams": ngrams[order], "columns": columns[order]}
+
+    if analyzer.analyzer != "char_wb" or analyzer.preprocessor is not None or tfidf.norm != "l2":
+        raise ValueError("Only char_wb TF-IDF featurizers with l2 norm can be exported")
+
+    if hasattr(model, "estimators_"):
+        coef = np.vstack([estimator.coef_ for estimator in model.estimators_])
+        intercept = np.concatenate([estimator.intercept_ for estimator in model.estimators_])
+    else:
+        coef, intercept = model.coef_, model.intercept_
+    mode = _probability_mode(model, n_features)
+
+    config = {
+        "format_version": FORMAT_VERSION,
+        "featurizer": featurizer,
+        "n_features": int(n_features),
+        "ngram_range": list(analyzer.ngram_range),
+        "lowercase": bool(analyzer.lowercase),
+        "sublinear_tf": bool(tfidf.sublinear_tf),
+        "mode": mode,
+    }
+
+    idf = np.asarray(tfidf.idf_ if tfidf.use_idf else np.ones(n_features), dtype=np.float64)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    save_arrays(path, {
+        **arrays,
+        "idf": idf,
+        # (n_features, n_classes) with idf folded in, so loading copies nothing
+        "weights": np.asarray(coef, dtype=np.float64).T * idf[:, None],
+        "intercept": np.asarray(intercept, dtype=np.float64),
+        "classes": np.array([str(c) for c in model.classes_]),
+    }, config)
+    print(f"💾 Intent engine exported to {path}")
+
+
+def _probability_mode(model, n_features):
+    """
+    "ovr" (sigmoid + normalise) or "multinomial" (softmax): whichever the
+    model's own predict_proba computes under the installed sklearn. Stored
+    attributes are not enough: a LogisticRegression pickled with
+    multi_class="ovr" is scored with a softmax once sklearn drops that option.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.random((8, n_features)) * (rng.random((8, n_features)) < 0.01)
+    decision = model.decision_function(X)
+    probs = model.predict_proba(X)
+    if decision.ndim != 2:
+        raise ValueError("Only multiclass intent models can be exported")
+
+    ovr = 1.0 / (1.0 + np.exp(-decision))
+    ovr /= ovr.sum(axis=1, keepdims=True)
+    softmax = np.exp(decision - decision.max(axis=1, keepdims=True))
+    softmax /= softmax.sum(axis=1, keepdims=True)
+    for mode, expected in (("multinomial", softmax), ("ovr", ovr)):
+        if np.allclose(probs, expected, rtol=0, atol=1e-9):
+            return mode
+    raise ValueError(f"{type(model).__name__}.predict_proba is neither softmax nor one-vs-rest")
+
+
+# ===============================
+# ⚡ Inference
+# ===============================
+class IntentEngine:
+    """
+    Scores messages with the exported arrays.
+    The idf weights are folded into the coefficient matrix, so a message
+    costs one n-gram pass plus a gather over its non-zero columns.
+    `ngrams` is None for hashed models.
+    """
+
+    def __init__(self, ngrams, columns, idf, weights, intercept, classes, config):
+        if config.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported intent engine format {config.get('format_version')}")
+
+        self.classes_ = np.asarray(classes)
+        self.featurizer = config["featurizer"]
+        self.n_features = config["n_features"]
+        self.min_n, self.max_n = config["ngram_range"]
+        self.lowercase = config["lowercase"]
+        self.sublinear_tf = config["sublinear_tf"]
+        self.mode = config["mode"]
+
+        self.ngrams = ngrams        # sorted; None for hashed models
+        self.columns = columns
+        if self.featurizer == "hashed":
+            # Every n-gram has a column
+            column_of = functools.partial(hashed_column, n_features=self.n_features)
+        else:
+            column_of = self._vocabulary_column
+        # Memoise the frequent n-grams (a small private dict instead of the whole vocabulary)
+        self._column = functools.lru_cache(maxsize=HASH_CACHE_SIZE)(column_of)
+        # Used as loaded (memory-mapped when read through load())
+        self.idf = idf
+        self.weights = weights
+        self.intercept = intercept
+
+    @classmethod
+    def load(cls, path=ENGINE_PATH):
+        arrays, config = load_arrays(path)
+        return cls(
+            arrays.get("ngrams"), arrays.get("columns"), arrays["idf"], arrays["weights"],
+            arrays["intercept"], arrays["classes"], config,
+        )
+
+    # ---------------- featurisation ----------------
+    def _vocabulary_column(self, ngram):
+        i = int(np.searchsorted(self.ngrams, ngram))
+        if i < len(self.ngrams) and self.ngrams[i] == ngram:
+            return int(self.columns[i])
+        return None
+
+    def _ngrams(self, text):
+        # Same n-grams as sklearn's char_wb analyzer
+        if self.lowercase:
+            text = text.lower()
+        text = _WHITE_SPACES.sub(" ", text)
+        min_n, max_n = self.min_n, self.max_n
+        for w in text.split():
+            w = " " + w + " "
+            w_len = len(w)
+            for n in range(min_n, max_n + 1):
+                offset = 0
+                yield w[offset:offset + n]
+                while offset + n < w_len:
+                    offset += 1
+                    yield w[offset:offset + n]
+                if offset == 0:
+                    break
+
+    def featurize(self, text):
+        """
+        (columns, tf values) of the message's known n-grams.
+        """
+        column_of = self._column
+        counts = {}
+        for ngram in self._ngrams(text):
+            column = column_of(ngram)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+
+        columns = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if self.sublinear_tf:
+            np.log(tf, out=tf)
+            tf += 1.0
+        return columns, tf
+
+    # ---------------- scoring ----------------
+    def decision_function(self, texts):
+        scores = np.empty((len(texts), len(self.intercept)))
+        for row, text in enumerate(texts):
+            columns, tf = self.featurize(text)
+            if len(columns) == 0:
+                scores[row] = self.intercept
+                continue
+            weighted = tf * self.idf[columns]
+            norm = math.sqrt(float(np.dot(weighted, weighted)))
+            scores[row] = tf @ self.weights[columns] / norm + self.intercept
+        return scores
+
+    def predict_proba(self, texts):
+        scores = self.decision_function(texts)
+        if self.mode == "ovr":
+            probs = 1.0 / (1.0 + np.exp(-scores))
+            probs /= probs.sum(axis=1, keepdims=True)
+        else:
+            scores -= scores.max(axis=1, keepdims=True)
+            probs = np.exp(scores)
+            probs /= probs.sum(axis=1, keepdims=True)
+        return probs
+
+    def predict(self, texts):
+        return self.classes_[self.decision_function(texts).argmax(axis=1)]
+
+
+# ===============================
+# 🧪 Parity check against sklearn
+# ===============================
+def check_parity(model, vectorizer, engine, texts):
+    """
+    Max absolute differences between the engine and sklearn's public
+    decision_function / predict_proba / predict on `texts`.
+    """
+    X = vectorizer.transform(texts)
+    return {
+        "decision": float(np.abs(engine.decision_function(texts) - model.decision_function(X)).max()),
+        "proba": float(np.abs(engine.predict_proba(texts) - model.predict_proba(X)).max()),
+        "label_mismatches": int((engine.predict(texts) != model.predict(X)).sum()),
+    }
+
+
+if __name__ == "__main__":
+    import csv
+    import time
+
+    sys.path.insert(0, os.path.join(BASE_DIR, ".."))
+    from nlp.intent_model import load_sklearn_intent_model, DATA_PATH
+    from nlp.releases import artifact_path, new_release
+
+    model, vectorizer = load_sklearn_intent_model()
+    with new_release("intent engine re-exported from the pickles") as release:
+        export_intent_engine(model, vectorizer, release.path(ENGINE_PATH))
+    engine = IntentEngine.load(artifact_path(ENGINE_PATH))
+
+    with open(DATA_PATH, "r", encoding="utf-8") as f:
+        texts = [row["query"] for row in csv.DictReader(f)]
+    texts += ["", "   ", "Where is my order #12345 for shoes?!", "ÀÉÎ ünïcödé"]
+
+    print(f"Parity vs sklearn ({engine.featurizer}):", check_parity(model, vectorizer, engine, texts))
+
+    start = time.perf_counter()
+    for text in texts:
+        engine.predict_proba([text])
+    per_message = (time.perf_counter() - start) / len(texts) * 1e6
+    print(f"⚡ Engine: {per_message:.1f} µs per message")
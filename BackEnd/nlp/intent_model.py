@@ -6,18 +6,15 @@ Author: Anirudh ✨
 # ===============================
 # 🔧 Imports
 # ===============================
+# Serving only needs joblib + the registry. pandas and the sklearn
+# training/evaluation modules are imported inside train_intent_model().
 import os
 import joblib
 import warnings
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics import (
-    accuracy_score,
-    classification_report,
-    confusion_matrix
-)
+from nlp.model_registry import register_loader, get_model
+from nlp.artifacts import artifact_bytes
+from nlp.releases import artifact_path, new_release
+from nlp.intent_engine import ENGINE_PATH, ENGINE_MANIFEST, IntentEngine, export_intent_engine
 
 warnings.filterwarnings("ignore")
 
@@ -31,6 +28,10 @@ VECTORIZER_PATH = os.path.join(BASE_DIR, "../models/vectorizer.pkl")
 
 os.makedirs(os.path.join(BASE_DIR, "../models"), exist_ok=True)
 
+# Hashed featurizer: fixed feature space, no vocabulary dict
+N_HASH_FEATURES = 2 ** 13
+WARMUP_TEXT = "where is my order"
+
 
 # ===============================
 # 🧽 CLEANER — Intent + Text
@@ -62,36 +63,46 @@ def clean_dataset(df):
 # ===============================
 # 🧠 TRAIN INTENT MODEL
 # ===============================
-def train_intent_model():
-    print("\n============================================================")
-    print("🤖 TRAINING OPTIMIZED INTENT CLASSIFICATION MODEL")
-    print("============================================================\n")
-
-    df = pd.read_csv(DATA_PATH)
-    df = clean_dataset(df)
-
-    # Show distribution
-    print("================ INTENT DISTRIBUTION ================")
-    print(f"Total samples: {len(df)}")
-    print(df["intent"].value_counts())
-    print("=====================================================\n")
-
-    X = df["query"]
-    y = df["intent"]
-
-    # Stratified & safe split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y,
-        test_size=0.2,
-        random_state=42,
-        stratify=y
+def build_vectorizer(featurizer="vocab", n_features=N_HASH_FEATURES, **params):
+    """
+    "vocab": TfidfVectorizer with a learned n-gram vocabulary.
+    "hashed": HashingVectorizer + TfidfTransformer over `n_features` columns,
+    so memory stays fixed however large the training corpus grows.
+    `params` override the vectorizer defaults below (e.g. ngram_range).
+    """
+    if "ngram_range" in params:
+        params["ngram_range"] = tuple(params["ngram_range"])
+
+    from sklearn.feature_extraction.text import (
+        HashingVectorizer,
+        TfidfTransformer,
+        TfidfVectorizer,
     )
+    from sklearn.pipeline import Pipeline
+
+    if featurizer == "hashed":
+        hash_params = dict(
+            analyzer="char_wb",
+            ngram_range=(3, 5),
+            n_features=n_features,
+            alternate_sign=False,
+            norm=None,
+            lowercase=True
+        )
+        hash_params.update(params)
+        return Pipeline([
+            ("hash", HashingVectorizer(**hash_params)),
+            ("tfidf", TfidfTransformer(sublinear_tf=True)),
+        ])
+
+    if featurizer != "vocab":
+        raise ValueError(f"Unknown featurizer: {featurizer}")
 
     # ===============================
     # ⚡ OPTIMIZED TF-IDF VECTORIZER
     # ===============================
     # Word n-grams + Char n-grams = HUGE boost
-    vectorizer = TfidfVectorizer(
+    vocab_params = dict(
         analyzer="char_wb",
         ngram_range=(3, 5),
         min_df=2,
@@ -100,29 +111,87 @@ def train_intent_model():
         lowercase=True,
         max_features=10000
     )
+    vocab_params.update(params)
+    return TfidfVectorizer(**vocab_params)
 
-    X_train_vec = vectorizer.fit_transform(X_train)
-    X_test_vec = vectorizer.transform(X_test)
+
+def build_classifier(n_jobs=-1, **params):
+    """
+    One-vs-rest logistic regression. sklearn >= 1.8 dropped `multi_class`,
+    so there the same model is built with OneVsRestClassifier.
+    `params` override the LogisticRegression defaults (e.g. C).
+    """
+    import inspect
+    from sklearn.linear_model import LogisticRegression
 
     # ===============================
     # ⚙️ LOGISTIC REGRESSION (balanced)
     # ===============================
-    model = LogisticRegression(
-        max_iter=2000,
-        class_weight="balanced",
-        multi_class="ovr",
-        n_jobs=-1
-    )
+    lr_params = dict(max_iter=2000, class_weight="balanced")
+    lr_params.update(params)
+
+    if "multi_class" in inspect.signature(LogisticRegression).parameters:
+        return LogisticRegression(multi_class="ovr", n_jobs=n_jobs, **lr_params)
+
+    from sklearn.multiclass import OneVsRestClassifier
+    return OneVsRestClassifier(LogisticRegression(**lr_params), n_jobs=n_jobs)
+
+
+def fit_intent_model(X_train, y_train, featurizer="vocab", n_features=N_HASH_FEATURES):
+    vectorizer = build_vectorizer(featurizer, n_features)
+    X_train_vec = vectorizer.fit_transform(X_train)
+
+    model = build_classifier()
     model.fit(X_train_vec, y_train)
+    return model, vectorizer
+
+
+def load_training_split():
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    df = clean_dataset(pd.read_csv(DATA_PATH))
+
+    # Stratified & safe split
+    X_train, X_test, y_train, y_test = train_test_split(
+        df["query"], df["intent"],
+        test_size=0.2,
+        random_state=42,
+        stratify=df["intent"]
+    )
+    return df, X_train, X_test, y_train, y_test
 
-    # Save artifacts
-    joblib.dump(model, MODEL_PATH)
-    joblib.dump(vectorizer, VECTORIZER_PATH)
+
+def train_intent_model(featurizer="vocab", n_features=N_HASH_FEATURES):
+    import pandas as pd
+    from sklearn.metrics import (
+        accuracy_score,
+        classification_report,
+        confusion_matrix
+    )
+
+    print("\n============================================================")
+    print("🤖 TRAINING OPTIMIZED INTENT CLASSIFICATION MODEL")
+    print("============================================================\n")
+
+    df, X_train, X_test, y_train, y_test = load_training_split()
+
+    # Show distribution
+    print("================ INTENT DISTRIBUTION ================")
+    print(f"Total samples: {len(df)}")
+    print(df["intent"].value_counts())
+    print("=====================================================\n")
+
+    model, vectorizer = fit_intent_model(X_train, y_train, featurizer, n_features)
+    X_test_vec = vectorizer.transform(X_test)
+
+    # Publish as a new release (never written over the files servers are reading)
+    with new_release(f"train_intent_model ({featurizer})") as release:
+        joblib.dump(model, release.path(MODEL_PATH))
+        joblib.dump(vectorizer, release.path(VECTORIZER_PATH))
+        export_intent_engine(model, vectorizer, release.path(ENGINE_PATH))
 
     print("Model training complete.")
-    print("Saved to:")
-    print(" -", MODEL_PATH)
-    print(" -", VECTORIZER_PATH)
 
     # ===============================
     # 📊 EVALUATION
@@ -153,43 +222,171 @@ def train_intent_model():
 
 
 # ===============================
-# 🚀 SAFE LOADER (FastAPI)
+# 🚀 SERVING LOADER (FastAPI)
+# ===============================
+class _SklearnIntentModel:
+    """
+    Fallback with the IntentEngine interface, used when only the pickles
+    exist (e.g. models trained before the engine export was added).
+    """
+
+    def __init__(self, model, vectorizer):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.classes_ = model.classes_
+
+    def predict_proba(self, texts):
+        return self.model.predict_proba(self.vectorizer.transform([text.lower() for text in texts]))
+
+
+def load_sklearn_intent_model():
+    """
+    Loads the pickled model + vectorizer of the current release.
+    Never trains: raises FileNotFoundError if an artifact is missing.
+    """
+    model_path, vectorizer_path = artifact_path(MODEL_PATH), artifact_path(VECTORIZER_PATH)
+    for path in (model_path, vectorizer_path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} (run `python -m nlp.intent_model` to train)")
+
+    model = joblib.load(model_path)
+    vectorizer = joblib.load(vectorizer_path)
+    return model, vectorizer
+
+
+def load_intent_model():
+    """
+    Loads the NumPy intent engine for serving (no sklearn import), falling
+    back to the sklearn pickles when the engine artifact is missing.
+    """
+    engine_path = artifact_path(ENGINE_PATH)
+    if os.path.exists(engine_path):
+        return IntentEngine.load(engine_path)
+
+    print("⚠️ Intent engine not found. Serving with sklearn (run `python -m nlp.intent_engine`).")
+    return _SklearnIntentModel(*load_sklearn_intent_model())
+
+
+def _warm_intent_model(model):
+    model.predict_proba([WARMUP_TEXT])
+
+
+register_loader("intent", load_intent_model, paths=(ENGINE_MANIFEST, MODEL_PATH, VECTORIZER_PATH),
+                warmup=_warm_intent_model)
+
+
+# ===============================
+# 🛠️ SCRIPT LOADER (training / notebooks)
 # ===============================
 def load_or_train_model():
-    if not os.path.exists(MODEL_PATH) or not os.path.exists(VECTORIZER_PATH):
+    try:
+        return load_sklearn_intent_model()
+    except FileNotFoundError:
         print("⚠ No model found. Training new one...")
         return train_intent_model()
 
-    model = joblib.load(MODEL_PATH)
-    vectorizer = joblib.load(VECTORIZER_PATH)
-    return model, vectorizer
-
 
 # ===============================
 # 🔍 Predict Intent
 # ===============================
 def predict_intent(text, confidence_threshold=0.55):
-    model, vectorizer = load_or_train_model()
+    return predict_intent_batch([text], confidence_threshold)[0]
+
+
+def predict_intent_batch(texts, confidence_threshold=0.55):
+    """
+    Scores many messages with one predict_proba call; the label is the
+    argmax of the probabilities, so the decision function runs once.
+    Returns one predict_intent-style dict per input text.
+    """
+    if not texts:
+        return []
+
+    model = get_model("intent")
 
-    vec = vectorizer.transform([text.lower()])
-    probs = model.predict_proba(vec)[0]
+    probs = model.predict_proba(texts)
+    classes = [str(c) for c in model.classes_]
 
-    prediction = model.predict(vec)[0]
-    top_conf = float(max(probs))
+    results = []
+    for row in probs:
+        best = int(row.argmax())
+        prediction = classes[best]
+        top_conf = float(row[best])
 
-    # If confidence too low → fallback
-    if top_conf < confidence_threshold:
-        prediction = "uncertain"
+        # If confidence too low → fallback
+        if top_conf < confidence_threshold:
+            prediction = "uncertain"
 
-    return {
-        "intent": prediction,
-        "confidence": top_conf,
-        "scores": dict(zip(model.classes_, [float(p) for p in probs]))
-    }
+        results.append({
+            "intent": prediction,
+            "confidence": top_conf,
+            "scores": dict(zip(classes, [float(p) for p in row]))
+        })
+    return results
+
+
+# ===============================
+# 📏 Featurizer comparison
+# ===============================
+def compare_featurizers(n_features=N_HASH_FEATURES):
+    """
+    Trains the vocab and hashed variants on the same split of intents.csv
+    and prints accuracy, engine latency and artifact sizes side by side.
+    Nothing under models/ is overwritten.
+    """
+    import pickle
+    import tempfile
+    import time
+    from sklearn.metrics import accuracy_score
+
+    _, X_train, X_test, y_train, y_test = load_training_split()
+    texts = list(X_test)
+
+    print(f"{'featurizer':<12}{'accuracy':>10}{'fit s':>8}{'µs/msg':>9}{'µs/msg@batch':>14}"
+          f"{'engine KB':>11}{'vectorizer KB':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for featurizer in ("vocab", "hashed"):
+            start = time.perf_counter()
+            model, vectorizer = fit_intent_model(X_train, y_train, featurizer, n_features)
+            fit_seconds = time.perf_counter() - start
+
+            engine_path = os.path.join(tmp, featurizer)
+            export_intent_engine(model, vectorizer, engine_path)
+            engine = IntentEngine.load(engine_path)
+
+            predictions = engine.predict(texts)
+            accuracy = accuracy_score(y_test, predictions)
+
+            engine.predict_proba(texts)   # warm the hash cache like a running worker
+            start = time.perf_counter()
+            for text in texts:
+                engine.predict_proba([text])
+            single_us = (time.perf_counter() - start) / len(texts) * 1e6
+            start = time.perf_counter()
+            engine.predict_proba(texts)
+            batch_us = (time.perf_counter() - start) / len(texts) * 1e6
+
+            engine_kb = artifact_bytes(engine_path) / 1024
+            vectorizer_kb = len(pickle.dumps(vectorizer)) / 1024
+            print(f"{featurizer:<12}{accuracy:>10.3f}{fit_seconds:>8.2f}{single_us:>9.1f}{batch_us:>14.1f}"
+                  f"{engine_kb:>11.0f}{vectorizer_kb:>15.0f}")
 
 
 # ===============================
 # 🧪 Manual Execution
 # ===============================
 if __name__ == "__main__":
-    train_intent_model()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the intent classifier")
+    parser.add_argument("--featurizer", choices=["vocab", "hashed"], default="vocab")
+    parser.add_argument("--n-features", type=int, default=N_HASH_FEATURES,
+                        help="columns of the hashed feature space")
+    parser.add_argument("--compare", action="store_true",
+                        help="compare vocab vs hashed featurizers without saving")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_featurizers(args.n_features)
+    else:
+        train_intent_model(args.featurizer, args.n_features)
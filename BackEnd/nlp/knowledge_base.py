@@ -1,31 +1,55 @@
 # backend/nlp/knowledge_base.py
-import pandas as pd
-import joblib
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from nlp.model_registry import register_loader, get_model
+from nlp.faq_retrieval import FAQRetriever, FAQ_PATH, INDEX_PATH, INDEX_MANIFEST, MIN_SCORE
+from nlp.releases import artifact_path, new_release
 
 BASE_DIR = os.path.dirname(__file__)
-## Initial Errors: csv file reading issues
-FAQ_PATH = os.path.join(BASE_DIR, "../data/faqs.csv")
-VEC_PATH = os.path.join(BASE_DIR, "../models/faqs_vectorizer.pkl")
+WARMUP_QUERY = "How do I cancel my purchase?"
 
 def build_knowledge_base():
-    df = pd.read_csv(FAQ_PATH)
-    vectorizer = TfidfVectorizer(stop_words="english")
-    vectors = vectorizer.fit_transform(df["question"])
-    joblib.dump((vectorizer, vectors, df), VEC_PATH)
-    print("✅ Knowledge Base built and saved!")
-
-def query_knowledge_base(query, threshold=0.3):
-    vectorizer, vectors, df = joblib.load(VEC_PATH)
-    q_vec = vectorizer.transform([query])
-    sim = cosine_similarity(q_vec, vectors).flatten()
-    idx = sim.argmax()
-    if sim[idx] > threshold:
-        return df.iloc[idx]["answer"]
-    return None
+    index = FAQRetriever.from_csv(FAQ_PATH)
+    # Published as a new release; running servers swap to it
+    with new_release("build_knowledge_base") as release:
+        index.save(release.path(INDEX_PATH))
+    print(f"✅ Knowledge Base built and saved! {index.stats()}")
+
+
+# ------------------------------------------------------
+# Resident FAQ index (loaded once per process)
+# ------------------------------------------------------
+def load_faq_index():
+    """
+    Loads the BM25 index of the current release (see nlp/faq_retrieval.py).
+    """
+    index_path = artifact_path(INDEX_PATH)
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(f"{index_path} (run `python -m nlp.knowledge_base` to build)")
+    return FAQRetriever.load(index_path)
+
+
+def _warm_faq_index(index):
+    # Touch the mapped postings before the index takes traffic
+    index.query(WARMUP_QUERY, MIN_SCORE)
+
+
+register_loader("faq", load_faq_index, paths=(INDEX_MANIFEST,), warmup=_warm_faq_index)
+
+
+def query_knowledge_base(query, threshold=MIN_SCORE):
+    return get_model("faq").query(query, threshold)
+
+
+def query_knowledge_base_batch(queries, threshold=MIN_SCORE):
+    return get_model("faq").query_batch(queries, threshold)
+
+
+def search_knowledge_base(query, k=5, threshold=MIN_SCORE):
+    """
+    Top-k distinct answers with their best-matching question and score.
+    """
+    return get_model("faq").search(query, k, threshold)
 
 if __name__ == "__main__":
     build_knowledge_base()
-    print(query_knowledge_base("How do I cancel my purchase?"))
+    print(query_knowledge_base(WARMUP_QUERY))
@@ -0,0 +1,192 @@
+# backend/nlp/log_store.py
+import os
+import time
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: logger falls back to CSV without it
+    pa = pq = None
+
+# ------------------------------------------------------
+# Day-partitioned Parquet store for chatbot interactions
+# ------------------------------------------------------
+# Layout: logs/interactions/date=YYYY-MM-DD/part-<opened>-<pid>-<seq>.parquet
+# Each writer process appends one row group per flush to a hidden in-progress
+# file and renames it into place when it rolls, so readers only ever see
+# complete Parquet files. Parts roll often (a crash loses at most one roll
+# interval of rows); in-progress files left behind by a dead process have no
+# Parquet footer and are removed when the next sink starts.
+
+LOG_DIR = os.environ.get("CHATBOT_LOG_DIR", os.path.join(os.path.dirname(__file__), "../logs"))
+STORE_DIR = os.path.join(LOG_DIR, "interactions")
+ROLL_SECONDS = float(os.environ.get("CHATBOT_LOG_ROLL_SECONDS", "60"))
+ROLL_ROWS = int(os.environ.get("CHATBOT_LOG_ROLL_ROWS", "50000"))
+
+COLUMNS = ["timestamp", "user_id", "query", "response", "intent"]
+
+SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("us")),
+    ("user_id", pa.string()),
+    ("query", pa.string()),
+    ("response", pa.string()),
+    ("intent", pa.string()),
+]) if pa is not None else None
+
+
+_writing = set()    # in-progress files open in this process
+
+
+def available():
+    return pa is not None
+
+
+class PartitionedParquetSink:
+    """
+    Log sink for BufferedLogWriter: records are [timestamp, user_id, query,
+    response, intent] lists, written to the partition of their day.
+    """
+
+    name = "interactions"
+
+    def __init__(self, root=STORE_DIR, roll_seconds=ROLL_SECONDS, roll_rows=ROLL_ROWS):
+        if pa is None:
+            raise ImportError("pyarrow is required for the Parquet interaction log")
+        self.root = root
+        self.roll_seconds = roll_seconds
+        self.roll_rows = roll_rows
+        self._open = {}     # date -> [writer, tmp_path, final_path, opened_at, rows]
+        self._seq = 0
+        remove_stale_parts(root)
+
+    def write_batch(self, records):
+        by_day = {}
+        for record in records:
+            by_day.setdefault(record[0].strftime("%Y-%m-%d"), []).append(record)
+
+        for day, rows in by_day.items():
+            table = pa.Table.from_pydict(
+                {name: [row[i] for row in rows] for i, name in enumerate(COLUMNS)},
+                schema=SCHEMA,
+            )
+            state = self._open.get(day) or self._start(day)
+            state[0].write_table(table)
+            state[4] += len(rows)
+
+        self.idle()
+
+    def idle(self):
+        """
+        Roll parts that are old enough, big enough or belong to a past day.
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+        now = time.time()
+        for day, state in list(self._open.items()):
+            if day != today or now - state[3] >= self.roll_seconds or state[4] >= self.roll_rows:
+                self._finish(day)
+
+    def close(self):
+        for day in list(self._open):
+            self._finish(day)
+
+    def _start(self, day):
+        directory = os.path.join(self.root, f"date={day}")
+        os.makedirs(directory, exist_ok=True)
+        self._seq += 1
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        name = f"part-{stamp}-{os.getpid()}-{self._seq}.parquet"
+        tmp_path = os.path.join(directory, f".{name}.inprogress")
+        writer = pq.ParquetWriter(tmp_path, SCHEMA, compression="zstd")
+        _writing.add(tmp_path)
+        state = [writer, tmp_path, os.path.join(directory, name), time.time(), 0]
+        self._open[day] = state
+        return state
+
+    def _finish(self, day):
+        writer, tmp_path, final_path, _, _ = self._open.pop(day)
+        writer.close()
+        os.replace(tmp_path, final_path)
+        _writing.discard(tmp_path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True     # exists, owned by someone else
+    return True
+
+
+def remove_stale_parts(root=STORE_DIR):
+    """
+    Deletes in-progress part files whose writer process is gone (they cannot
+    be read without the footer written on close). Returns the removed paths.
+    """
+    removed = []
+    for _, directory in list_partitions(root):
+        for name in os.listdir(directory):
+            if not (name.startswith(".part-") and name.endswith(".inprogress")):
+                continue
+            # .part-<opened>-<pid>-<seq>.parquet.inprogress
+            try:
+                pid = int(name.split("-")[2])
+            except (IndexError, ValueError):
+                continue
+            path = os.path.join(directory, name)
+            if path in _writing or (pid != os.getpid() and _pid_alive(pid)):
+                continue
+            try:
+                os.remove(path)
+                removed.append(path)
+            except FileNotFoundError:
+                pass
+    if removed:
+        print(f"🧹 Removed {len(removed)} unfinished interaction log part(s) left by a stopped writer")
+    return removed
+
+
+# ------------------------------------------------------
+# Reading helpers
+# ------------------------------------------------------
+def list_partitions(root=STORE_DIR, since=None, until=None):
+    """
+    [(date, directory)] for each day partition, optionally limited to
+    since <= date <= until (ISO date strings). Only directory names are read.
+    """
+    if not os.path.isdir(root):
+        return []
+    partitions = []
+    for entry in sorted(os.listdir(root)):
+        if not entry.startswith("date="):
+            continue
+        day = entry[len("date="):]
+        if (since and day < since) or (until and day > until):
+            continue
+        partitions.append((day, os.path.join(root, entry)))
+    return partitions
+
+
+def list_parts(partition_dir):
+    """
+    Completed part files in a partition (in-progress files are hidden).
+    """
+    return sorted(
+        f for f in os.listdir(partition_dir)
+        if f.startswith("part-") and f.endswith(".parquet")
+    )
+
+
+def read_table(columns=None, since=None, until=None, filters=None, root=STORE_DIR):
+    """
+    Read only the requested columns from the selected day partitions.
+    """
+    tables = []
+    for _, directory in list_partitions(root, since, until):
+        for part in list_parts(directory):
+            tables.append(pq.read_table(os.path.join(directory, part), columns=columns, filters=filters))
+    if not tables:
+        return SCHEMA.empty_table().select(columns or COLUMNS)
+    return pa.concat_tables(tables)
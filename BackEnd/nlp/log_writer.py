@@ -0,0 +1,196 @@
+# backend/nlp/log_writer.py
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+# ------------------------------------------------------
+# Configuration (environment overrides)
+# ------------------------------------------------------
+FLUSH_INTERVAL = float(os.environ.get("CHATBOT_LOG_FLUSH_INTERVAL", "1.0"))          # seconds
+FLUSH_BATCH = int(os.environ.get("CHATBOT_LOG_BATCH", "256"))                        # records
+MAX_BYTES = int(os.environ.get("CHATBOT_LOG_MAX_BYTES", str(50 * 1024 * 1024)))      # 0 = no size rotation
+MAX_AGE = float(os.environ.get("CHATBOT_LOG_MAX_AGE_HOURS", "24")) * 3600            # 0 = no time rotation
+BACKUP_COUNT = int(os.environ.get("CHATBOT_LOG_BACKUPS", "14"))
+QUEUE_SIZE = int(os.environ.get("CHATBOT_LOG_QUEUE_SIZE", "10000"))
+
+_writers = []
+
+
+class BufferedLogWriter:
+    """
+    Moves log I/O off the request path.
+
+    write() only puts a record on an in-memory queue. A background thread
+    drains it and hands records to `sink.write_batch()` in batches (every
+    `flush_batch` records or `flush_interval` seconds). If the queue is full,
+    records are dropped and counted instead of blocking a request.
+    """
+
+    def __init__(self, sink, flush_interval=FLUSH_INTERVAL, flush_batch=FLUSH_BATCH,
+                 queue_size=QUEUE_SIZE):
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self.flush_batch = max(1, flush_batch)
+        self.queue_size = queue_size
+        self.dropped = 0
+
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        _writers.append(self)
+
+    # ---------------- producer side ----------------
+    def write(self, record):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """
+        Block until every record queued so far has reached the sink.
+        """
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(None)   # sentinel: flush and stop
+        self._thread.join()
+        self._thread = None
+
+    def _ensure_started(self):
+        # Threads do not survive fork(), so each process starts its own writer
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._thread = threading.Thread(
+                target=self._run, name=f"log-writer:{self.sink.name}", daemon=True
+            )
+            self._thread.start()
+
+    # ---------------- writer thread ----------------
+    def _run(self):
+        stop = False
+
+        while not stop:
+            records = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(records) < self.flush_batch:
+                try:
+                    record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is None:
+                    self._queue.task_done()
+                    stop = True
+                    break
+                records.append(record)
+
+            if records:
+                try:
+                    self.sink.write_batch(records)
+                except Exception as e:
+                    print(f"⚠️ Could not write {len(records)} records to {self.sink.name}: {e}")
+                finally:
+                    for _ in records:
+                        self._queue.task_done()
+            elif not stop:
+                self.sink.idle()
+
+        self.sink.close()
+
+
+class RotatingFileSink:
+    """
+    Appends serialized records to a text file, rotating it by size or age.
+    Reopens the file if another process rotated it first.
+    """
+
+    def __init__(self, path, serialize, max_bytes=MAX_BYTES, max_age=MAX_AGE,
+                 backup_count=BACKUP_COUNT):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.serialize = serialize          # list of records -> str
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self._handle = None
+        self._opened_at = 0.0
+
+    def write_batch(self, records):
+        # Another process may have rotated the file under us
+        if self._handle is not None and not _same_file(self._handle, self.path):
+            self.close()
+
+        if self._handle is not None and self._should_rotate():
+            self.close()
+            self._rotate()
+
+        if self._handle is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._handle = open(self.path, "a", newline="", encoding="utf-8")
+            self._opened_at = time.time()
+
+        self._handle.write(self.serialize(records))
+        self._handle.flush()
+
+    def idle(self):
+        pass
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _should_rotate(self):
+        if self.max_bytes and self._handle.tell() >= self.max_bytes:
+            return True
+        if self.max_age and time.time() - self._opened_at >= self.max_age:
+            return True
+        return False
+
+    def _rotate(self):
+        if not os.path.exists(self.path):
+            return
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        target = f"{self.path}.{stamp}"
+        suffix = 1
+        while os.path.exists(target):
+            target = f"{self.path}.{stamp}.{suffix}"
+            suffix += 1
+        os.replace(self.path, target)
+
+        if self.backup_count:
+            directory, name = os.path.split(self.path)
+            backups = sorted(f for f in os.listdir(directory) if f.startswith(name + "."))
+            for old in backups[:-self.backup_count]:
+                os.remove(os.path.join(directory, old))
+
+
+def _same_file(handle, path):
+    try:
+        return os.fstat(handle.fileno()).st_ino == os.stat(path).st_ino
+    except OSError:
+        return False
+
+
+def close_all():
+    """
+    Flush and stop every writer (called on app shutdown and at exit).
+    """
+    for writer in _writers:
+        writer.close()
+
+
+atexit.register(close_all)
@@ -1,12 +1,43 @@
 # backend/nlp/logger.py
-import csv, os
+import csv, io, os
 from datetime import datetime
+from nlp.log_writer import BufferedLogWriter, RotatingFileSink
+from nlp import log_store
 
-LOG_FILE = os.path.join(os.path.dirname(__file__), "../logs/chatbot_logs.csv")
+LOG_DIR = os.environ.get("CHATBOT_LOG_DIR", os.path.join(os.path.dirname(__file__), "../logs"))
+LOG_FILE = os.path.join(LOG_DIR, "chatbot_logs.csv")
+LOG_FORMAT = os.environ.get("CHATBOT_LOG_FORMAT", "parquet")   # "parquet" | "csv"
 
 os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 
+def _format_rows(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+def _make_sink():
+    if LOG_FORMAT == "parquet":
+        if log_store.available():
+            return log_store.PartitionedParquetSink()
+        print("⚠️ pyarrow not installed. Logging interactions to CSV instead.")
+    return RotatingFileSink(LOG_FILE, _format_rows)
+
+# Rows are written by a background thread, in batches
+_writer = BufferedLogWriter(_make_sink())
+
 def log_interaction(user_id, user_input, bot_response, intent="unknown"):
-    with open(LOG_FILE, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow([datetime.now(), user_id, user_input, bot_response, intent])
+    log_interactions([(user_id, user_input, bot_response, intent)])
+
+def log_interactions(rows):
+    """
+    Queues many (user_id, user_input, bot_response, intent) rows for the log.
+    """
+    now = datetime.now()
+    for user_id, user_input, bot_response, intent in rows:
+        _writer.write([now, user_id, user_input, bot_response, intent])
+
+def flush_logs():
+    """
+    Block until every queued interaction is written.
+    """
+    _writer.flush()
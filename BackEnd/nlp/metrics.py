@@ -0,0 +1,265 @@
+# backend/nlp/metrics.py
+"""
+Minimal Prometheus metrics (text exposition format), no client library.
+
+Counters and histograms are updated in place on the request path (one
+lock + a few integer adds). Gauges for things that already keep their own
+numbers (pool, cache, batcher, model registry) are callbacks evaluated only
+when /metrics is scraped.
+
+With CHATBOT_EXECUTOR=process the pipeline runs in child processes:
+worker_pool ships each child's deltas back with the result (drain/merge),
+so the API process still exposes the totals.
+"""
+import bisect
+import threading
+import time
+
+# Seconds; covers a cached hit (~10 µs) up to a slow spaCy batch
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+_registry = {}          # name -> metric, in registration order
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """
+        Child for one label combination (cache it on hot paths).
+        """
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1.0):
+        self.labels().inc(amount)
+
+    def render(self):
+        lines = self.header()
+        for key, child in list(self._children.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}")
+        return lines
+
+    def drain(self):
+        delta = {}
+        for key, child in list(self._children.items()):
+            with child._lock:
+                if child.value:
+                    delta[key], child.value = child.value, 0.0
+        return delta
+
+    def merge(self, delta):
+        for key, value in delta.items():
+            self.labels(*key).inc(value)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("child", "start")
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def render(self):
+        lines = self.header()
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def drain(self):
+        delta = {}
+        for key, child in list(self._children.items()):
+            with child._lock:
+                if any(child.counts):
+                    delta[key] = (child.counts, child.sum)
+                    child.counts, child.sum = [0] * len(child.counts), 0.0
+        return delta
+
+    def merge(self, delta):
+        for key, (counts, total) in delta.items():
+            child = self.labels(*key)
+            with child._lock:
+                child.counts = [a + b for a, b in zip(child.counts, counts)]
+                child.sum += total
+
+
+class CallbackMetric(_Metric):
+    """
+    Gauge (or counter) whose value is read from `callback` at scrape time.
+    The callback returns a number, or {label values tuple: number}.
+    """
+
+    def __init__(self, name, documentation, callback, labelnames=(), kind="gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def render(self):
+        values = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = self.header()
+        for key, value in values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+# ------------------------------------------------------
+# Registration
+# ------------------------------------------------------
+def _register(metric):
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            if isinstance(metric, CallbackMetric):
+                _registry[metric.name] = metric     # re-registration replaces the callback
+                return metric
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name, documentation, labelnames=()):
+    return _register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+def register_callback(name, documentation, callback, labelnames=(), kind="gauge"):
+    return _register(CallbackMetric(name, documentation, callback, labelnames, kind))
+
+
+def render():
+    """
+    Every registered metric in Prometheus text format.
+    """
+    lines = []
+    for metric in list(_registry.values()):
+        try:
+            lines.extend(metric.render())
+        except Exception as e:   # one broken callback must not break the scrape
+            lines.append(f"# {metric.name} unavailable: {e}")
+    return "\n".join(lines) + "\n"
+
+
+def drain():
+    """
+    Takes (and zeroes) this process's counter/histogram deltas, for
+    shipping from a pool worker process to the API process.
+    """
+    return {
+        name: metric.drain()
+        for name, metric in list(_registry.items())
+        if isinstance(metric, (Counter, Histogram))
+    }
+
+
+def merge(deltas):
+    for name, delta in deltas.items():
+        metric = _registry.get(name)
+        if metric is not None and delta:
+            metric.merge(delta)
@@ -0,0 +1,225 @@
+# backend/nlp/model_registry.py
+import os
+import threading
+import time
+
+from nlp import metrics
+from nlp.releases import ReleaseError, artifact_fingerprint
+
+# ------------------------------------------------------
+# Process-level model registry
+# ------------------------------------------------------
+# Serving modules register a loader per artifact (e.g. "intent") at import
+# time. The FastAPI app calls load_models() once at startup so requests only
+# ever read already-unpickled objects. Loaders must never train: a missing
+# artifact raises instead of kicking off a fit inside a request.
+#
+# Loaders also declare the files they read. reload_changed() reloads an
+# artifact whose files changed on disk (for model releases: whose checksums
+# differ in the new release, see releases.artifact_fingerprint) and bumps
+# generation(), which caches
+# use to drop results computed with the old models. With start_watcher()
+# that check runs on a background thread, so new models are loaded and
+# warmed off the request path and requests only ever see a finished swap.
+
+CHECK_INTERVAL = float(os.environ.get("CHATBOT_MODEL_CHECK_SECONDS", "10"))
+# CHATBOT_MODEL_WATCH=0 checks inline on the request path instead
+WATCH = os.environ.get("CHATBOT_MODEL_WATCH", "1") != "0"
+
+_loaders = {}        # name -> callable returning the loaded artifact
+_paths = {}          # name -> files the loader reads
+_warmups = {}        # name -> callable run on a freshly loaded artifact
+_models = {}         # name -> loaded artifact
+_fingerprints = {}   # name -> artifact_fingerprint() of each file at load time
+_failed = {}         # name -> fingerprint whose reload failed (not retried)
+_load_seconds = {}   # name -> time spent in the loader
+_generation = 0
+_last_check = 0.0
+_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_watcher = None
+_watcher_pid = None
+
+
+class ModelNotAvailableError(RuntimeError):
+    """Raised when a registered artifact cannot be loaded for serving."""
+
+
+def register_loader(name, loader, paths=(), warmup=None):
+    """
+    Register the loader used to build the artifact called `name`, the files
+    it reads (watched by reload_changed()) and an optional warmup(model)
+    run on every reload before the model is swapped in.
+    """
+    _loaders[name] = loader
+    _paths[name] = tuple(paths)
+    if warmup is not None:
+        _warmups[name] = warmup
+
+
+def load_models(names=None):
+    """
+    Eagerly load the given artifacts (all registered ones by default).
+    Fails fast with ModelNotAvailableError if any artifact is missing.
+    """
+    for name in names or list(_loaders):
+        _load(name)
+    return dict(_models)
+
+
+def get_model(name):
+    """
+    Return a loaded artifact, loading it on first use if startup was skipped
+    (scripts, notebooks). Never trains.
+    """
+    # Membership, not truthiness: optional artifacts may load as None
+    if name in _models:
+        return _models[name]
+    return _load(name)
+
+
+def load_timings():
+    """
+    Seconds spent loading each artifact, for startup reporting.
+    """
+    return dict(_load_seconds)
+
+
+def generation():
+    """
+    Counter bumped whenever a loaded artifact is replaced or dropped.
+    """
+    return _generation
+
+
+def reload_changed(force=False):
+    """
+    Reload loaded artifacts whose files changed on disk. Checks at most once
+    per CHECK_INTERVAL seconds; if the new files fail to load, the old
+    models stay in place. Every changed artifact is loaded and warmed
+    first, then all of them are swapped in together under one generation.
+    While this process's watcher thread is running, request-path calls
+    return immediately and the watcher does the work.
+    Returns the names that were reloaded.
+    """
+    global _last_check, _generation
+
+    if not force and _watching() and threading.current_thread() is not _watcher:
+        return []
+    now = time.monotonic()
+    if not force and now - _last_check < CHECK_INTERVAL:
+        return []
+    _last_check = now
+
+    with _reload_lock:
+        fresh = {}
+        for name in list(_models):
+            fingerprint = _fingerprint(name)
+            if fingerprint in (_fingerprints.get(name), _failed.get(name)):
+                continue
+            start = time.perf_counter()
+            try:
+                model = _loaders[name]()
+                if name in _warmups:
+                    _warmups[name](model)
+            except Exception as e:
+                # Retried once the files change again (e.g. a rollback)
+                print(f"⚠️ Keeping current '{name}' model, reload failed: {e}")
+                MODEL_RELOADS.labels(name, "failed").inc()
+                _failed[name] = fingerprint
+                continue
+            fresh[name] = (model, fingerprint, time.perf_counter() - start)
+
+        if fresh:
+            with _lock:
+                for name, (model, fingerprint, seconds) in fresh.items():
+                    _models[name] = model
+                    _fingerprints[name] = fingerprint
+                    _load_seconds[name] = seconds
+                _generation += 1
+            for name in fresh:
+                MODEL_RELOADS.labels(name, "ok").inc()
+            print(f"🔄 Swapped in new models: {', '.join(fresh)}")
+    return list(fresh)
+
+
+def start_watcher(interval=CHECK_INTERVAL):
+    """
+    Starts (once per process) a daemon thread that runs reload_changed()
+    every `interval` seconds. No-op when CHATBOT_MODEL_WATCH=0.
+    """
+    global _watcher, _watcher_pid
+
+    if not WATCH or _watching():
+        return
+    # A forked worker inherits the variable but not the thread
+    _watcher_pid = os.getpid()
+    _watcher = threading.Thread(target=_watch, args=(interval,), name="model-watcher", daemon=True)
+    _watcher.start()
+
+
+def _watching():
+    return _watcher is not None and _watcher_pid == os.getpid() and _watcher.is_alive()
+
+
+def _watch(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            reload_changed(force=True)
+        except Exception as e:
+            # Keep watching; the current models stay in place
+            print(f"⚠️ Model check failed: {e}")
+
+
+def clear_models():
+    """
+    Drop every loaded artifact so the next get_model() reloads from disk.
+    """
+    global _generation
+
+    with _lock:
+        _models.clear()
+        _fingerprints.clear()
+        _failed.clear()
+        _load_seconds.clear()
+        _generation += 1
+
+
+def _load(name):
+    if name not in _loaders:
+        raise ModelNotAvailableError(f"No loader registered for model '{name}'")
+
+    with _lock:
+        # Another thread may have finished loading while we waited
+        if name in _models:
+            return _models[name]
+
+        start = time.perf_counter()
+        fingerprint = _fingerprint(name)
+        try:
+            model = _loaders[name]()
+            if name in _warmups:
+                _warmups[name](model)
+        except (FileNotFoundError, ReleaseError) as e:
+            raise ModelNotAvailableError(f"Model '{name}' is not available: {e}") from e
+        _load_seconds[name] = time.perf_counter() - start
+        _fingerprints[name] = fingerprint
+        _models[name] = model
+        return model
+
+
+def _fingerprint(name):
+    return tuple(artifact_fingerprint(path) for path in _paths.get(name, ()))
+
+
+MODEL_RELOADS = metrics.counter(
+    "chatbot_model_reloads_total", "Model hot reloads by outcome", ["model", "result"]
+)
+metrics.register_callback(
+    "chatbot_model_load_seconds", "Seconds the last load of each model artifact took",
+    lambda: {(name,): seconds for name, seconds in load_timings().items()}, ["model"],
+)
+metrics.register_callback(
+    "chatbot_model_generation", "Bumped whenever a loaded model is replaced", generation,
+)
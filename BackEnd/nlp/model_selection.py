@@ -0,0 +1,266 @@
+# backend/nlp/model_selection.py
+"""
+Model selection for the intent classifier.
+
+Runs a grid of vectorizer × classifier settings with stratified k-fold CV
+across a process pool and reports cost next to accuracy for each candidate:
+CV accuracy, featurise / fit wall-clock, peak fit memory, exported model
+size and single-message inference latency (NumPy engine).
+
+Featurised folds are cached on disk, keyed by the dataset contents, the
+vectorizer settings and the fold layout, so a vectorizer setting is only
+computed once per fold no matter how many classifier settings use it, and
+re-runs skip featurisation entirely.
+
+    cd backend
+    python -m nlp.model_selection                       # default grid
+    python -m nlp.model_selection --grid grid.json --folds 5 --workers 4 --json report.json
+
+grid.json: {"vectorizers": [{"featurizer": "vocab", "ngram_range": [2, 5]}, ...],
+            "classifiers": [{"C": 1.0}, ...]}
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+
+from nlp.intent_model import DATA_PATH, build_classifier, build_vectorizer, clean_dataset
+from nlp.artifacts import artifact_bytes
+from nlp.intent_engine import IntentEngine, export_intent_engine
+
+BASE_DIR = os.path.dirname(__file__)
+CACHE_DIR = os.path.join(BASE_DIR, "../models/.cache/model_selection")
+
+# Bump when the cached fold format changes
+CACHE_VERSION = 1
+LATENCY_SAMPLE = 200
+
+DEFAULT_GRID = {
+    "vectorizers": [
+        {"featurizer": "vocab"},
+        {"featurizer": "vocab", "ngram_range": [2, 5]},
+        {"featurizer": "hashed", "n_features": 8192},
+        {"featurizer": "hashed", "n_features": 32768},
+    ],
+    "classifiers": [
+        {"C": 0.5},
+        {"C": 1.0},
+        {"C": 4.0},
+    ],
+}
+
+
+# ===============================
+# 👷 Worker side
+# ===============================
+_texts = None
+_labels = None
+
+
+def _init_worker(data_path):
+    global _texts, _labels
+    _texts, _labels = load_dataset(data_path)
+
+
+def load_dataset(data_path=DATA_PATH):
+    import pandas as pd
+
+    df = clean_dataset(pd.read_csv(data_path))
+    return df["query"].to_numpy(dtype=object), df["intent"].to_numpy(dtype=object)
+
+
+def _featurize_fold(cache_path, vectorizer_params, train_idx, test_idx):
+    """
+    Fits the vectorizer on one training fold and caches both matrices.
+    """
+    if os.path.exists(cache_path):
+        return cache_path, True, joblib.load(cache_path)["seconds"]
+
+    start = time.perf_counter()
+    vectorizer = build_vectorizer(**vectorizer_params)
+    X_train = vectorizer.fit_transform(_texts[train_idx])
+    X_test = vectorizer.transform(_texts[test_idx])
+    seconds = time.perf_counter() - start
+
+    # Write-then-rename so a killed run never leaves a truncated cache entry
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    joblib.dump({"X_train": X_train, "X_test": X_test, "seconds": seconds}, tmp_path)
+    os.replace(tmp_path, cache_path)
+    return cache_path, False, seconds
+
+
+def _fit_fold(cache_path, classifier_params, train_idx, test_idx):
+    """
+    Fits one classifier setting on a cached fold.
+    Returns (accuracy, fit seconds, peak traced MB).
+    """
+    fold = joblib.load(cache_path)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    model = build_classifier(n_jobs=1, **classifier_params)
+    model.fit(fold["X_train"], _labels[train_idx])
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    accuracy = float((model.predict(fold["X_test"]) == _labels[test_idx]).mean())
+    return accuracy, seconds, peak / 2 ** 20
+
+
+def _fit_full(vectorizer_params, classifier_params, engine_path):
+    """
+    Fits a candidate on the whole dataset and exports it, for size/latency.
+    """
+    vectorizer = build_vectorizer(**vectorizer_params)
+    X = vectorizer.fit_transform(_texts)
+    model = build_classifier(n_jobs=1, **classifier_params)
+    model.fit(X, _labels)
+    export_intent_engine(model, vectorizer, engine_path)
+    return len(pickle.dumps(model)) + len(pickle.dumps(vectorizer))
+
+
+# ===============================
+# 🧮 Driver
+# ===============================
+def _dataset_digest(data_path):
+    digest = hashlib.sha256()
+    with open(data_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fold_cache_path(data_digest, vectorizer_params, folds, seed, fold):
+    key = json.dumps(
+        [CACHE_VERSION, data_digest, vectorizer_params, folds, seed, fold], sort_keys=True
+    )
+    return os.path.join(CACHE_DIR, hashlib.sha256(key.encode()).hexdigest()[:24] + ".joblib")
+
+
+def _latency_us(engine_path, texts):
+    engine = IntentEngine.load(engine_path)
+    engine.predict_proba(texts)     # warm up (hash cache, allocator)
+    start = time.perf_counter()
+    for text in texts:
+        engine.predict_proba([text])
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def run_model_selection(grid=None, folds=5, seed=42, workers=None, data_path=DATA_PATH):
+    """
+    Evaluates every vectorizer × classifier combination in `grid`.
+    Returns one result dict per candidate, best CV accuracy first.
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    grid = grid or DEFAULT_GRID
+    vectorizers, classifiers = grid["vectorizers"], grid["classifiers"]
+    workers = workers or os.cpu_count()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    texts, labels = load_dataset(data_path)
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(texts, labels))
+    data_digest = _dataset_digest(data_path)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_path,)) as pool:
+        # 1) Featurise each (vectorizer, fold) once — or reuse the cache
+        featurize_jobs = {}
+        for v, vectorizer_params in enumerate(vectorizers):
+            for f, (train_idx, test_idx) in enumerate(splits):
+                path = _fold_cache_path(data_digest, vectorizer_params, folds, seed, f)
+                featurize_jobs[v, f] = pool.submit(_featurize_fold, path, vectorizer_params, train_idx, test_idx)
+        featurized = {key: job.result() for key, job in featurize_jobs.items()}
+        cache_hits = sum(cached for _, cached, _ in featurized.values())
+        print(f"📦 Featurised folds: {len(featurized)} ({cache_hits} from cache)")
+
+        # 2) Every classifier setting on every cached fold
+        fit_jobs = {}
+        for v in range(len(vectorizers)):
+            for c, classifier_params in enumerate(classifiers):
+                for f, (train_idx, test_idx) in enumerate(splits):
+                    path = featurized[v, f][0]
+                    fit_jobs[v, c, f] = pool.submit(_fit_fold, path, classifier_params, train_idx, test_idx)
+
+        # 3) Full-data fit per candidate for model size / latency
+        tmp_dir = tempfile.mkdtemp(prefix="model_selection-")
+        full_jobs = {}
+        for v, vectorizer_params in enumerate(vectorizers):
+            for c, classifier_params in enumerate(classifiers):
+                engine_path = os.path.join(tmp_dir, f"{v}-{c}")
+                full_jobs[v, c] = (engine_path, pool.submit(_fit_full, vectorizer_params, classifier_params, engine_path))
+
+        fold_results = {key: job.result() for key, job in fit_jobs.items()}
+        full_results = {key: (path, job.result()) for key, (path, job) in full_jobs.items()}
+
+    # Latency is measured here, one candidate at a time, so pool workers
+    # don't compete for the CPU while we time
+    rng = np.random.default_rng(seed)
+    sample = list(rng.choice(texts, size=min(LATENCY_SAMPLE, len(texts)), replace=False))
+
+    results = []
+    for (v, c), (engine_path, pickled_bytes) in full_results.items():
+        accuracies = [fold_results[v, c, f][0] for f in range(folds)]
+        results.append({
+            "vectorizer": vectorizers[v],
+            "classifier": classifiers[c],
+            "cv_accuracy": float(np.mean(accuracies)),
+            "cv_std": float(np.std(accuracies)),
+            "featurize_seconds": float(sum(featurized[v, f][2] for f in range(folds))),
+            "fit_seconds": float(np.mean([fold_results[v, c, f][1] for f in range(folds)])),
+            "peak_fit_mb": float(max(fold_results[v, c, f][2] for f in range(folds))),
+            "engine_kb": artifact_bytes(engine_path) / 1024,
+            "pickled_kb": pickled_bytes / 1024,
+            "latency_us": _latency_us(engine_path, sample),
+        })
+        shutil.rmtree(engine_path)
+    os.rmdir(tmp_dir)
+
+    print(f"⏱️ Model selection finished in {time.perf_counter() - started:.1f}s "
+          f"({len(results)} candidates × {folds} folds, {workers} workers)")
+    return sorted(results, key=lambda r: -r["cv_accuracy"])
+
+
+def print_results(results):
+    print(f"\n{'vectorizer':<48}{'classifier':<14}{'acc':>7}{'±':>7}{'feat s':>8}{'fit s':>7}"
+          f"{'peak MB':>9}{'engine KB':>11}{'pkl KB':>8}{'µs/msg':>8}")
+    for r in results:
+        vectorizer = json.dumps(r["vectorizer"], sort_keys=True)
+        classifier = json.dumps(r["classifier"], sort_keys=True)
+        print(f"{vectorizer:<48}{classifier:<14}{r['cv_accuracy']:>7.3f}{r['cv_std']:>7.3f}"
+              f"{r['featurize_seconds']:>8.2f}{r['fit_seconds']:>7.2f}{r['peak_fit_mb']:>9.1f}"
+              f"{r['engine_kb']:>11.0f}{r['pickled_kb']:>8.0f}{r['latency_us']:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validated grid search for the intent model")
+    parser.add_argument("--grid", help="JSON file with 'vectorizers' and 'classifiers' lists")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all CPUs)")
+    parser.add_argument("--data", default=DATA_PATH, help="training CSV (query, intent)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    grid = None
+    if args.grid:
+        with open(args.grid, "r", encoding="utf-8") as f:
+            grid = json.load(f)
+
+    results = run_model_selection(grid, args.folds, args.seed, args.workers, args.data)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
@@ -0,0 +1,391 @@
+# backend/nlp/online_learning.py
+"""
+Incremental intent learning from production corrections.
+
+An SGDClassifier(log_loss) over a stateless hashed char n-gram space
+(HashingVectorizer + sublinear tf, no idf), so new data can be folded in
+with partial_fit without refitting a vocabulary. Every update is saved as
+a numbered snapshot under models/online/ and exported as an intent engine;
+`publish` puts a snapshot's engine into a new model release (nlp/releases.py),
+which the serving workers swap to on their next model check.
+
+    cd backend
+    python -m nlp.online_learning init                          # v0001 from intents.csv
+    python -m nlp.online_learning review-queue --since 2026-10-01 --out review.csv
+    #   ... fill in the `label` column ...
+    python -m nlp.online_learning apply review.csv [--publish]
+    python -m nlp.online_learning drift v0001 v0002
+    python -m nlp.online_learning publish v0002
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import time
+from collections import Counter
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from nlp.intent_model import DATA_PATH, build_vectorizer, clean_dataset
+from nlp.intent_engine import ENGINE_PATH, export_intent_engine
+from nlp.releases import new_release
+
+BASE_DIR = os.path.dirname(__file__)
+ONLINE_DIR = os.path.join(BASE_DIR, "../models/online")
+LATEST_PATH = os.path.join(ONLINE_DIR, "LATEST")
+
+N_FEATURES = 2 ** 13
+SGD_ALPHA = 1e-5
+BATCH_SIZE = 256
+BOOTSTRAP_EPOCHS = 10
+UPDATE_EPOCHS = 3
+REPLAY_RATIO = 1.0          # intents.csv rows mixed in per correction (avoids forgetting)
+REFERENCE_SIZE = 5000
+
+# Logged intents worth a human look (see response_manager.generate_responses)
+REVIEW_INTENTS = ["low_confidence", "uncertain"]
+UNCERTAIN_THRESHOLD = 0.55  # predict_intent's default confidence threshold
+PSI_BINS = 10
+
+
+# ===============================
+# 🧱 Model + snapshots
+# ===============================
+def build_online_model(n_features=N_FEATURES):
+    from sklearn.linear_model import SGDClassifier
+
+    vectorizer = build_vectorizer("hashed", n_features)
+    # No idf: document frequencies would drift as data arrives
+    vectorizer.set_params(tfidf__use_idf=False)
+    vectorizer.fit([""])    # stateless, but sklearn wants it fitted
+    model = SGDClassifier(loss="log_loss", alpha=SGD_ALPHA, random_state=42)
+    return model, vectorizer
+
+
+def _load_training_data():
+    import pandas as pd
+
+    df = clean_dataset(pd.read_csv(DATA_PATH))
+    return df["query"].to_numpy(dtype=object), df["intent"].to_numpy(dtype=object)
+
+
+def _partial_fit(model, vectorizer, texts, labels, classes, epochs, seed):
+    rng = np.random.default_rng(seed)
+    X = vectorizer.transform(texts)
+    labels = np.asarray(labels, dtype=object)
+    for _ in range(epochs):
+        order = rng.permutation(len(labels))
+        for start in range(0, len(order), BATCH_SIZE):
+            rows = order[start:start + BATCH_SIZE]
+            model.partial_fit(X[rows], labels[rows], classes=classes)
+
+
+def latest_version():
+    if not os.path.exists(LATEST_PATH):
+        return None
+    with open(LATEST_PATH, "r", encoding="utf-8") as f:
+        return f.read().strip() or None
+
+
+def load_version(version=None):
+    """
+    (model, vectorizer, meta) of a snapshot (default: the latest one).
+    """
+    version = version or latest_version()
+    if version is None:
+        raise FileNotFoundError(f"No online model in {ONLINE_DIR} (run `python -m nlp.online_learning init`)")
+    directory = os.path.join(ONLINE_DIR, version)
+    model, vectorizer = joblib.load(os.path.join(directory, "model.joblib"))
+    with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    return model, vectorizer, meta
+
+
+def save_version(model, vectorizer, meta):
+    """
+    Writes models/online/vNNNN/{model.joblib, intent_engine/, meta.json}
+    and points LATEST at it. Returns the version name.
+    """
+    os.makedirs(ONLINE_DIR, exist_ok=True)
+    existing = [int(d[1:]) for d in os.listdir(ONLINE_DIR) if d.startswith("v") and d[1:].isdigit()]
+    version = f"v{max(existing, default=0) + 1:04d}"
+    meta = dict(meta, version=version, created_at=datetime.now().isoformat(timespec="seconds"))
+
+    # Build the snapshot next to its final name, then rename it into place
+    tmp_dir = os.path.join(ONLINE_DIR, f".{version}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    joblib.dump((model, vectorizer), os.path.join(tmp_dir, "model.joblib"))
+    export_intent_engine(model, vectorizer, os.path.join(tmp_dir, "intent_engine"))
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_dir, os.path.join(ONLINE_DIR, version))
+
+    tmp_latest = LATEST_PATH + ".tmp"
+    with open(tmp_latest, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_latest, LATEST_PATH)
+
+    print(f"💾 Saved online model {version}")
+    return version
+
+
+def publish(version=None):
+    """
+    Makes a snapshot the serving intent model: publishes a release with
+    its engine (workers swap to it on their next check).
+    """
+    version = version or latest_version()
+    if version is None:
+        raise FileNotFoundError(f"No online model in {ONLINE_DIR} (run `python -m nlp.online_learning init`)")
+    engine_dir = os.path.join(ONLINE_DIR, version, "intent_engine")
+    if not os.path.isdir(engine_dir):
+        raise FileNotFoundError(f"No online model {version} in {ONLINE_DIR}")
+    with new_release(f"online model {version}") as release:
+        shutil.copytree(engine_dir, release.path(ENGINE_PATH))
+    print(f"🚀 Published {version}")
+
+
+# ===============================
+# 🏁 Bootstrap
+# ===============================
+def init_online_model(n_features=N_FEATURES):
+    """
+    First snapshot: a few partial_fit passes over intents.csv.
+    """
+    start = time.perf_counter()
+    texts, labels = _load_training_data()
+    model, vectorizer = build_online_model(n_features)
+    classes = np.unique(labels)
+    _partial_fit(model, vectorizer, texts, labels, classes, BOOTSTRAP_EPOCHS, seed=0)
+
+    accuracy = float((model.predict(vectorizer.transform(texts)) == labels).mean())
+    return save_version(model, vectorizer, {
+        "parent": None,
+        "source": os.path.basename(DATA_PATH),
+        "rows": int(len(labels)),
+        "n_features": n_features,
+        "seconds": round(time.perf_counter() - start, 3),
+        "train_accuracy": accuracy,
+    })
+
+
+# ===============================
+# 📝 Review queue
+# ===============================
+def export_review_queue(out_path, since=None, until=None, limit=None):
+    """
+    Writes the distinct low-confidence / uncertain queries from the
+    interaction log to a CSV for labelling, most frequent first, with the
+    current online model's guess as a starting point. Returns the row count.
+    """
+    from nlp import log_store
+
+    table = log_store.read_table(
+        columns=["query", "intent"], since=since, until=until,
+        filters=[("intent", "in", REVIEW_INTENTS)],
+    )
+    counts = Counter()
+    logged = {}
+    for query, intent in zip(table["query"].to_pylist(), table["intent"].to_pylist()):
+        key = " ".join((query or "").lower().split())
+        if key:
+            counts[key] += 1
+            logged.setdefault(key, intent)
+
+    rows = counts.most_common(limit)
+    suggestions = [("", 0.0)] * len(rows)
+    if rows and latest_version():
+        model, vectorizer, _ = load_version()
+        probs = model.predict_proba(vectorizer.transform([query for query, _ in rows]))
+        suggestions = [(model.classes_[p.argmax()], float(p.max())) for p in probs]
+
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["query", "count", "logged_intent", "suggested_intent", "confidence", "label"])
+        for (query, count), (suggested, confidence) in zip(rows, suggestions):
+            writer.writerow([query, count, logged[query], suggested, f"{confidence:.3f}", ""])
+
+    print(f"📝 {len(rows)} queries to review → {out_path}")
+    return len(rows)
+
+
+def read_corrections(path):
+    """
+    (texts, labels) from a reviewed CSV; rows without a label are skipped.
+    """
+    texts, labels = [], []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            query = " ".join((row.get("query") or "").lower().split())
+            label = (row.get("label") or "").strip().lower()
+            if query and label:
+                texts.append(query)
+                labels.append(label)
+    return texts, labels
+
+
+# ===============================
+# 🔁 Incremental update
+# ===============================
+def apply_corrections(path, epochs=UPDATE_EPOCHS, replay=REPLAY_RATIO, do_publish=False, since=None):
+    """
+    Folds labelled corrections into the latest snapshot in mini-batches
+    (mixed with a replay sample of intents.csv), saves a new version and
+    prints the confidence drift against its parent.
+    """
+    start = time.perf_counter()
+    model, vectorizer, parent_meta = load_version()
+    parent = joblib.load(os.path.join(ONLINE_DIR, parent_meta["version"], "model.joblib"))[0]
+
+    texts, labels = read_corrections(path)
+    known = set(model.classes_)
+    unknown = Counter(label for label in labels if label not in known)
+    if unknown:
+        print(f"⚠️ Skipping {sum(unknown.values())} corrections with unknown intents: {dict(unknown)}")
+    keep = [i for i, label in enumerate(labels) if label in known]
+    texts = [texts[i] for i in keep]
+    labels = [labels[i] for i in keep]
+    if not texts:
+        print("Nothing to apply.")
+        return None
+
+    base_texts, base_labels = _load_training_data()
+    rng = np.random.default_rng(len(texts))
+    replay_rows = rng.choice(len(base_labels), size=min(len(base_labels), int(len(texts) * replay)), replace=False)
+    train_texts = texts + list(base_texts[replay_rows])
+    train_labels = labels + list(base_labels[replay_rows])
+
+    corrections_before = float((model.predict(vectorizer.transform(texts)) == np.array(labels, dtype=object)).mean())
+    _partial_fit(model, vectorizer, train_texts, train_labels, model.classes_, epochs, seed=len(texts))
+
+    corrections_after = float((model.predict(vectorizer.transform(texts)) == np.array(labels, dtype=object)).mean())
+    base_accuracy = float((model.predict(vectorizer.transform(base_texts)) == base_labels).mean())
+    drift = confidence_drift(parent, model, vectorizer, _reference_texts(since))
+
+    version = save_version(model, vectorizer, {
+        "parent": parent_meta["version"],
+        "source": os.path.basename(path),
+        "rows": len(texts),
+        "replay_rows": int(len(replay_rows)),
+        "n_features": parent_meta["n_features"],
+        "seconds": round(time.perf_counter() - start, 3),
+        "corrections_accuracy_before": corrections_before,
+        "corrections_accuracy_after": corrections_after,
+        "train_accuracy": base_accuracy,
+        "drift": drift,
+    })
+
+    print(f"✅ {len(texts)} corrections applied in {time.perf_counter() - start:.2f}s")
+    print(f"   corrections accuracy {corrections_before:.3f} → {corrections_after:.3f}, "
+          f"intents.csv accuracy {base_accuracy:.3f}")
+    print_drift(drift)
+
+    if do_publish:
+        publish(version)
+    return version
+
+
+# ===============================
+# 📉 Confidence drift
+# ===============================
+def _reference_texts(since=None):
+    """
+    Recent logged queries (what users actually send), else intents.csv.
+    """
+    texts = []
+    try:
+        from nlp import log_store
+        if log_store.available():
+            texts = [q for q in log_store.read_table(columns=["query"], since=since)["query"].to_pylist() if q]
+    except OSError:
+        texts = []
+    if not texts:
+        texts = list(_load_training_data()[0])
+    if len(texts) > REFERENCE_SIZE:
+        rng = np.random.default_rng(0)
+        texts = list(rng.choice(np.array(texts, dtype=object), size=REFERENCE_SIZE, replace=False))
+    return texts
+
+
+def _psi(before, after, bins=PSI_BINS):
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    expected = np.histogram(before, edges)[0] / len(before) + 1e-4
+    actual = np.histogram(after, edges)[0] / len(after) + 1e-4
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def confidence_drift(old_model, new_model, vectorizer, texts):
+    """
+    Compares the top-class confidence distributions of two models on the
+    same texts: mean, share below the uncertain threshold, PSI, and how many
+    predicted labels changed.
+    """
+    X = vectorizer.transform(texts)
+    old_probs = old_model.predict_proba(X)
+    new_probs = new_model.predict_proba(X)
+    old_conf, new_conf = old_probs.max(axis=1), new_probs.max(axis=1)
+    changed = old_model.classes_[old_probs.argmax(axis=1)] != new_model.classes_[new_probs.argmax(axis=1)]
+    return {
+        "texts": len(texts),
+        "mean_confidence": [float(old_conf.mean()), float(new_conf.mean())],
+        "uncertain_share": [float((old_conf < UNCERTAIN_THRESHOLD).mean()),
+                            float((new_conf < UNCERTAIN_THRESHOLD).mean())],
+        "psi": _psi(old_conf, new_conf),
+        "label_changes": float(changed.mean()),
+    }
+
+
+def print_drift(drift):
+    (mean_old, mean_new), (unc_old, unc_new) = drift["mean_confidence"], drift["uncertain_share"]
+    print(f"📉 Confidence drift on {drift['texts']} reference texts:")
+    print(f"   mean confidence   {mean_old:.3f} → {mean_new:.3f}")
+    print(f"   < {UNCERTAIN_THRESHOLD} confidence  {unc_old:.1%} → {unc_new:.1%}")
+    print(f"   PSI               {drift['psi']:.4f}  (> 0.25 is a major shift)")
+    print(f"   labels changed    {drift['label_changes']:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental intent learning")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    init = commands.add_parser("init", help="bootstrap v0001 from intents.csv")
+    init.add_argument("--n-features", type=int, default=N_FEATURES)
+
+    queue = commands.add_parser("review-queue", help="export low-confidence queries for labelling")
+    queue.add_argument("--out", default="review_queue.csv")
+    queue.add_argument("--since")
+    queue.add_argument("--until")
+    queue.add_argument("--limit", type=int)
+
+    apply = commands.add_parser("apply", help="fold a labelled CSV into a new version")
+    apply.add_argument("path")
+    apply.add_argument("--epochs", type=int, default=UPDATE_EPOCHS)
+    apply.add_argument("--replay", type=float, default=REPLAY_RATIO)
+    apply.add_argument("--since", help="reference traffic for the drift report")
+    apply.add_argument("--publish", action="store_true")
+
+    drift = commands.add_parser("drift", help="confidence drift between two versions")
+    drift.add_argument("old")
+    drift.add_argument("new")
+    drift.add_argument("--since")
+
+    pub = commands.add_parser("publish", help="serve a version's intent engine")
+    pub.add_argument("version", nargs="?")
+
+    args = parser.parse_args()
+    if args.command == "init":
+        init_online_model(args.n_features)
+    elif args.command == "review-queue":
+        export_review_queue(args.out, args.since, args.until, args.limit)
+    elif args.command == "apply":
+        apply_corrections(args.path, args.epochs, args.replay, args.publish, args.since)
+    elif args.command == "drift":
+        old_model, vectorizer, _ = load_version(args.old)
+        new_model, _, _ = load_version(args.new)
+        print_drift(confidence_drift(old_model, new_model, vectorizer, _reference_texts(args.since)))
+    elif args.command == "publish":
+        publish(args.version)
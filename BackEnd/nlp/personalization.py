@@ -2,59 +2,48 @@
 import json
 import os
 
+from nlp.profile_store import get_store
+
 # ------------------------------------------------------
 # Setup
 # ------------------------------------------------------
 BASE_DIR = os.path.dirname(__file__)
 USER_FILE = os.path.join(BASE_DIR, "../data/user_profiles.json")
 
-# Cache user data after first load
-_user_cache = None
+DEFAULT_PROFILE = {
+    "name": "Guest",
+    "preferred_product": "item",
+    "recent_order": "#0000"
+}
 
 # ------------------------------------------------------
 # Helper: Load user profiles safely
 # ------------------------------------------------------
 def load_user_profiles():
-    global _user_cache
-
-    if _user_cache is not None:
-        return _user_cache  # return cached data
-
+    """
+    Every profile in user_profiles.json. Only for scripts and small
+    deployments; the request path looks users up one at a time through
+    nlp.profile_store.
+    """
     if not os.path.exists(USER_FILE):
         print(f"⚠️ user_profiles.json not found at {USER_FILE}. Using default guest profile.")
-        _user_cache = {
-            "guest": {
-                "name": "Guest",
-                "preferred_product": "item",
-                "recent_order": "#0000"
-            }
-        }
-        return _user_cache
+        return {"guest": dict(DEFAULT_PROFILE)}
 
     try:
         with open(USER_FILE, "r", encoding="utf-8") as f:
-            _user_cache = json.load(f)
+            return json.load(f)
     except json.JSONDecodeError:
         print("⚠️ user_profiles.json is invalid JSON. Using default profile.")
-        _user_cache = {
-            "guest": {
-                "name": "Guest",
-                "preferred_product": "item",
-                "recent_order": "#0000"
-            }
-        }
-    return _user_cache
+        return {"guest": dict(DEFAULT_PROFILE)}
 
 # ------------------------------------------------------
 # Get user profile
 # ------------------------------------------------------
 def get_user_profile(user_id):
-    users = load_user_profiles()
-    profile = users.get(user_id, users.get("guest", {
-        "name": "Guest",
-        "preferred_product": "item",
-        "recent_order": "#0000"
-    }))
+    store = get_store()
+    profile = store.get(user_id)
+    if profile is None:
+        profile = store.get("guest") or DEFAULT_PROFILE
     return profile
 
 # ------------------------------------------------------
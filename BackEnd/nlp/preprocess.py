@@ -1,4 +1,3 @@
-import pandas as pd
 import os
 import re
 
@@ -42,6 +41,8 @@ def map_intent(query):
     return "other"   # fallback
 
 def preprocess():
+    import pandas as pd  # batch preprocessing only; keeps clean_text import light
+
     df = pd.read_csv(RAW_PATH)
 
     # Keep only query column
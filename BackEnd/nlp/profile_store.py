@@ -0,0 +1,334 @@
+# backend/nlp/profile_store.py
+"""
+User profile lookup for personalisation.
+
+SQLiteProfileStore keeps profiles in data/user_profiles.db (one row per
+user_id, JSON profile) and answers point lookups through a small
+per-process LRU, so a worker only holds the customers it has recently
+served. JSONProfileStore is the fallback for small deployments that only
+have data/user_profiles.json.
+
+Both notice changes without a restart: at most every CHECK_INTERVAL
+seconds the SQLite store checks PRAGMA data_version (in-place writes) and
+the file's inode (a rebuilt database swapped in), the JSON store checks
+the file's mtime; on a change the LRU / parsed file is dropped.
+
+    cd backend
+    python -m nlp.profile_store import data/user_profiles.json     # build / rebuild the DB
+    python -m nlp.profile_store import new_customers.jsonl --upsert
+    python -m nlp.profile_store get user42
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# ------------------------------------------------------
+# Configuration (environment overrides)
+# ------------------------------------------------------
+BASE_DIR = os.path.dirname(__file__)
+JSON_PATH = os.path.join(BASE_DIR, "../data/user_profiles.json")
+DB_PATH = os.environ.get("CHATBOT_PROFILE_DB", os.path.join(BASE_DIR, "../data/user_profiles.db"))
+PROFILE_BACKEND = os.environ.get("CHATBOT_PROFILE_BACKEND", "auto")   # "auto" | "sqlite" | "json"
+CACHE_SIZE = int(os.environ.get("CHATBOT_PROFILE_CACHE_SIZE", "10000"))
+CHECK_INTERVAL = float(os.environ.get("CHATBOT_PROFILE_CHECK_SECONDS", "5"))
+IMPORT_BATCH = 10000
+
+_MISSING = object()     # cached "no such user"
+
+
+class SQLiteProfileStore:
+    """
+    Indexed point lookups by user_id with a per-process LRU in front.
+    """
+
+    def __init__(self, path=DB_PATH, cache_size=CACHE_SIZE, check_interval=CHECK_INTERVAL):
+        self.path = path
+        self.cache_size = cache_size
+        self.check_interval = check_interval
+        self._cache = OrderedDict()     # user_id -> profile dict or _MISSING
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._local = threading.local()
+        self._watch_conn = None     # only used for change detection
+        self._watch_pid = None
+        self._file_id = None
+        self._data_version = None
+        self._last_check = float("-inf")
+        self._unavailable = False   # DB missing (or being swapped) at the last check
+
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _connect(self):
+        return sqlite3.connect(
+            f"file:{os.path.abspath(self.path)}?mode=ro", uri=True, timeout=5.0, check_same_thread=False,
+        )
+
+    def _connection(self):
+        # One read-only connection per thread and per process
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid() or self._local.file_id != self._file_id:
+            if conn is not None:
+                conn.close()
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.file_id = self._file_id
+        return conn
+
+    def _check_for_changes(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        with self._check_lock:
+            if now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+
+            try:
+                stat = os.stat(self.path)
+            except OSError as e:
+                # Deleted or mid-replace: keep the cached profiles, retry next check
+                if not self._unavailable:
+                    print(f"⚠️ Profile DB unavailable ({e}). Serving cached profiles only.")
+                    self._unavailable = True
+                return
+            if self._unavailable:
+                print(f"✅ Profile DB {self.path} is available again.")
+                self._unavailable = False
+            file_id = (stat.st_ino, stat.st_dev)
+            if file_id != self._file_id or self._watch_pid != os.getpid():
+                # First use, a forked worker, or the file was replaced by a rebuild
+                changed = self._file_id not in (None, file_id)
+                self._file_id = file_id
+                if self._watch_conn is not None and self._watch_pid == os.getpid():
+                    self._watch_conn.close()
+                # (a connection inherited through fork is never reused)
+                self._watch_conn = self._connect()
+                self._watch_pid = os.getpid()
+                self._data_version = self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+                if changed:
+                    self._invalidate()
+                return
+
+            # data_version is per connection, so always ask the same one
+            data_version = self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._invalidate()
+
+    def _invalidate(self):
+        with self._lock:
+            self._cache.clear()
+        self.reloads += 1
+
+    def get(self, user_id):
+        """
+        The user's profile dict, or None if there is no such user (or the
+        DB is unavailable and the user is not cached).
+        """
+        self._check_for_changes()
+        with self._lock:
+            profile = self._cache.get(user_id)
+            if profile is not None:
+                self._cache.move_to_end(user_id)
+                self.hits += 1
+                return None if profile is _MISSING else profile
+            self.misses += 1
+        if self._unavailable:
+            return None
+
+        row = self._connection().execute(
+            "SELECT profile FROM profiles WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        profile = json.loads(row[0]) if row else None
+
+        with self._lock:
+            self._cache[user_id] = _MISSING if profile is None else profile
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return profile
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": "sqlite",
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "reloads": self.reloads,
+            "available": not self._unavailable,
+        }
+
+
+class JSONProfileStore:
+    """
+    The whole JSON file in memory, re-read when its mtime changes.
+    """
+
+    def __init__(self, path=JSON_PATH, check_interval=CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._profiles = {}
+        self._mtime = -1          # never read yet
+        self._last_check = float("-inf")
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def _check_for_changes(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        if mtime is None:
+            print(f"⚠️ {self.path} not found. Using default guest profile.")
+
+        with self._lock:
+            self._mtime = mtime
+            self._profiles = _read_json_profiles(self.path) if mtime is not None else {}
+            self.reloads += 1
+
+    def get(self, user_id):
+        self._check_for_changes()
+        return self._profiles.get(user_id)
+
+    def all(self):
+        self._check_for_changes()
+        return self._profiles
+
+    def stats(self):
+        return {"backend": "json", "profiles": len(self._profiles), "reloads": self.reloads}
+
+
+def _read_json_profiles(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        # Keep serving defaults rather than failing every personalised reply
+        print(f"⚠️ {path} is invalid JSON. Using default profile.")
+        return {}
+
+
+# ------------------------------------------------------
+# Process-wide store
+# ------------------------------------------------------
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    The configured store: SQLite when the database exists (or is forced via
+    CHATBOT_PROFILE_BACKEND=sqlite), else the JSON file.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                use_sqlite = PROFILE_BACKEND == "sqlite" or (
+                    PROFILE_BACKEND == "auto" and os.path.exists(DB_PATH)
+                )
+                _store = SQLiteProfileStore() if use_sqlite else JSONProfileStore()
+    return _store
+
+
+# ------------------------------------------------------
+# Bulk import
+# ------------------------------------------------------
+def _iter_source(path):
+    """
+    (user_id, profile) pairs from a {user_id: profile} JSON file, or a JSONL
+    file with one {"user_id": ..., ...} object per line (streamed).
+    """
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield str(record.pop("user_id")), record
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f).items()
+
+
+def _create_schema(conn):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS profiles ("
+        " user_id TEXT PRIMARY KEY,"
+        " profile TEXT NOT NULL"
+        ") WITHOUT ROWID"
+    )
+
+
+def import_profiles(source=JSON_PATH, db_path=DB_PATH, upsert=False):
+    """
+    Loads profiles into the SQLite store. By default the database is rebuilt
+    next to the live one and swapped in with a rename, so workers never see
+    a half-imported table; --upsert writes into the live database instead.
+    Returns the number of profiles written.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    target = db_path if upsert else f"{db_path}.{os.getpid()}.tmp"
+    if not upsert and os.path.exists(target):
+        os.remove(target)
+
+    conn = sqlite3.connect(target)
+    count = 0
+    try:
+        if upsert:
+            conn.execute("PRAGMA journal_mode=WAL")
+        _create_schema(conn)
+        batch = []
+        for user_id, profile in _iter_source(source):
+            batch.append((user_id, json.dumps(profile, ensure_ascii=False, separators=(",", ":"))))
+            if len(batch) >= IMPORT_BATCH:
+                conn.executemany("INSERT OR REPLACE INTO profiles (user_id, profile) VALUES (?, ?)", batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT OR REPLACE INTO profiles (user_id, profile) VALUES (?, ?)", batch)
+            count += len(batch)
+        conn.commit()
+    finally:
+        conn.close()
+
+    if not upsert:
+        os.replace(target, db_path)
+    print(f"✅ Imported {count} profiles from {source} into {db_path}")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="User profile store")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("import", help="bulk import a JSON / JSONL profile file")
+    load.add_argument("source", nargs="?", default=JSON_PATH)
+    load.add_argument("--db", default=DB_PATH)
+    load.add_argument("--upsert", action="store_true", help="update the live DB instead of rebuilding it")
+
+    get = commands.add_parser("get", help="look up one profile")
+    get.add_argument("user_id")
+
+    args = parser.parse_args()
+    if args.command == "import":
+        import_profiles(args.source, args.db, args.upsert)
+    else:
+        store = get_store()
+        print(store.get(args.user_id))
+        print(store.stats())
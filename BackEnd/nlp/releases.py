@@ -0,0 +1,445 @@
+# backend/nlp/releases.py
+"""
+Versioned, immutable model releases.
+
+Every training / build step publishes a complete new release instead of
+writing over the files the servers are reading:
+
+    models/releases/r0007/
+        intent_model.pkl  vectorizer.pkl  intent_engine/  faq_index/  entity_model/
+        release.json      # sha256 + size of every file, parent, note
+    models/CURRENT        # {"release": "r0007", "previous": "r0006", ...}
+
+A release is staged in models/releases/.staging-<pid>/ (starting as hard
+links to the current release's files), checksummed, renamed into place and
+only then made live by replacing CURRENT with os.replace. Readers therefore
+see either the old or the new release, never a partly written file.
+Publishing, activating and pruning hold an exclusive lock on
+models/releases/.lock, so two publishers never build on the same parent
+and then overwrite each other's CURRENT.
+Loaders resolve their files with artifact_path() and refuse a release whose
+checksums do not match; the model registry's watcher compares each
+artifact's checksums (artifact_fingerprint) and swaps in only the models
+whose files changed.
+
+Without a CURRENT file (a fresh checkout) artifact_path() returns the flat
+models/ layout that ships with the repo.
+
+    cd backend
+    python -m nlp.releases list
+    python -m nlp.releases init                  # first release from the flat models/ files
+    python -m nlp.releases rollback              # back to the previous release
+    python -m nlp.releases activate r0005
+    python -m nlp.releases verify [r0005]
+    python -m nlp.releases prune --keep 5
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+BASE_DIR = os.path.dirname(__file__)
+MODELS_DIR = os.path.abspath(os.path.join(BASE_DIR, "../models"))
+RELEASES_DIR = os.path.join(MODELS_DIR, "releases")
+CURRENT_PATH = os.path.join(MODELS_DIR, "CURRENT")
+LOCK_PATH = os.path.join(RELEASES_DIR, ".lock")
+RELEASE_MANIFEST = "release.json"
+# CHATBOT_VERIFY_RELEASES=0 skips the checksum pass when a release is first loaded
+VERIFY = os.environ.get("CHATBOT_VERIFY_RELEASES", "1") != "0"
+
+# What a release holds (names under models/); missing ones are simply absent
+ARTIFACTS = ("intent_model.pkl", "vectorizer.pkl", "intent_engine", "faq_index", "entity_model")
+KEEP_RELEASES = 5
+
+_verified = set()       # release ids checked in this process
+_manifests = {}         # release id -> files of its manifest (releases never change)
+_verify_lock = threading.Lock()
+
+
+class ReleaseError(RuntimeError):
+    """Raised when a release is missing, incomplete or fails its checksums."""
+
+
+# ===============================
+# 📍 Resolving the live release
+# ===============================
+def current_release():
+    """
+    Contents of CURRENT ({"release", "previous", "activated_at"}), or None
+    when no release has been published yet.
+    """
+    try:
+        with open(CURRENT_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def release_path(release_id):
+    return os.path.join(RELEASES_DIR, release_id)
+
+
+def artifact_path(path):
+    """
+    Where to read the artifact that lives at `path` in the flat models/
+    layout (e.g. intent_model.MODEL_PATH): inside the current release when
+    there is one (checksummed on first use), else `path` itself.
+    """
+    current = current_release()
+    if current is None:
+        return path
+    release_id = current["release"]
+    if VERIFY:
+        with _verify_lock:
+            if release_id not in _verified:
+                verify_release(release_id)
+                _verified.add(release_id)
+    return os.path.join(release_path(release_id), os.path.basename(path))
+
+
+def artifact_fingerprint(path):
+    """
+    What identifies the artifact holding `path` (a flat models/ path, e.g.
+    intent_engine.ENGINE_MANIFEST) for change detection. In a release that
+    is the artifact's name plus a digest of its files' sha256 from
+    release.json, so it only changes when the artifact itself does, not
+    with every release. Files outside models/, or before the first
+    release, are identified by mtime and size.
+    """
+    rel = os.path.relpath(os.path.abspath(path), MODELS_DIR).replace(os.sep, "/")
+    current = current_release()
+    if current is None or rel.startswith("../"):
+        try:
+            stat = os.stat(path)
+            return (path, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return (path, None, None)
+
+    release_id = current["release"]
+    if release_id not in _manifests:
+        try:
+            _manifests[release_id] = read_manifest(release_id)["files"]
+        except ReleaseError:
+            return (path, release_id, None)     # the loader reports it
+    name = rel.split("/")[0]
+    digest = hashlib.sha256()
+    for file, entry in sorted(_manifests[release_id].items()):
+        if file == name or file.startswith(name + "/"):
+            digest.update(f"{file}:{entry['sha256']}\n".encode("utf-8"))
+    return (name, digest.hexdigest())
+
+
+# ===============================
+# 🔒 Checksums
+# ===============================
+def _iter_files(directory):
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            rel = os.path.relpath(full, directory).replace(os.sep, "/")
+            if rel != RELEASE_MANIFEST:
+                yield rel, full
+
+
+def _sha256(path, sync=False):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+        if sync:
+            os.fsync(f.fileno())
+    return digest.hexdigest()
+
+
+def read_manifest(release_id):
+    path = os.path.join(release_path(release_id), RELEASE_MANIFEST)
+    if not os.path.exists(path):
+        raise ReleaseError(f"Release {release_id} not found (no {path})")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_release(release_id):
+    """
+    Checks every file of a release against its manifest. Raises ReleaseError
+    on a missing, extra, truncated or modified file.
+    """
+    manifest = read_manifest(release_id)
+    directory = release_path(release_id)
+    expected = manifest["files"]
+    found = dict(_iter_files(directory))
+
+    missing = sorted(set(expected) - set(found))
+    extra = sorted(set(found) - set(expected))
+    if missing or extra:
+        raise ReleaseError(f"Release {release_id} does not match its manifest "
+                           f"(missing: {missing}, unexpected: {extra})")
+    for rel, entry in expected.items():
+        if os.path.getsize(found[rel]) != entry["size"] or _sha256(found[rel]) != entry["sha256"]:
+            raise ReleaseError(f"Release {release_id}: {rel} fails its checksum")
+    return manifest
+
+
+# ===============================
+# 📦 Publishing
+# ===============================
+@contextmanager
+def _publish_lock():
+    """
+    Exclusive, cross-process lock on LOCK_PATH (released if the holder dies).
+    """
+    os.makedirs(RELEASES_DIR, exist_ok=True)
+    with open(LOCK_PATH, "a+b") as f:
+        if fcntl is not None:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                print("⏳ Waiting for another release to finish publishing...")
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue    # LK_LOCK gives up after 10 s
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class StagedRelease:
+    """
+    A release being built. Starts with the current release's files (hard
+    links); path() hands out a location to (re)write one artifact.
+    """
+
+    def __init__(self, directory, parent):
+        self.directory = directory
+        self.parent = parent
+
+    def path(self, path):
+        """
+        Where to write the artifact that lives at `path` in the flat models/
+        layout. The copy inherited from the parent release is removed first,
+        so writing never touches the parent's (hard-linked) files.
+        """
+        target = os.path.join(self.directory, os.path.basename(path))
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        elif os.path.exists(target):
+            os.remove(target)
+        return target
+
+
+def _link_or_copy(source, target):
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def _next_release_id():
+    existing = [int(d[1:]) for d in os.listdir(RELEASES_DIR) if d.startswith("r") and d[1:].isdigit()]
+    return f"r{max(existing, default=0) + 1:04d}"
+
+
+@contextmanager
+def new_release(note="", activate=True):
+    """
+    Stages a release from the current one (or the flat models/ files), lets
+    the caller replace artifacts via StagedRelease.path(), then checksums it,
+    moves it to models/releases/rNNNN and, by default, makes it CURRENT.
+    Nothing is published if the block raises. Other publishers wait until
+    this release is activated, so the parent is still current when it is.
+
+        with new_release("retrained intents") as release:
+            joblib.dump(model, release.path(MODEL_PATH))
+    """
+    with _publish_lock():
+        release_id = yield from _stage(note)
+        if activate:
+            _activate(release_id)
+
+
+def _stage(note):
+    current = current_release()
+    parent = current["release"] if current else None
+    source = release_path(parent) if parent else MODELS_DIR
+
+    # Published releases never change, so their files can be shared by hard
+    # links; the flat models/ files may still be rewritten, so those are copied
+    copy = _link_or_copy if parent else shutil.copy2
+
+    staging = os.path.join(RELEASES_DIR, f".staging-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        for name in ARTIFACTS:
+            src = os.path.join(source, name)
+            if os.path.isdir(src):
+                shutil.copytree(src, os.path.join(staging, name), copy_function=copy)
+            elif os.path.exists(src):
+                copy(src, os.path.join(staging, name))
+
+        yield StagedRelease(staging, parent)
+
+        files = {
+            rel: {"sha256": _sha256(full, sync=True), "size": os.path.getsize(full)}
+            for rel, full in _iter_files(staging)
+        }
+        release_id = _next_release_id()
+        manifest = {
+            "release": release_id,
+            "parent": parent,
+            "note": note,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "files": files,
+        }
+        with open(os.path.join(staging, RELEASE_MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(staging, release_path(release_id))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    print(f"📦 Built release {release_id} ({len(files)} files){f': {note}' if note else ''}")
+    return release_id
+
+
+def activate_release(release_id):
+    """
+    Points CURRENT at a release (after verifying it). Running servers swap
+    to it on their next model check.
+    """
+    with _publish_lock():
+        _activate(release_id)
+
+
+def _activate(release_id):
+    # Caller holds _publish_lock
+    verify_release(release_id)
+    current = current_release()
+    previous = current["release"] if current else None
+    if previous == release_id:
+        print(f"ℹ️ {release_id} is already current")
+        return
+
+    tmp_path = f"{CURRENT_PATH}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "release": release_id,
+            "previous": previous,
+            "activated_at": datetime.now().isoformat(timespec="seconds"),
+        }, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, CURRENT_PATH)
+    print(f"🚀 {release_id} is now current (previous: {previous})")
+
+
+def rollback():
+    """
+    Re-activates the release that was current before this one. Running it
+    twice rolls forward again.
+    """
+    with _publish_lock():
+        current = current_release()
+        if current is None or not current.get("previous"):
+            raise ReleaseError("No previous release to roll back to")
+        _activate(current["previous"])
+    return current["previous"]
+
+
+# ===============================
+# 🧹 Listing / pruning
+# ===============================
+def list_releases():
+    """
+    Manifests of all published releases, oldest first (without the file lists).
+    """
+    if not os.path.isdir(RELEASES_DIR):
+        return []
+    releases = []
+    for name in sorted(os.listdir(RELEASES_DIR)):
+        if name.startswith("r") and name[1:].isdigit():
+            try:
+                manifest = read_manifest(name)
+            except ReleaseError:
+                continue
+            manifest["size"] = sum(entry["size"] for entry in manifest.pop("files").values())
+            releases.append(manifest)
+    return releases
+
+
+def prune_releases(keep=KEEP_RELEASES):
+    """
+    Deletes all but the newest `keep` releases; the current and previous
+    releases are always kept. Returns the deleted ids.
+    """
+    with _publish_lock():
+        current = current_release() or {}
+        protected = {current.get("release"), current.get("previous")}
+        ids = [release["release"] for release in list_releases()]
+        doomed = [release_id for release_id in ids[:max(0, len(ids) - keep)] if release_id not in protected]
+        for release_id in doomed:
+            shutil.rmtree(release_path(release_id))
+    return doomed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Model releases")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="show published releases")
+    init = commands.add_parser("init", help="publish the flat models/ files as a release")
+    init.add_argument("--note", default="initial release from models/")
+    activate = commands.add_parser("activate", help="make a release current")
+    activate.add_argument("release")
+    commands.add_parser("rollback", help="re-activate the previous release")
+    verify = commands.add_parser("verify", help="check a release's checksums")
+    verify.add_argument("release", nargs="?")
+    prune = commands.add_parser("prune", help="delete old releases")
+    prune.add_argument("--keep", type=int, default=KEEP_RELEASES)
+
+    args = parser.parse_args()
+    if args.command == "list":
+        current = (current_release() or {}).get("release")
+        for release in list_releases():
+            marker = "*" if release["release"] == current else " "
+            print(f"{marker} {release['release']}  {release['created_at']}  "
+                  f"{release['size'] / 1024:>8.0f} KB  parent={release['parent']}  {release['note']}")
+    elif args.command == "init":
+        if current_release() is not None:
+            raise SystemExit("⚠️ Releases are already in use; retrain or build to publish a new one")
+        with new_release(args.note):
+            pass
+    elif args.command == "activate":
+        activate_release(args.release)
+    elif args.command == "rollback":
+        rollback()
+    elif args.command == "verify":
+        release_id = args.release or (current_release() or {}).get("release")
+        if release_id is None:
+            raise SystemExit("⚠️ No release published yet")
+        manifest = verify_release(release_id)
+        print(f"✅ {release_id}: {len(manifest['files'])} files match their checksums")
+    elif args.command == "prune":
+        print(f"🧹 Deleted: {prune_releases(args.keep) or 'nothing'}")
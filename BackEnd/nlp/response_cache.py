@@ -0,0 +1,84 @@
+# backend/nlp/response_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ------------------------------------------------------
+# Configuration (environment overrides)
+# ------------------------------------------------------
+CACHE_SIZE = int(os.environ.get("CHATBOT_CACHE_SIZE", "10000"))     # entries, 0 disables
+CACHE_TTL = float(os.environ.get("CHATBOT_CACHE_TTL", "600"))       # seconds
+
+
+class ResponseCache:
+    """
+    Bounded LRU + TTL cache for the entity-independent pipeline results
+    (FAQ answer, or intent + confidence), keyed on the normalised message.
+
+    Every entry is tagged with the model registry generation it was computed
+    under. When the models change, the whole cache is dropped on the next
+    lookup.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()      # key -> (expires_at, value)
+        self._generation = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, generation):
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            self._check_generation(generation)
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, generation):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._check_generation(generation)
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _check_generation(self, generation):
+        if generation != self._generation:
+            if self._data:
+                self.invalidations += 1
+            self._data.clear()
+            self._generation = generation
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
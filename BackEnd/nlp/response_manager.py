@@ -1,93 +1,305 @@
 # backend/nlp/response_manager.py
+import time
 
-from nlp.intent_model import predict_intent
-from nlp.entity_model import extract_entities
+from nlp import metrics
+from nlp.intent_model import predict_intent_batch
+from nlp.entity_model import extract_entities_batch
 from nlp.context_manager import ContextManager
 from nlp.personalization import personalize_response
-from nlp.knowledge_base import query_knowledge_base
-from nlp.logger import log_interaction
+from nlp.knowledge_base import query_knowledge_base_batch
+from nlp.logger import log_interactions
 from nlp.error_handler import log_error
+from nlp.preprocess import clean_text
+from nlp.response_cache import ResponseCache
+from nlp.model_registry import reload_changed, generation as model_generation
 
 context = ContextManager()
+response_cache = ResponseCache()
+
+ERROR_REPLY = "⚠️ Sorry, something went wrong on my end."
+LOW_CONFIDENCE = 0.40
+LOW_CONFIDENCE_REPLY = "I'm not completely sure what you mean. Could you rephrase it?"
+
+SMALL_TALK_REPLIES = {
+    "greeting": "Hi there! 😊 How can I help you today?",
+    "goodbye": "Goodbye! 👋 Have a great day ahead.",
+}
+
+BASE_RESPONSES = {
+    "track_order": "Let me check your order status.",
+    "return_item": "I can help you return your item.",
+    "payment_info": "Sure! Here are the available payment methods.",
+    "refund_request": "I can help you with your refund request.",
+    "cancel_order": "I can help you cancel your order."
+}
+
+SPECIAL_INTENTS = {"track_order", "payment_info", "refund_request", "return_item", "cancel_order"}
+
+# ------------------------------------------------------
+# Metrics (see nlp/metrics.py, exposed on /metrics)
+# ------------------------------------------------------
+# Stages are timed once per call, so one observation can cover a batch
+STAGES = ("cache", "faq", "intent", "entity", "context", "personalize", "log")
+STAGE_SECONDS = metrics.histogram(
+    "chatbot_stage_seconds", "Time spent in each pipeline stage per generate_responses call", ["stage"]
+)
+_stage_timers = {stage: STAGE_SECONDS.labels(stage) for stage in STAGES}
+PIPELINE_SECONDS = metrics.histogram(
+    "chatbot_pipeline_seconds", "Total generate_responses time per call"
+)
+BATCH_MESSAGES = metrics.histogram(
+    "chatbot_batch_messages", "Messages per generate_responses call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+RESPONSES = metrics.counter("chatbot_responses_total", "Replies by returned intent", ["intent"])
+CACHE_LOOKUPS = metrics.counter("chatbot_cache_lookups_total", "Response cache lookups", ["result"])
 
 def generate_response(user_id: str, text: str):
+    return generate_responses([(user_id, text)])[0]
+
+
+def generate_responses(batch):
+    """
+    Answers a list of (user_id, text) pairs, in order.
+    Repeated questions get their FAQ answer and intent from the response
+    cache; the rest go through the model stages once for the whole batch
+    (see _analyse). Entities are always read from the message itself.
+    Context, personalisation and logging then run per message, so a
+    failure there only turns that message's reply into ERROR_REPLY.
+    """
+    if not batch:
+        return []
+
+    started = time.perf_counter()
+    try:
+        replies = _finalize(batch, _classify(batch))
+        PIPELINE_SECONDS.observe(time.perf_counter() - started)
+        return replies
+
+    except Exception as e:
+        log_error(e)
+        RESPONSES.labels("error").inc(len(batch))
+        return [ERROR_REPLY] * len(batch)
+
+
+# ------------------------------------------------------
+# Staged pipeline (streaming chat over /ws/chat)
+# ------------------------------------------------------
+def classify_messages(batch):
+    """
+    First half of generate_responses: the (cached) model analysis of each
+    (user_id, text) pair, or None for a message that failed. The caller
+    can answer early from preview_reply, then pass the analyses to
+    finalize_responses.
+    """
+    if not batch:
+        return []
     try:
-        # ---------------------------------------
-        # 1️⃣ FAQ CHECK (Highest Priority)
-        # ---------------------------------------
-        faq_answer = query_knowledge_base(text)
-        if faq_answer:
-            log_interaction(user_id, text, faq_answer, intent="faq")
-            return faq_answer
-
-        # ---------------------------------------
-        # 2️⃣ INTENT DETECTION
-        # ---------------------------------------
-        intent_result = predict_intent(text)
-        intent = intent_result["intent"]
-        confidence = intent_result["confidence"]
-
-        # ---------------------------------------
-        # 3️⃣ LOW-CONFIDENCE HANDLING
-        # ---------------------------------------
-        if confidence < 0.40:
-            fallback = "I'm not completely sure what you mean. Could you rephrase it?"
-            log_interaction(user_id, text, fallback, intent="low_confidence")
-            return fallback
-
-        # ---------------------------------------
-        # 4️⃣ SPECIAL CASES (Greeting / Goodbye)
-        # ---------------------------------------
-        if intent == "greeting":
-            reply = "Hi there! 😊 How can I help you today?"
-            log_interaction(user_id, text, reply, intent="greeting")
-            return reply
-
-        if intent == "goodbye":
-            reply = "Goodbye! 👋 Have a great day ahead."
-            log_interaction(user_id, text, reply, intent="goodbye")
-            return reply
-
-        # ---------------------------------------
-        # 5️⃣ ENTITY EXTRACTION (with backup)
-        # ---------------------------------------
+        return _classify(batch)
+    except Exception as e:
+        log_error(e)
+        return [None] * len(batch)
+
+
+def finalize_responses(batch, analyses):
+    """
+    Second half of generate_responses: context, personalisation and
+    logging for analyses returned by classify_messages. Messages whose
+    analysis is None get ERROR_REPLY; the others are answered normally.
+    """
+    if not batch:
+        return []
+    try:
+        return _finalize(batch, analyses)
+    except Exception as e:
+        log_error(e)
+        RESPONSES.labels("error").inc(len(batch))
+        return [ERROR_REPLY] * len(batch)
+
+
+def session_context(user_id):
+    """
+    Saved context for a user, read from the store of the process that
+    answers their messages (run it on the pipeline pool).
+    """
+    return context.get_context(user_id)
+
+
+def preview_reply(analysis):
+    """
+    What can be said before finalize_responses runs: (text, intent, is_final).
+    Only personalised intents change after this point; for those the text
+    is the generic template ("Let me check your order status.").
+    """
+    if analysis is None:
+        return ERROR_REPLY, "error", True
+    reply, intent = _base_reply(analysis)
+    return reply, intent, intent not in SPECIAL_INTENTS
+
+
+def _base_reply(analysis):
+    """
+    (reply before personalisation, intent label) for one analysis.
+    """
+    if analysis["faq_answer"]:
+        return analysis["faq_answer"], "faq"
+
+    intent_result = analysis["intent_result"]
+    intent = intent_result["intent"]
+
+    # ---------------------------------------
+    # 3️⃣ LOW-CONFIDENCE HANDLING
+    # ---------------------------------------
+    if intent_result["confidence"] < LOW_CONFIDENCE:
+        return LOW_CONFIDENCE_REPLY, "low_confidence"
+
+    # ---------------------------------------
+    # 4️⃣ SPECIAL CASES (Greeting / Goodbye)
+    # ---------------------------------------
+    if intent in SMALL_TALK_REPLIES:
+        return SMALL_TALK_REPLIES[intent], intent
+
+    # ---------------------------------------
+    # 6️⃣ BASE RESPONSE TEMPLATES
+    # ---------------------------------------
+    return BASE_RESPONSES.get(intent, "I'm not fully sure, but I'll try to help."), intent
+
+
+def _classify(batch):
+    texts = [text for _, text in batch]
+
+    # Pick up retrained models (and drop stale cache entries); a reload is
+    # not part of the cache stage
+    reload_changed()
+    started = time.perf_counter()
+    generation = model_generation()
+
+    keys = [clean_text(text) for text in texts]
+    analyses = [response_cache.get(key, generation) for key in keys]
+    hits = sum(analysis is not None for analysis in analyses)
+    CACHE_LOOKUPS.labels("hit").inc(hits)
+    CACHE_LOOKUPS.labels("miss").inc(len(analyses) - hits)
+    _stage_timers["cache"].observe(time.perf_counter() - started)
+
+    # Messages that normalise to the same key are analysed once
+    missing = {}
+    for key, text, analysis in zip(keys, texts, analyses):
+        if analysis is None:
+            missing.setdefault(key, text)
+
+    if missing:
+        fresh = dict(zip(missing, _analyse(list(missing.values()))))
+        for key, analysis in fresh.items():
+            response_cache.put(key, analysis, generation)
+        analyses = [analysis or fresh[key] for key, analysis in zip(keys, analyses)]
+
+    # clean_text drops the digits and punctuation entities are made of, so
+    # entities come from each raw message, never from the cache
+    return _add_entities(texts, analyses)
+
+
+def _finalize(batch, analyses):
+    replies = [None] * len(batch)
+    intents = [None] * len(batch)
+    context_seconds = personalize_seconds = 0.0
+
+    for i, ((user_id, text), analysis) in enumerate(zip(batch, analyses)):
+        # Per message: one failing analysis / context / profile call only
+        # costs that message its reply, not the whole batch
         try:
-            entities = extract_entities(text)
-        except:
-            entities = []
-
-        context.update_context(user_id, intent, entities)
-
-        # ---------------------------------------
-        # 6️⃣ BASE RESPONSE TEMPLATES
-        # ---------------------------------------
-        base_responses = {
-            "track_order": "Let me check your order status.",
-            "return_item": "I can help you return your item.",
-            "payment_info": "Sure! Here are the available payment methods.",
-            "refund_request": "I can help you with your refund request.",
-            "cancel_order": "I can help you cancel your order."
-        }
-
-        base_response = base_responses.get(intent, "I'm not fully sure, but I'll try to help.")
-
-        # ---------------------------------------
-        # 7️⃣ PERSONALIZE ONLY FOR MEANINGFUL INTENTS
-        # ---------------------------------------
-        SPECIAL_INTENTS = {"track_order", "payment_info", "refund_request", "return_item", "cancel_order"}
-
-        if intent in SPECIAL_INTENTS:
-            final = personalize_response(user_id, intent, base_response)
-        else:
-            final = base_response  # No personalization for general queries
-
-        # ---------------------------------------
-        # 8️⃣ LOGGING
-        # ---------------------------------------
-        log_interaction(user_id, text, final, intent=intent)
-
-        return final
+            if analysis is None:
+                raise RuntimeError("Message analysis failed")
+            replies[i], intents[i] = _base_reply(analysis)
+            if intents[i] in ("faq", "low_confidence") or intents[i] in SMALL_TALK_REPLIES:
+                continue
+
+            intent = intents[i]
+            stage_start = time.perf_counter()
+            context.update_context(user_id, intent, analysis["entities"])
+            context_seconds += time.perf_counter() - stage_start
 
+            # ---------------------------------------
+            # 7️⃣ PERSONALIZE ONLY FOR MEANINGFUL INTENTS
+            # ---------------------------------------
+            if intent in SPECIAL_INTENTS:
+                stage_start = time.perf_counter()
+                replies[i] = personalize_response(user_id, intent, replies[i])
+                personalize_seconds += time.perf_counter() - stage_start
+        except Exception as e:
+            log_error(e)
+            replies[i], intents[i] = ERROR_REPLY, "error"
+
+    _stage_timers["context"].observe(context_seconds)
+    _stage_timers["personalize"].observe(personalize_seconds)
+
+    # ---------------------------------------
+    # 8️⃣ LOGGING
+    # ---------------------------------------
+    try:
+        with _stage_timers["log"].time():
+            log_interactions([
+                (user_id, text, reply, intent)
+                for (user_id, text), reply, intent in zip(batch, replies, intents)
+            ])
     except Exception as e:
+        # The replies are ready; a logging failure must not replace them
         log_error(e)
-        return "⚠️ Sorry, something went wrong on my end."
+
+    for intent in intents:
+        RESPONSES.labels(intent).inc()
+    BATCH_MESSAGES.observe(len(batch))
+    return replies
+
+
+def _analyse(texts):
+    """
+    Runs the FAQ and intent stages once over the whole batch: one BM25
+    pass and one intent predict_proba. Returns the entity-independent
+    result for each text (what the response cache stores).
+    """
+    # ---------------------------------------
+    # 1️⃣ FAQ CHECK (Highest Priority)
+    # ---------------------------------------
+    with _stage_timers["faq"].time():
+        faq_answers = query_knowledge_base_batch(texts)
+    analyses = [{"faq_answer": answer, "intent_result": None} for answer in faq_answers]
+
+    # ---------------------------------------
+    # 2️⃣ INTENT DETECTION (only for non-FAQ messages)
+    # ---------------------------------------
+    pending = [i for i, answer in enumerate(faq_answers) if not answer]
+    with _stage_timers["intent"].time():
+        intent_results = predict_intent_batch([texts[i] for i in pending])
+    for i, result in zip(pending, intent_results):
+        analyses[i]["intent_result"] = result
+
+    return analyses
+
+
+def _add_entities(texts, analyses):
+    """
+    Copies of `analyses` with the entities of each raw text: one spaCy
+    nlp.pipe for the batch, each distinct text extracted once.
+    """
+    analyses = [dict(analysis, entities=None) for analysis in analyses]
+
+    # ---------------------------------------
+    # 5️⃣ ENTITY EXTRACTION (with backup)
+    # ---------------------------------------
+    needs_entities = [
+        i for i, analysis in enumerate(analyses)
+        if analysis["intent_result"] is not None
+        and analysis["intent_result"]["confidence"] >= LOW_CONFIDENCE
+        and analysis["intent_result"]["intent"] not in SMALL_TALK_REPLIES
+    ]
+    unique = list(dict.fromkeys(texts[i] for i in needs_entities))
+    try:
+        with _stage_timers["entity"].time():
+            entities = dict(zip(unique, extract_entities_batch(unique)))
+    except:
+        entities = {text: [] for text in unique}
+
+    for i in needs_entities:
+        analyses[i]["entities"] = entities[texts[i]]
+
+    return analyses
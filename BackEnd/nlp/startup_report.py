@@ -0,0 +1,101 @@
+# backend/nlp/startup_report.py
+"""
+Startup cost report for a serving worker.
+
+    cd backend
+    python -m nlp.startup_report                 # import cost of the serving path
+    python -m nlp.startup_report --module app --load-models
+
+Runs the import in a fresh interpreter with `-X importtime`, so numbers are
+not skewed by modules this script has already imported.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Packages that should only be imported by training / analytics code
+TRAINING_ONLY = ["pandas", "spacy", "spacy.training", "sklearn.metrics", "sklearn.model_selection"]
+
+
+def measure_imports(module):
+    """
+    Returns [(name, self_ms, cumulative_ms, depth)] for every module imported
+    by `import module`, in import order.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+    return rows
+
+
+def print_report(module, top=15):
+    rows = measure_imports(module)
+    by_name = {name: (self_ms, cumulative_ms) for name, self_ms, cumulative_ms, _ in rows}
+    root_depth = min(depth for *_, depth in rows)
+    total = sum(cumulative_ms for _, _, cumulative_ms, depth in rows if depth == root_depth)
+
+    print(f"===== Import cost: {module} =====")
+    print(f"Total: {total:.1f} ms across {len(rows)} modules\n")
+
+    print("Project modules (cumulative ms, self ms):")
+    for name, self_ms, cumulative_ms, _ in rows:
+        if name == module or name.startswith("nlp") or name == "app":
+            print(f"  {name:<32} {cumulative_ms:>9.1f} {self_ms:>9.1f}")
+
+    print(f"\nHeaviest third-party packages (top {top}, cumulative ms):")
+    packages = {}
+    for name, _, cumulative_ms, _ in rows:
+        top_level = name.split(".")[0]
+        if top_level in ("nlp", "app"):
+            continue
+        # The first (outermost) import of a package carries its full cost
+        packages.setdefault(top_level, by_name.get(top_level, (0, cumulative_ms))[1])
+    for name, cumulative_ms in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:<32} {cumulative_ms:>9.1f}")
+
+    leaked = [name for name in TRAINING_ONLY if name in by_name]
+    if leaked:
+        print(f"\n⚠️ Training-only packages on the serving path: {', '.join(leaked)}")
+    else:
+        print("\n✅ No training-only packages on the serving path")
+
+
+def print_model_load_report():
+    sys.path.insert(0, BACKEND_DIR)
+    import nlp.response_manager  # noqa: F401  (registers every serving loader)
+    from nlp.model_registry import load_models, load_timings
+
+    start = time.perf_counter()
+    load_models()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"\n===== Model load: {elapsed:.1f} ms =====")
+    for name, seconds in sorted(load_timings().items(), key=lambda item: -item[1]):
+        print(f"  {name:<32} {seconds * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker startup cost report")
+    parser.add_argument("--module", default="nlp.response_manager", help="module to import")
+    parser.add_argument("--top", type=int, default=15, help="third-party packages to list")
+    parser.add_argument("--load-models", action="store_true", help="also time model loading")
+    args = parser.parse_args()
+
+    print_report(args.module, args.top)
+    if args.load_models:
+        print_model_load_report()
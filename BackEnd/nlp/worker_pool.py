@@ -0,0 +1,158 @@
+# backend/nlp/worker_pool.py
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from nlp import metrics
+from nlp.model_registry import load_models, start_watcher
+
+# ------------------------------------------------------
+# Configuration (environment overrides)
+# ------------------------------------------------------
+DEFAULT_KIND = os.environ.get("CHATBOT_EXECUTOR", "thread")        # "thread" | "process"
+DEFAULT_WORKERS = int(os.environ.get("CHATBOT_WORKERS", "4"))
+DEFAULT_QUEUE_SIZE = int(os.environ.get("CHATBOT_QUEUE_SIZE", "64"))
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+def _init_process_worker():
+    # Each process keeps its own resident copy of the models
+    load_models()
+    start_watcher()
+
+
+POOL_WAIT_SECONDS = metrics.histogram(
+    "chatbot_pool_wait_seconds", "Time a pipeline call waited for a free worker"
+)
+
+
+def _timed_call(func, submitted_at, *args):
+    # Runs inside the worker; wall clock so it is comparable across processes
+    started_at = time.time()
+    return started_at - submitted_at, func(*args), None
+
+
+def _timed_process_call(func, submitted_at, *args):
+    # Same, plus the metrics recorded in this worker process since its last call
+    started_at = time.time()
+    result = func(*args)
+    return started_at - submitted_at, result, metrics.drain()
+
+
+class PipelinePool:
+    """
+    Runs the synchronous NLP pipeline off the event loop.
+    At most `workers` calls run at once and at most `queue_size` more wait;
+    anything beyond that is rejected immediately with PoolSaturatedError.
+    """
+
+    def __init__(self, kind=DEFAULT_KIND, workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind '{kind}' (use 'thread' or 'process')")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self._executor = None
+
+        # Only touched from the event loop thread, so no locking needed
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._waits = deque(maxlen=1000)  # recent queue wait times (seconds)
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_process_worker,
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="nlp-worker",
+            )
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def saturated(self):
+        return self._in_flight >= self.workers + self.queue_size
+
+    async def run(self, func, *args):
+        """
+        Execute func(*args) on the pool and return its result.
+        """
+        self._admit(1)
+        return await self._execute(func, *args)
+
+    async def run_all(self, func, args_list):
+        """
+        Execute func(*args) for every args tuple and return the results in
+        order. Capacity for all calls is reserved up front: either every
+        call is admitted or PoolSaturatedError is raised before any starts.
+        """
+        self._admit(len(args_list))
+        return await asyncio.gather(*[self._execute(func, *args) for args in args_list])
+
+    def _admit(self, calls):
+        # No await between the check and the increment, so this is atomic on the event loop
+        if self._executor is None:
+            self.start()
+        if self._in_flight + calls > self.workers + self.queue_size:
+            self._rejected += 1
+            raise PoolSaturatedError(
+                f"NLP pool saturated ({self._in_flight} in flight, {calls} requested, "
+                f"{self.workers} workers, queue {self.queue_size})"
+            )
+        self._in_flight += calls
+
+    async def _execute(self, func, *args):
+        # The call was counted in _in_flight by _admit
+        loop = asyncio.get_running_loop()
+        call = _timed_process_call if self.kind == "process" else _timed_call
+        try:
+            wait, result, worker_metrics = await loop.run_in_executor(
+                self._executor, call, func, time.time(), *args
+            )
+        finally:
+            self._in_flight -= 1
+        if worker_metrics:
+            metrics.merge(worker_metrics)
+        self._completed += 1
+        self._waits.append(max(wait, 0.0))
+        POOL_WAIT_SECONDS.observe(max(wait, 0.0))
+        return result
+
+    def stats(self):
+        """
+        Snapshot of pool load, used to size workers and queue.
+        """
+        waits = sorted(self._waits)
+
+        def pct(p):
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(p * len(waits)))] * 1000
+
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "in_flight": self._in_flight,
+            "queue_depth": max(0, self._in_flight - self.workers),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "wait_ms_p50": round(pct(0.50), 3),
+            "wait_ms_p95": round(pct(0.95), 3),
+            "wait_ms_max": round(waits[-1] * 1000, 3) if waits else 0.0,
+        }
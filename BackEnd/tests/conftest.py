@@ -0,0 +1,10 @@
+# backend/tests/conftest.py
+import os
+import sys
+import tempfile
+
+# Tests import the nlp package the same way the scripts do (cd backend)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Keep interaction / error logs written by the app out of backend/logs
+os.environ.setdefault("CHATBOT_LOG_DIR", tempfile.mkdtemp(prefix="chatbot-test-logs-"))
@@ -0,0 +1,62 @@
+# backend/tests/test_app.py
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app_module.app) as client:
+        yield client
+
+
+@pytest.fixture
+def full_pool(monkeypatch):
+    # Every worker busy and the wait queue full
+    pool = app_module.pool
+    monkeypatch.setattr(pool, "_in_flight", pool.workers + pool.queue_size)
+
+
+def test_chat_replies(client):
+    response = client.post("/chat", json={"user_id": "u1", "message": "How do I track my order?"})
+    assert response.status_code == 200
+    assert response.json()["response"]
+
+
+def test_chat_sheds_load_with_503(client, full_pool):
+    rejected = app_module.pool.stats()["rejected"]
+    response = client.post("/chat", json={"user_id": "u1", "message": "hello"})
+
+    assert response.status_code == 503
+    assert response.json()["response"] == app_module.BUSY_REPLY
+    assert app_module.pool.stats()["rejected"] == rejected + 1
+
+
+def test_chat_batch_keeps_order_across_chunks(client, monkeypatch):
+    monkeypatch.setattr(app_module, "BATCH_CHUNK_SIZE", 2)
+    messages = ["How do I track my order?", "hello", "", "What payment methods do you accept?", "bye"]
+    response = client.post("/chat/batch", json=[{"user_id": f"b{i}", "message": m} for i, m in enumerate(messages)])
+
+    assert response.status_code == 200
+    # Fresh users, so no session context carries over from the batch
+    singles = [client.post("/chat", json={"user_id": f"s{i}", "message": m}).json()["response"]
+               for i, m in enumerate(messages)]
+    assert response.json()["responses"] == singles
+
+
+def test_chat_batch_too_large(client, monkeypatch):
+    monkeypatch.setattr(app_module, "BATCH_MAX_MESSAGES", 3)
+    response = client.post("/chat/batch", json=[{"user_id": "u1", "message": "hi"}] * 4)
+    assert response.status_code == 413
+
+
+def test_chat_batch_is_rejected_whole(client, monkeypatch):
+    # Room for one more call, but the batch needs three chunks
+    pool = app_module.pool
+    monkeypatch.setattr(app_module, "BATCH_CHUNK_SIZE", 1)
+    monkeypatch.setattr(pool, "_in_flight", pool.workers + pool.queue_size - 1)
+    response = client.post("/chat/batch", json=[{"user_id": "u1", "message": "hi"}] * 3)
+
+    assert response.status_code == 503
+    assert pool.stats()["in_flight"] == pool.workers + pool.queue_size - 1
@@ -0,0 +1,90 @@
+# backend/tests/test_batcher.py
+import asyncio
+import threading
+
+import pytest
+
+from nlp.batcher import MicroBatcher
+from nlp.worker_pool import PipelinePool, PoolSaturatedError
+
+
+def run(scenario, **pool_options):
+    async def main():
+        pool = PipelinePool("thread", **pool_options)
+        try:
+            return await scenario(pool)
+        finally:
+            pool.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_items_share_one_call():
+    calls = []
+
+    def process_batch(items):
+        calls.append(list(items))
+        return [item * 10 for item in items]
+
+    async def scenario(pool):
+        batcher = MicroBatcher(pool, process_batch, max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(6)])
+        return results, batcher.stats()
+
+    results, stats = run(scenario, workers=2, queue_size=4)
+    assert results == [0, 10, 20, 30, 40, 50]
+    # A full batch goes at once, the rest when the wait runs out
+    assert calls == [[0, 1, 2, 3], [4, 5]]
+    assert (stats["batches"], stats["items"], stats["pending"]) == (2, 6, 0)
+
+
+def test_batch_size_one_submits_each_item():
+    calls = []
+
+    def process_batch(items):
+        calls.append(list(items))
+        return items
+
+    async def scenario(pool):
+        batcher = MicroBatcher(pool, process_batch, max_batch_size=1)
+        return await asyncio.gather(*[batcher.submit(i) for i in range(3)])
+
+    assert run(scenario, workers=1, queue_size=4) == [0, 1, 2]
+    assert sorted(calls) == [[0], [1], [2]]
+
+
+def test_saturated_pool_fails_every_item_of_the_batch():
+    release = threading.Event()
+
+    def blocking(items):
+        release.wait(timeout=10)
+        return items
+
+    async def scenario(pool):
+        busy = asyncio.ensure_future(pool.run(blocking, ["busy"]))
+        while pool.stats()["in_flight"] < 1:
+            await asyncio.sleep(0.001)
+
+        batcher = MicroBatcher(pool, blocking, max_batch_size=2, max_wait_ms=1)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(2)], return_exceptions=True)
+        release.set()
+        await busy
+        return results
+
+    try:
+        results = run(scenario, workers=1, queue_size=0)
+    finally:
+        release.set()
+    assert [type(result) for result in results] == [PoolSaturatedError, PoolSaturatedError]
+
+
+def test_failing_batch_raises_for_its_callers():
+    def process_batch(items):
+        raise RuntimeError("model crashed")
+
+    async def scenario(pool):
+        batcher = MicroBatcher(pool, process_batch, max_batch_size=8, max_wait_ms=1)
+        with pytest.raises(RuntimeError):
+            await batcher.submit("hello")
+
+    run(scenario, workers=1, queue_size=1)
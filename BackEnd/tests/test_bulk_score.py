@@ -0,0 +1,91 @@
+# backend/tests/test_bulk_score.py
+import csv
+import json
+
+import pytest
+
+from nlp import bulk_score
+
+QUERIES = [
+    "How do I track my order?",
+    "I want a refund for order #12345",
+    "hello",
+    "What payment methods do you accept?",
+    "my parcel is late,\nwhere is it?",       # quoted newline in CSV
+    "cancel my order",
+    "bye",
+]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "tickets.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "query"])
+        for i, query in enumerate(QUERIES, 1):
+            writer.writerow([f"t{i}", query])
+    return str(path)
+
+
+def run(source, out, **options):
+    return bulk_score.bulk_score(source, out, workers=0, chunk_size=2, progress_seconds=1e9, **options)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl"])
+def test_resume_after_a_crash_matches_a_full_run(source, tmp_path, suffix):
+    full = str(tmp_path / f"full{suffix}")
+    summary = run(source, full)
+    assert summary["rows"] == len(QUERIES)
+    with open(full, "rb") as f:
+        expected = f.read()
+
+    # Cut the output inside the 5th row, as a killed run would leave it
+    partial = str(tmp_path / f"partial{suffix}")
+    cut = expected.index(b"where is it")
+    with open(partial, "wb") as f:
+        f.write(expected[:cut])
+    assert bulk_score.count_written(partial) == 4
+
+    summary = run(source, partial, resume=True)
+    assert (summary["skipped"], summary["rows"]) == (4, len(QUERIES) - 4)
+    with open(partial, "rb") as f:
+        assert f.read() == expected
+
+
+def test_output_rows(source, tmp_path):
+    out = str(tmp_path / "scored.jsonl")
+    run(source, out)
+    with open(out, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+
+    assert [row["id"] for row in rows] == [f"t{i}" for i in range(1, len(QUERIES) + 1)]
+    assert [row["query"] for row in rows] == QUERIES
+    assert rows[0]["faq_answer"]
+
+
+def test_count_written_of_missing_or_header_only_file(tmp_path):
+    assert bulk_score.count_written(str(tmp_path / "none.csv")) == 0
+    header = tmp_path / "header.csv"
+    header.write_bytes(b"id,query,faq_answer,intent,confidence,entities\r\n")
+    assert bulk_score.count_written(str(header)) == 0
+
+
+def test_failing_row_does_not_lose_its_chunk(source, tmp_path, monkeypatch):
+    score_chunk = bulk_score.score_chunk
+
+    def flaky(texts, *args):
+        if "hello" in texts:
+            raise RuntimeError("bad row")
+        return score_chunk(texts, *args)
+
+    monkeypatch.setattr(bulk_score, "score_chunk", flaky)
+    out = str(tmp_path / "scored.jsonl")
+    summary = run(source, out)
+
+    assert (summary["rows"], summary["failed"]) == (len(QUERIES), 1)
+    assert summary["first_error"] == "RuntimeError: bad row"
+    with open(out, "r", encoding="utf-8") as f:
+        intents = [json.loads(line)["intent"] for line in f]
+    assert intents[2] == "error"
+    assert intents.count("error") == 1
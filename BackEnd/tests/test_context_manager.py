@@ -0,0 +1,78 @@
+# backend/tests/test_context_manager.py
+import pytest
+
+from nlp import context_manager
+from nlp.context_manager import ContextManager, MemoryContextStore, SQLiteContextStore
+
+ORDER = [("order #12345", "ORDER_ID")]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(context_manager, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(**options):
+        if request.param == "sqlite":
+            # Purge on every write so the size bound applies at once
+            return SQLiteContextStore(str(tmp_path / "sessions.db"), purge_every=1, **options)
+        return MemoryContextStore(**options)
+    return make
+
+
+def test_round_trip_and_clear(make_store, clock):
+    ctx = ContextManager(make_store())
+    ctx.update_context("u1", "track_order", ORDER)
+    ctx.update_context("", "greeting", [])        # ignored
+
+    context = ctx.get_context("u1")
+    assert (context["intent"], context["updated_at"]) == ("track_order", clock.now)
+    assert [tuple(entity) for entity in context["entities"]] == ORDER
+
+    ctx.clear_context("u1")
+    assert ctx.get_context("u1") is None
+
+
+def test_idle_sessions_expire(make_store, clock):
+    store = make_store(ttl=60)
+    store.set("u1", "track_order", ORDER)
+
+    clock.now += 60
+    assert store.get("u1")["intent"] == "track_order"
+    clock.now += 1
+    assert store.get("u1") is None
+
+    # A later write also drops expired sessions from the store
+    store.set("u2", "refund", [])
+    assert len(store) == 1
+
+
+def test_oldest_update_is_evicted_over_the_limit(make_store, clock):
+    store = make_store(max_sessions=2)
+    for user_id in ["u1", "u2", "u3"]:
+        clock.now += 1
+        store.set(user_id, "greeting", [])
+
+    assert len(store) == 2
+    assert store.get("u1") is None
+    assert store.get("u3") is not None
+
+    # Updating a session makes it the newest
+    clock.now += 1
+    store.set("u2", "refund", [])
+    clock.now += 1
+    store.set("u4", "greeting", [])
+    assert store.get("u3") is None
+    assert store.get("u2")["intent"] == "refund"
@@ -0,0 +1,106 @@
+# backend/tests/test_faq_retrieval.py
+import csv
+import random
+
+import pytest
+
+from nlp.faq_retrieval import FAQ_PATH, MIN_SCORE, FAQRetriever
+
+QUERIES = [
+    "how do I get a refund",
+    "track my order",
+    "cancel my order",
+    "what payment methods do you accept",
+    "new question about shipping",
+    "question 17",
+]
+
+
+@pytest.fixture(scope="module")
+def pairs():
+    with open(FAQ_PATH, "r", encoding="utf-8") as f:
+        return [(row["question"], row["answer"]) for row in csv.DictReader(f)]
+
+
+def hits(index, query):
+    # Ties may come back in either order: compare as sorted lists
+    return sorted((round(hit["score"], 6), hit["answer"], hit["question"]) for hit in index.search(query, k=1000))
+
+
+def apply_random_updates(index, pairs, seed, steps=80):
+    rng = random.Random(seed)
+    current = dict(pairs)
+    for step in range(steps):
+        if current and rng.random() < 0.5:
+            question = rng.choice(list(current))
+            assert index.remove(question)
+            del current[question]
+        else:
+            question = f"new question {step} about shipping refunds"
+            answer = rng.choice([f"answer {step % 7}", pairs[step % len(pairs)][1]])
+            index.add(question, answer)
+            current[question] = answer
+    return current
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_updates_match_rebuild(pairs, seed):
+    index = FAQRetriever.build(pairs)
+    current = apply_random_updates(index, pairs, seed)
+    rebuilt = FAQRetriever.build(list(current.items()))
+
+    for query in QUERIES:
+        assert hits(index, query) == hits(rebuilt, query)
+
+    index.compact()
+    assert index.stats()["questions"] == rebuilt.stats()["questions"]
+    for query in QUERIES:
+        assert hits(index, query) == hits(rebuilt, query)
+
+
+def test_updates_after_load_match_rebuild(pairs, tmp_path):
+    FAQRetriever.build(pairs).save(str(tmp_path / "faq_index"))
+    index = FAQRetriever.load(str(tmp_path / "faq_index"))
+    current = apply_random_updates(index, pairs, seed=7)
+    rebuilt = FAQRetriever.build(list(current.items()))
+
+    for query in QUERIES:
+        assert hits(index, query) == hits(rebuilt, query)
+
+
+def test_remove_unknown_question(pairs):
+    index = FAQRetriever.build(pairs)
+    assert not index.remove("not an indexed question")
+    assert index.stats()["questions"] == len(dict(pairs))
+
+
+def test_save_load_round_trip(pairs, tmp_path):
+    index = FAQRetriever.build(pairs)
+    index.save(str(tmp_path / "faq_index"))
+    loaded = FAQRetriever.load(str(tmp_path / "faq_index"))
+
+    for query in QUERIES:
+        assert hits(loaded, query) == hits(index, query)
+
+
+def test_stop_words_match_sklearn():
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS as sklearn_stop_words
+
+    from nlp.faq_retrieval import ENGLISH_STOP_WORDS
+    assert ENGLISH_STOP_WORDS == sklearn_stop_words
+
+
+def test_query_batch_matches_single_queries(pairs):
+    index = FAQRetriever.build(pairs)
+    apply_random_updates(index, pairs, seed=3)
+    queries = QUERIES + ["", "zzz", "refund"] + [question for question, _ in pairs[:40]]
+
+    batch = index.query_batch(queries)
+    assert batch == [index.query_batch([query])[0] for query in queries]
+    for query, answer in zip(queries, batch):
+        hits = index.search(query, k=1000, min_score=MIN_SCORE)
+        if not hits:
+            assert answer is None
+        else:
+            # Any of the tied best answers
+            assert answer in [hit["answer"] for hit in hits if hit["score"] == hits[0]["score"]]
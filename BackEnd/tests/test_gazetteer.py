@@ -0,0 +1,52 @@
+# backend/tests/test_gazetteer.py
+import pytest
+
+from nlp.gazetteer import Gazetteer, build_gazetteer
+
+
+@pytest.fixture
+def gazetteer():
+    gazetteer = Gazetteer()
+    for name in ["shoe", "running shoe", "leather wallet", "watch", "jeans"]:
+        gazetteer.add_product(name)
+    gazetteer.add("ORD-778", "ORDER_ID")
+    return gazetteer
+
+
+def test_longest_phrase_wins(gazetteer):
+    assert gazetteer.extract("Do you sell running shoes?") == [("running shoes", "PRODUCT")]
+    assert gazetteer.extract("Is this shoe waterproof") == [("shoe", "PRODUCT")]
+
+
+def test_plurals_and_case(gazetteer):
+    assert gazetteer.extract("Two Watches and a Leather Wallet") == [
+        ("Watches", "PRODUCT"), ("Leather Wallet", "PRODUCT"),
+    ]
+    # Names ending in "s" get no extra plural
+    assert gazetteer.extract("jeans") == [("jeans", "PRODUCT")]
+    assert gazetteer.size == 10      # 4 names + their plurals, jeans, ORD-778
+
+
+def test_order_id_shapes(gazetteer):
+    assert gazetteer.extract("Where is order #12345?") == [("#12345", "ORDER_ID")]
+    assert gazetteer.extract("status of ORD4567 please") == [("ORD4567", "ORDER_ID")]
+    assert gazetteer.extract("my order number 2024-17 is late") == [("2024-17", "ORDER_ID")]
+    assert gazetteer.extract("track ORD-778") == [("ORD-778", "ORDER_ID")]
+    # Too short, or a number with no order word before it
+    assert gazetteer.extract("order #12 costs 12345") == []
+
+
+def test_partial_phrase_does_not_match(gazetteer):
+    assert gazetteer.extract("running late, leather jacket") == []
+
+
+def test_builds_from_data_files(tmp_path):
+    entities = tmp_path / "entities.csv"
+    entities.write_text("entity\tlabel\nsneaker\tPRODUCT\nM\tSIZE\n#99999\tORDER_ID\n", encoding="utf-8")
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text("product,price\nSmart Watch,99\n", encoding="utf-8")
+
+    gazetteer = build_gazetteer(str(entities), str(catalog))
+    assert gazetteer.extract("M smart watches and sneakers, order #99999") == [
+        ("smart watches", "PRODUCT"), ("sneakers", "PRODUCT"), ("#99999", "ORDER_ID"),
+    ]
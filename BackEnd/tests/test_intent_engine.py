@@ -0,0 +1,75 @@
+# backend/tests/test_intent_engine.py
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.utils import murmurhash3_32 as sklearn_murmurhash3_32
+
+from sklearn.linear_model import LogisticRegression
+
+from nlp.intent_engine import ENGINE_PATH, IntentEngine, check_parity, export_intent_engine, murmurhash3_32
+from nlp.intent_model import (
+    DATA_PATH, build_vectorizer, clean_dataset, fit_intent_model, load_sklearn_intent_model,
+)
+from nlp.releases import artifact_path
+
+EXTRA_TEXTS = ["", "   ", "Where is my order #12345 for shoes?!", "ÀÉÎ ünïcödé", "refund refund refund"]
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return clean_dataset(pd.read_csv(DATA_PATH))
+
+
+def fit_softmax_model(texts, labels):
+    # A plain LogisticRegression, like the shipped pickle: softmax predict_proba
+    vectorizer = build_vectorizer("vocab")
+    model = LogisticRegression(max_iter=2000, class_weight="balanced")
+    model.fit(vectorizer.fit_transform(texts), labels)
+    return model, vectorizer
+
+
+@pytest.fixture(scope="module", params=["vocab", "hashed", "vocab-softmax"])
+def trained(request, dataset, tmp_path_factory):
+    if request.param == "vocab-softmax":
+        model, vectorizer = fit_softmax_model(dataset["query"], dataset["intent"])
+    else:
+        model, vectorizer = fit_intent_model(dataset["query"], dataset["intent"], featurizer=request.param)
+    path = tmp_path_factory.mktemp(request.param) / "intent_engine"
+    export_intent_engine(model, vectorizer, str(path))
+    return model, vectorizer, IntentEngine.load(str(path))
+
+
+def test_murmurhash_matches_sklearn():
+    for text in ["", "a", "ab", "abc", "abcd", " wh", "ünï", "order #12345"]:
+        data = text.encode("utf-8")
+        assert murmurhash3_32(data) == sklearn_murmurhash3_32(data)
+        assert murmurhash3_32(data, seed=42) == sklearn_murmurhash3_32(data, seed=42)
+
+
+def test_engine_matches_sklearn(trained, dataset):
+    model, vectorizer, engine = trained
+    texts = dataset["query"].tolist() + EXTRA_TEXTS
+
+    X = vectorizer.transform(texts)
+
+    np.testing.assert_allclose(engine.predict_proba(texts), model.predict_proba(X), rtol=0, atol=1e-9)
+    assert (engine.predict(texts) == model.predict(X)).all()
+    assert check_parity(model, vectorizer, engine, texts)["label_mismatches"] == 0
+
+
+def test_shipped_engine_matches_shipped_pickles(dataset):
+    model, vectorizer = load_sklearn_intent_model()
+    engine = IntentEngine.load(artifact_path(ENGINE_PATH))
+    texts = dataset["query"].tolist() + EXTRA_TEXTS
+    X = vectorizer.transform(texts)
+
+    np.testing.assert_allclose(engine.predict_proba(texts), model.predict_proba(X), rtol=0, atol=1e-9)
+    assert (engine.predict(texts) == model.predict(X)).all()
+
+
+def test_engine_probabilities_are_normalised(trained):
+    _, _, engine = trained
+    probs = engine.predict_proba(EXTRA_TEXTS)
+
+    assert probs.shape == (len(EXTRA_TEXTS), len(engine.classes_))
+    np.testing.assert_allclose(probs.sum(axis=1), 1.0)
@@ -0,0 +1,104 @@
+# backend/tests/test_log_store.py
+import functools
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from Analytics import usage_report
+from nlp import log_store
+
+NOW = datetime.now().replace(microsecond=0)
+YESTERDAY = NOW - timedelta(days=1)
+
+
+def record(when, user_id, intent, query="hello"):
+    return [when, user_id, query, "reply", intent]
+
+
+@pytest.fixture
+def root(tmp_path):
+    return str(tmp_path / "interactions")
+
+
+def test_write_roll_and_read(root):
+    sink = log_store.PartitionedParquetSink(root, roll_seconds=3600, roll_rows=2)
+    sink.write_batch([record(YESTERDAY, "u1", "greeting")])   # past day: rolled at once
+    sink.write_batch([record(NOW, "u1", "order_status"), record(NOW, "u2", "refund")])   # full: rolled
+    sink.write_batch([record(NOW, "u3", "greeting")])         # still open
+
+    today = os.path.join(root, f"date={NOW:%Y-%m-%d}")
+    assert len(log_store.list_parts(today)) == 1
+    assert log_store.read_table(root=root).num_rows == 3
+
+    sink.close()
+    assert len(log_store.list_parts(today)) == 2
+    assert [day for day, _ in log_store.list_partitions(root)] == [f"{YESTERDAY:%Y-%m-%d}", f"{NOW:%Y-%m-%d}"]
+
+    table = log_store.read_table(columns=["user_id"], since=f"{NOW:%Y-%m-%d}", root=root)
+    assert table.column_names == ["user_id"]
+    assert sorted(table["user_id"].to_pylist()) == ["u1", "u2", "u3"]
+    assert log_store.read_table(filters=[("intent", "=", "greeting")], root=root).num_rows == 2
+
+
+def test_stale_parts_of_dead_writers_are_removed(root):
+    sink = log_store.PartitionedParquetSink(root, roll_seconds=3600)
+    sink.write_batch([record(NOW, "u1", "greeting")])         # our own open part
+    directory = os.path.join(root, f"date={NOW:%Y-%m-%d}")
+
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    stale = os.path.join(directory, f".part-20260101T000000-{dead.pid}-1.parquet.inprogress")
+    with open(stale, "wb") as f:
+        f.write(b"no footer")
+
+    assert log_store.remove_stale_parts(root) == [stale]
+    sink.close()
+    assert log_store.read_table(root=root).num_rows == 1
+
+
+def test_usage_report_folds_in_new_parts_only(root, monkeypatch, capsys):
+    monkeypatch.setattr(log_store, "list_partitions", functools.partial(log_store.list_partitions, root))
+    sink = log_store.PartitionedParquetSink(root, roll_seconds=0)
+    sink.write_batch([
+        record(NOW, "u1", "greeting"),
+        record(NOW, "u1", "uncertain", "blorp"),
+        record(NOW, "u2", "unknown", "zzz"),
+    ])
+    directory = os.path.join(root, f"date={NOW:%Y-%m-%d}")
+
+    summary = usage_report.summarize_partition(directory)
+    assert summary["rows"] == 3
+    assert summary["users"] == {"u1": 2, "u2": 1}
+    assert sorted(summary["unanswered"]) == ["blorp", "zzz"]
+
+    sink.write_batch([record(NOW, "u3", "low_confidence", "hmm")])
+    summary = usage_report.summarize_partition(directory)
+    assert summary["rows"] == 4
+    assert len(summary["parts"]) == 2
+    assert sorted(summary["unanswered"]) == ["blorp", "hmm", "zzz"]
+
+    usage_report.generate_report()
+    out = capsys.readouterr().out
+    assert "Total Conversations: 4" in out
+    assert "- blorp" in out
+
+
+def test_summary_from_another_intent_list_is_rebuilt(root):
+    sink = log_store.PartitionedParquetSink(root, roll_seconds=0)
+    sink.write_batch([record(NOW, "u1", "uncertain", "blorp")])
+    directory = os.path.join(root, f"date={NOW:%Y-%m-%d}")
+
+    # A summary written before "uncertain" counted as unanswered
+    with open(os.path.join(directory, usage_report.SUMMARY_FILE), "w", encoding="utf-8") as f:
+        json.dump({"parts": log_store.list_parts(directory), "rows": 1, "intents": {"uncertain": 1},
+                   "users": {"u1": 1}, "unanswered": []}, f)
+
+    summary = usage_report.summarize_partition(directory)
+    assert summary["rows"] == 1
+    assert summary["unanswered"] == ["blorp"]
@@ -0,0 +1,91 @@
+# backend/tests/test_profile_store.py
+import json
+import os
+
+import pytest
+
+from nlp.profile_store import JSONProfileStore, SQLiteProfileStore, import_profiles
+
+
+def write_json(path, profiles):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profiles, f)
+
+
+@pytest.fixture
+def db(tmp_path):
+    source = str(tmp_path / "profiles.json")
+    write_json(source, {"u1": {"name": "Asha", "tier": "gold"}})
+    db_path = str(tmp_path / "user_profiles.db")
+    import_profiles(source, db_path)
+    return source, db_path
+
+
+def test_lookups_are_cached(db):
+    _, db_path = db
+    store = SQLiteProfileStore(db_path, check_interval=0)
+
+    assert store.get("u1")["tier"] == "gold"
+    assert store.get("u1")["tier"] == "gold"
+    assert store.get("nobody") is None
+    assert store.get("nobody") is None
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"], stats["cached"]) == (2, 2, 2)
+
+
+def test_rebuilt_database_is_picked_up(db):
+    source, db_path = db
+    store = SQLiteProfileStore(db_path, check_interval=0)
+    assert store.get("u1")["tier"] == "gold"
+
+    write_json(source, {"u1": {"name": "Asha", "tier": "silver"}, "u2": {"name": "Ben"}})
+    import_profiles(source, db_path)
+
+    assert store.get("u1")["tier"] == "silver"
+    assert store.get("u2")["name"] == "Ben"
+    assert store.stats()["reloads"] == 1
+
+
+def test_in_place_upsert_is_picked_up(db, tmp_path):
+    _, db_path = db
+    store = SQLiteProfileStore(db_path, check_interval=0)
+    assert store.get("u3") is None
+
+    updates = str(tmp_path / "new.jsonl")
+    with open(updates, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"user_id": "u3", "name": "Chen"}) + "\n")
+    import_profiles(updates, db_path, upsert=True)
+
+    assert store.get("u3") == {"name": "Chen"}
+    assert store.get("u1")["tier"] == "gold"
+
+
+def test_missing_database_serves_cached_profiles(db, tmp_path):
+    source, db_path = db
+    store = SQLiteProfileStore(db_path, check_interval=0)
+    assert store.get("u1")["tier"] == "gold"
+
+    os.rename(db_path, str(tmp_path / "moved.db"))
+    assert store.get("u1")["tier"] == "gold"
+    assert store.get("u2") is None
+    assert not store.stats()["available"]
+
+    # Restored by a rebuild: new data, and "u2" was never cached as missing
+    write_json(source, {"u1": {"tier": "gold"}, "u2": {"name": "Ben"}})
+    import_profiles(source, db_path)
+    assert store.get("u2") == {"name": "Ben"}
+    assert store.stats()["available"]
+
+
+def test_json_store_reloads_on_change(tmp_path):
+    path = str(tmp_path / "user_profiles.json")
+    store = JSONProfileStore(path, check_interval=0)
+    assert store.get("u1") is None          # no file yet
+
+    write_json(path, {"u1": {"name": "Asha"}})
+    assert store.get("u1") == {"name": "Asha"}
+
+    write_json(path, {"u1": {"name": "Asha K"}})
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert store.get("u1") == {"name": "Asha K"}
@@ -0,0 +1,144 @@
+# backend/tests/test_releases.py
+import json
+import os
+
+import pytest
+
+from nlp import releases
+
+
+@pytest.fixture
+def models_dir(tmp_path, monkeypatch):
+    """
+    A flat models/ directory with a file and a directory artifact, and the
+    release paths pointed at it.
+    """
+    models = tmp_path / "models"
+    (models / "faq_index").mkdir(parents=True)
+    (models / "faq_index" / "manifest.json").write_text('{"v": 1}')
+    (models / "intent_model.pkl").write_bytes(b"intent v1")
+
+    monkeypatch.setattr(releases, "MODELS_DIR", str(models))
+    monkeypatch.setattr(releases, "RELEASES_DIR", str(models / "releases"))
+    monkeypatch.setattr(releases, "CURRENT_PATH", str(models / "CURRENT"))
+    monkeypatch.setattr(releases, "LOCK_PATH", str(models / "releases" / ".lock"))
+    monkeypatch.setattr(releases, "_verified", set())
+    monkeypatch.setattr(releases, "_manifests", {})
+    return models
+
+
+def publish(models, note, **files):
+    with releases.new_release(note) as release:
+        for name, data in files.items():
+            with open(release.path(str(models / name)), "wb") as f:
+                f.write(data)
+
+
+def test_flat_layout_until_first_release(models_dir):
+    path = str(models_dir / "intent_model.pkl")
+    assert releases.current_release() is None
+    assert releases.artifact_path(path) == path
+
+
+def test_publish_and_verify(models_dir):
+    publish(models_dir, "init")
+    publish(models_dir, "retrained", **{"intent_model.pkl": b"intent v2"})
+
+    current = releases.current_release()
+    assert current["release"] == "r0002"
+    assert current["previous"] == "r0001"
+
+    path = releases.artifact_path(str(models_dir / "intent_model.pkl"))
+    assert path == os.path.join(releases.release_path("r0002"), "intent_model.pkl")
+    with open(path, "rb") as f:
+        assert f.read() == b"intent v2"
+
+    manifest = releases.verify_release("r0002")
+    assert manifest["parent"] == "r0001"
+    assert set(manifest["files"]) == {"intent_model.pkl", "faq_index/manifest.json"}
+
+    # The parent release is untouched by the new one
+    with open(os.path.join(releases.release_path("r0001"), "intent_model.pkl"), "rb") as f:
+        assert f.read() == b"intent v1"
+
+
+def test_verify_detects_modified_and_extra_files(models_dir):
+    publish(models_dir, "init")
+    directory = releases.release_path("r0001")
+
+    with open(os.path.join(directory, "intent_model.pkl"), "wb") as f:
+        f.write(b"tampered")
+    with pytest.raises(releases.ReleaseError):
+        releases.verify_release("r0001")
+
+    publish(models_dir, "clean")
+    with open(os.path.join(releases.release_path("r0002"), "stray.txt"), "w") as f:
+        f.write("x")
+    with pytest.raises(releases.ReleaseError):
+        releases.verify_release("r0002")
+
+
+def test_failed_block_publishes_nothing(models_dir):
+    publish(models_dir, "init")
+    with pytest.raises(RuntimeError):
+        with releases.new_release("broken"):
+            raise RuntimeError("training failed")
+
+    assert [release["release"] for release in releases.list_releases()] == ["r0001"]
+    assert releases.current_release()["release"] == "r0001"
+    assert not [name for name in os.listdir(releases.RELEASES_DIR) if name.startswith(".staging")]
+
+
+def test_rollback_and_roll_forward(models_dir):
+    publish(models_dir, "init")
+    publish(models_dir, "retrained", **{"intent_model.pkl": b"intent v2"})
+
+    assert releases.rollback() == "r0001"
+    current = releases.current_release()
+    assert (current["release"], current["previous"]) == ("r0001", "r0002")
+    with open(releases.artifact_path(str(models_dir / "intent_model.pkl")), "rb") as f:
+        assert f.read() == b"intent v1"
+
+    assert releases.rollback() == "r0002"
+    assert releases.current_release()["release"] == "r0002"
+
+
+def test_rollback_without_previous(models_dir):
+    publish(models_dir, "init")
+    with pytest.raises(releases.ReleaseError):
+        releases.rollback()
+
+
+def test_activate_refuses_a_corrupt_release(models_dir):
+    publish(models_dir, "init")
+    publish(models_dir, "retrained", **{"intent_model.pkl": b"intent v2"})
+    os.remove(os.path.join(releases.release_path("r0001"), "intent_model.pkl"))
+
+    with pytest.raises(releases.ReleaseError):
+        releases.activate_release("r0001")
+    assert releases.current_release()["release"] == "r0002"
+
+
+def test_fingerprint_changes_only_with_the_artifact(models_dir):
+    intent = str(models_dir / "intent_model.pkl")
+    faq = str(models_dir / "faq_index" / "manifest.json")
+    publish(models_dir, "init")
+    before = releases.artifact_fingerprint(intent), releases.artifact_fingerprint(faq)
+
+    publish(models_dir, "retrained", **{"intent_model.pkl": b"intent v2"})
+    after = releases.artifact_fingerprint(intent), releases.artifact_fingerprint(faq)
+
+    assert after[0] != before[0]
+    assert after[1] == before[1]
+
+
+def test_prune_keeps_current_and_previous(models_dir):
+    publish(models_dir, "init")
+    for version in range(2, 5):
+        publish(models_dir, f"v{version}", **{"intent_model.pkl": f"intent v{version}".encode()})
+    releases.activate_release("r0001")      # previous: r0004
+
+    assert releases.prune_releases(keep=1) == ["r0002", "r0003"]
+    assert [release["release"] for release in releases.list_releases()] == ["r0001", "r0004"]
+    with open(releases.CURRENT_PATH, "r", encoding="utf-8") as f:
+        assert json.load(f)["release"] == "r0001"
@@ -0,0 +1,65 @@
+# backend/tests/test_response_cache.py
+import pytest
+
+from nlp import response_cache
+from nlp.response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache, "time", clock)
+    return clock
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(maxsize=10, ttl=60)
+    cache.put("track order", {"faq_answer": "a"}, generation=1)
+
+    clock.now += 59
+    assert cache.get("track order", 1) == {"faq_answer": "a"}
+    clock.now += 2
+    assert cache.get("track order", 1) is None
+    assert cache.stats()["size"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = ResponseCache(maxsize=2, ttl=60)
+    cache.put("a", 1, generation=1)
+    cache.put("b", 2, generation=1)
+    assert cache.get("a", 1) == 1       # "b" is now the oldest
+    cache.put("c", 3, generation=1)
+
+    assert cache.get("b", 1) is None
+    assert (cache.get("a", 1), cache.get("c", 1)) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_new_model_generation_drops_every_entry(clock):
+    cache = ResponseCache(maxsize=10, ttl=60)
+    cache.put("a", 1, generation=1)
+    cache.put("b", 2, generation=1)
+
+    assert cache.get("a", 2) is None
+    assert cache.stats()["size"] == 0
+    assert cache.invalidations == 1
+
+    # Results computed under the new models are cached again
+    cache.put("a", 10, generation=2)
+    assert cache.get("a", 2) == 10
+
+
+def test_size_zero_disables_the_cache(clock):
+    cache = ResponseCache(maxsize=0, ttl=60)
+    cache.put("a", 1, generation=1)
+    assert cache.get("a", 1) is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,73 @@
+# backend/tests/test_worker_pool.py
+import asyncio
+import threading
+
+import pytest
+
+from nlp.worker_pool import PipelinePool, PoolSaturatedError
+
+
+def blocking(release, value):
+    release.wait(timeout=10)
+    return value
+
+
+async def wait_for(condition):
+    for _ in range(1000):
+        if condition():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("condition not reached")
+
+
+def test_admits_workers_plus_queue_then_rejects():
+    async def scenario():
+        pool = PipelinePool("thread", workers=1, queue_size=1)
+        release = threading.Event()
+        try:
+            calls = [asyncio.ensure_future(pool.run(blocking, release, i)) for i in range(2)]
+            await wait_for(lambda: pool.stats()["in_flight"] == 2)
+            assert pool.saturated
+            assert pool.stats()["queue_depth"] == 1
+
+            with pytest.raises(PoolSaturatedError):
+                await pool.run(blocking, release, 2)
+
+            release.set()
+            assert await asyncio.gather(*calls) == [0, 1]
+            stats = pool.stats()
+            assert (stats["in_flight"], stats["completed"], stats["rejected"]) == (0, 2, 1)
+            assert await pool.run(blocking, release, 3) == 3
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_run_all_is_all_or_nothing():
+    async def scenario():
+        pool = PipelinePool("thread", workers=2, queue_size=1)
+        release = threading.Event()
+        try:
+            busy = asyncio.ensure_future(pool.run(blocking, release, "busy"))
+            await wait_for(lambda: pool.stats()["in_flight"] == 1)
+
+            # Three calls do not fit next to the busy one: none may start
+            with pytest.raises(PoolSaturatedError):
+                await pool.run_all(blocking, [(release, i) for i in range(3)])
+            assert pool.stats()["in_flight"] == 1
+
+            release.set()
+            assert await busy == "busy"
+            assert await pool.run_all(blocking, [(release, i) for i in range(3)]) == [0, 1, 2]
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_unknown_executor_kind():
+    with pytest.raises(ValueError):
+        PipelinePool("fibers")
@@ -1,7 +1,13 @@
-import React, { useState } from "react";
-import api from "../../axiosconfig"; 
+import React, { useEffect, useRef, useState } from "react";
+import api from "../../axiosconfig";
 import "./ChatBot.css";
 
+const USER_ID = "web_user";
+
+// ws://host/ws/chat on the same backend as axios
+const socketUrl = () =>
+  `${api.defaults.baseURL.replace(/^http/, "ws")}/ws/chat?user_id=${encodeURIComponent(USER_ID)}`;
+
 const Chatbot = () => {
   const [isOpen, setIsOpen] = useState(false);
   const [messages, setMessages] = useState([
@@ -9,10 +15,44 @@ const Chatbot = () => {
   ]);
   const [input, setInput] = useState("");
 
+  // One WebSocket per chat session; replies are matched to messages by id
+  const socketRef = useRef(null);
+  const nextIdRef = useRef(0);
+
+  const updateBotMessage = (id, text) => {
+    setMessages((prev) => prev.map((msg) => (msg.id === id ? { ...msg, text } : msg)));
+  };
+
+  useEffect(() => {
+    if (!isOpen) return;
+
+    const socket = new WebSocket(socketUrl());
+    socketRef.current = socket;
+
+    socket.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      // "status" (e.g. "Let me check your order status.") is replaced by the "reply"
+      if (data.type === "status" || data.type === "reply") {
+        updateBotMessage(data.id, data.response);
+      } else if (data.type === "error" && data.id !== null) {
+        updateBotMessage(data.id, data.response || "⚠️ Error contacting server.");
+      }
+    };
+    socket.onclose = () => {
+      if (socketRef.current === socket) socketRef.current = null;
+    };
+
+    return () => {
+      socketRef.current = null;
+      socket.close();
+    };
+  }, [isOpen]);
+
+  // Fallback when the WebSocket is not connected
   const sendToBackend = async (userText) => {
     try {
       const res = await api.post("/chat", {
-        user_id: "web_user",
+        user_id: USER_ID,
         message: userText,
       });
 
@@ -27,20 +67,24 @@ const Chatbot = () => {
     if (!input.trim()) return;
 
     const userMessage = { sender: "user", text: input };
-    setMessages((prev) => [...prev, userMessage]);
+    const id = nextIdRef.current++;
+    setMessages((prev) => [
+      ...prev,
+      userMessage,
+      { sender: "bot", text: "Typing...", id },
+    ]);
 
     const userText = input;
     setInput("");
 
-    setMessages((prev) => [...prev, { sender: "bot", text: "Typing..." }]);
+    const socket = socketRef.current;
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ id, message: userText }));
+      return;
+    }
 
     const botReply = await sendToBackend(userText);
-
-    setMessages((prev) => {
-      const updated = [...prev];
-      updated.pop(); 
-      return [...updated, { sender: "bot", text: botReply }];
-    });
+    updateBotMessage(id, botReply);
   };
 
   return (